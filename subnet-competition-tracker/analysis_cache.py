@@ -0,0 +1,128 @@
+"""
+Persistent cache of per-pair analysis results.
+
+analyze_competition diffs every consecutive snapshot pair. The result of a
+pair only depends on its two files, so it is cached here keyed by each
+file's name, size and mtime, together with the running aggregate over the
+pairs seen so far. A new run only has to diff pairs that are not cached,
+and when the cached aggregate covers a prefix of the current history the
+new pairs are simply merged into it.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CACHE_VERSION = 1
+CACHE_FILENAME = "analysis_cache.json"
+
+
+def fingerprint(path: Path) -> List:
+    """Identity of a snapshot file: [name, size, mtime_ns]."""
+    stat = Path(path).stat()
+    return [Path(path).name, stat.st_size, stat.st_mtime_ns]
+
+
+def pair_key(old_path: Path, new_path: Path) -> str:
+    """Cache key for a consecutive snapshot pair."""
+    return f"{Path(old_path).name}|{Path(new_path).name}"
+
+
+class AnalysisCache:
+    """Per-pair change summaries and the running aggregate, stored as JSON."""
+
+    def __init__(self, path: Path):
+        """
+        Load the cache file, starting empty when it is missing or stale.
+
+        Args:
+            path: Location of the cache file
+        """
+        self.path = Path(path)
+        self.pairs: Dict[str, Dict] = {}
+        self.aggregate: Dict = {"pairs": [], "subnet_stats": {}}
+        self._dirty = False
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.pairs = data.get("pairs", {})
+            self.aggregate = data.get("aggregate", self.aggregate)
+
+    def get(self, old_path: Path, new_path: Path) -> Optional[Dict]:
+        """
+        Cached summary for a pair, if neither file changed since it was stored.
+
+        Args:
+            old_path: Earlier snapshot
+            new_path: Later snapshot
+
+        Returns:
+            Per-netuid stat increments, or None on a miss
+        """
+        entry = self.pairs.get(pair_key(old_path, new_path))
+        if entry is None:
+            return None
+        if entry["old"] != fingerprint(old_path) or entry["new"] != fingerprint(new_path):
+            return None
+        return entry["summary"]
+
+    def put(self, old_path: Path, new_path: Path, summary: Dict):
+        """Store the summary of a pair."""
+        self.pairs[pair_key(old_path, new_path)] = {
+            "old": fingerprint(old_path),
+            "new": fingerprint(new_path),
+            "summary": summary
+        }
+        self._dirty = True
+
+    def resume_aggregate(self, pairs: List[Tuple[Path, Path]]) -> Tuple[int, Dict]:
+        """
+        Find how much of the current pair sequence the cached aggregate covers.
+
+        Args:
+            pairs: Consecutive (old, new) snapshot paths in order
+
+        Returns:
+            (number of leading pairs already aggregated, their subnet_stats)
+        """
+        covered = self.aggregate.get("pairs", [])
+        if not covered or len(covered) > len(pairs):
+            return 0, {}
+        for (old_path, new_path), (key, old_fp, new_fp) in zip(pairs, covered):
+            if key != pair_key(old_path, new_path):
+                return 0, {}
+            if old_fp != fingerprint(old_path) or new_fp != fingerprint(new_path):
+                return 0, {}
+        return len(covered), self.aggregate.get("subnet_stats", {})
+
+    def set_aggregate(self, pairs: List[Tuple[Path, Path]], subnet_stats: Dict):
+        """Record the aggregate over the given leading pairs."""
+        self.aggregate = {
+            "pairs": [[pair_key(o, n), fingerprint(o), fingerprint(n)] for o, n in pairs],
+            "subnet_stats": subnet_stats
+        }
+        self._dirty = True
+
+    def prune(self, pairs: List[Tuple[Path, Path]]):
+        """Drop summaries for pairs that are no longer consecutive in the history."""
+        live = {pair_key(o, n) for o, n in pairs}
+        stale = [key for key in self.pairs if key not in live]
+        for key in stale:
+            del self.pairs[key]
+        if stale:
+            self._dirty = True
+
+    def save(self):
+        """Write the cache atomically if anything changed."""
+        if not self._dirty:
+            return
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "pairs": self.pairs, "aggregate": self.aggregate}, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,151 @@
+"""
+Streaming churn anomaly detection.
+
+Deregistration and replacement waves otherwise only show up on the next
+analyze run. The detector looks at every new snapshot pair as it is
+written: for each subnet with a block span on both sides, replacements and
+deregistrations per block are compared against an exponentially weighted
+mean and variance of that subnet's earlier pairs, and a pair whose rate is
+more than `threshold` standard deviations above the mean is reported.
+
+State (anomaly_state.json in the data directory) is a fixed set of numbers
+per subnet, however long the history:
+
+    {
+      "last_snapshot": "snapshot_<ts>",
+      "subnets": {"8": {"replacements": [mean, variance, pairs], "deregistrations": [...]}}
+    }
+
+Alerts are appended to a JSON lines file, one object per alert. Each has a
+"text" field with a one-line summary, so a forwarder can POST lines to a
+Slack-compatible webhook unchanged:
+
+    {"text": "Subnet 8: 45 replacements in 50 blocks (900.0/1k blocks, baseline 12.1, z=7.3)",
+     "time": "...", "snapshot": "snapshot_<ts>", "netuid": "8", "metric": "replacements",
+     "count": 45, "blocks": 50, "rate_per_1k_blocks": 900.0, "baseline_per_1k_blocks": 12.1, "zscore": 7.3}
+"""
+
+import json
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ANOMALY_STATE_FILENAME = "anomaly_state.json"
+ALERT_LOG_FILENAME = "alerts.jsonl"
+
+# Metric name -> summarize_changes() counter
+METRICS = {
+    "replacements": "total_replacements",
+    "deregistrations": "total_deregistrations",
+}
+
+# Weight of the newest pair in the running mean and variance
+DEFAULT_ALPHA = 0.1
+
+# Pairs a subnet needs before it can raise alerts
+DEFAULT_WARMUP = 5
+
+# A spike must also involve at least this many UIDs, so a quiet subnet
+# (zero variance) doesn't alert on a single replacement
+DEFAULT_MIN_COUNT = 3
+
+
+class ChurnDetector:
+    """EWMA mean and variance of per-block churn per subnet, with spike alerts."""
+
+    def __init__(self, path: Path, threshold: float = 4.0, alpha: float = DEFAULT_ALPHA,
+                 warmup: int = DEFAULT_WARMUP, min_count: int = DEFAULT_MIN_COUNT):
+        """
+        Load the state, starting empty when the file does not exist.
+
+        Args:
+            path: Location of the state file
+            threshold: Standard deviations above the running mean that count as a spike
+            alpha: Weight of each new pair in the running statistics
+            warmup: Pairs a subnet needs before it can raise alerts
+            min_count: Fewest replacements or deregistrations in a pair that can alert
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self.alpha = alpha
+        self.warmup = warmup
+        self.min_count = min_count
+        try:
+            with open(self.path, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {"last_snapshot": None, "subnets": {}}
+
+    @property
+    def last_snapshot(self) -> Optional[str]:
+        return self.state["last_snapshot"]
+
+    def save(self):
+        """Write the state atomically."""
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def observe(self, stem: str, summary: Dict[str, Dict], spans: Dict[str, int]) -> List[Dict]:
+        """
+        Score one snapshot pair and fold it into the running statistics.
+
+        Args:
+            stem: Stem of the newer snapshot of the pair
+            summary: summarize_changes() of the pair (changed subnets only)
+            spans: Blocks between the two reads of each subnet that has a block on both sides
+
+        Returns:
+            Alerts raised by the pair
+        """
+        alerts = []
+        subnets = self.state["subnets"]
+        for netuid, blocks in spans.items():
+            counters = summary.get(netuid, {})
+            stats = subnets.setdefault(netuid, {metric: [0.0, 0.0, 0] for metric in METRICS})
+            for metric, counter in METRICS.items():
+                count = counters.get(counter, 0)
+                rate = count / blocks
+                mean, variance, pairs = stats[metric]
+                deviation = rate - mean
+                if pairs >= self.warmup and count >= self.min_count and deviation > 0:
+                    std = math.sqrt(variance)
+                    zscore = deviation / std if std > 0 else math.inf
+                    if zscore > self.threshold:
+                        alerts.append(self._alert(stem, netuid, metric, count, blocks, mean, zscore))
+                # Exponentially weighted mean and variance (West's incremental form)
+                increment = self.alpha * deviation
+                stats[metric] = [mean + increment, (1 - self.alpha) * (variance + deviation * increment), pairs + 1]
+        self.state["last_snapshot"] = stem
+        return alerts
+
+    @staticmethod
+    def _alert(stem: str, netuid: str, metric: str, count: int, blocks: int, mean: float, zscore: float) -> Dict:
+        rate = count / blocks * 1000
+        baseline = mean * 1000
+        z = round(zscore, 1) if math.isfinite(zscore) else None
+        return {
+            "text": f"Subnet {netuid}: {count} {metric} in {blocks} blocks ({rate:.1f}/1k blocks, "
+                    f"baseline {baseline:.1f}, z={z if z is not None else 'inf'})",
+            "time": datetime.now().isoformat(),
+            "snapshot": stem,
+            "netuid": netuid,
+            "metric": metric,
+            "count": count,
+            "blocks": blocks,
+            "rate_per_1k_blocks": round(rate, 3),
+            "baseline_per_1k_blocks": round(baseline, 3),
+            "zscore": z
+        }
+
+
+def append_alerts(path: Path, alerts: List[Dict]):
+    """Append alerts to a JSON lines sink."""
+    if not alerts:
+        return
+    with open(path, "a") as f:
+        for alert in alerts:
+            f.write(json.dumps(alert, separators=(",", ":")) + "\n")
@@ -0,0 +1,77 @@
+"""
+Historical backfill.
+
+Snapshots only exist from the day collection started, and a live sweep
+reads each subnet at whatever block is current. Backfill reads the Keys
+map of every subnet at one pinned historical block (which needs an
+archive node), for a list or range of blocks:
+
+    4100000,4107200,4114400        three blocks
+    4100000-4200000:7200           every 7200 blocks (~1 day) from 4100000 to 4200000
+
+Every block becomes an ordinary full snapshot, named after the block's
+on-chain timestamp (Timestamp.Now), so analyze orders it with the live
+history. Each block in flight has its own sweep checkpoint
+(.backfill_<block>.jsonl); an interrupted run resumes the blocks it had
+started and skips the blocks that already have a snapshot pinned to them.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Set
+
+BACKFILL_CHECKPOINT_PREFIX = ".backfill_"
+
+
+def parse_blocks(value: str) -> List[int]:
+    """
+    Parse a --blocks value.
+
+    Args:
+        value: Comma-separated block numbers and START-END:STEP ranges (END inclusive)
+
+    Returns:
+        The blocks, ascending and without duplicates
+
+    Raises:
+        ValueError: If an item is not a block number or a range with a step
+    """
+    blocks = set()
+    for item in str(value).split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "-" not in item:
+            if not item.isdigit():
+                raise ValueError(f"Not a block number: {item!r}")
+            blocks.add(int(item))
+            continue
+        span, _, step = item.partition(":")
+        start, _, end = span.partition("-")
+        if not (start.isdigit() and end.isdigit() and step.isdigit()) or int(step) == 0:
+            raise ValueError(f"Ranges are START-END:STEP, e.g. 4100000-4200000:7200, got {item!r}")
+        blocks.update(range(int(start), int(end) + 1, int(step)))
+    return sorted(blocks)
+
+
+def checkpoint_path(data_dir: Path, block: int) -> Path:
+    """Sweep checkpoint of one backfill block."""
+    return Path(data_dir) / f"{BACKFILL_CHECKPOINT_PREFIX}{block}.jsonl"
+
+
+def pinned_blocks(entries: List[Dict]) -> Set[int]:
+    """
+    Blocks that already have a snapshot with every fetched subnet read at that block.
+
+    Args:
+        entries: SnapshotIndex entries
+    """
+    return {
+        entry["block"] for entry in entries
+        if entry["blocks"] and set(entry["blocks"].values()) == {entry["block"]}
+    }
+
+
+def block_timestamp(millis: int) -> str:
+    """Snapshot timestamp of a block from its Timestamp.Now value (local time, like live sweeps)."""
+    return datetime.fromtimestamp(millis / 1000).isoformat()
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the tracker.
+
+Three parts:
+
+- SyntheticNetwork / generate_series: synthetic snapshot histories with a
+  configurable subnet count, UIDs per subnet, churn rate and length, written
+  through the tracker itself so every storage format can be measured.
+- FakeSubtensor: stands in for bt.Subtensor in take_snapshot, backed by a
+  SyntheticNetwork, with injectable per-call latency and failure rate. Over
+  an archiving SyntheticNetwork it also answers reads at past blocks, like
+  an archive node, for backfill.
+- run_benchmarks: wall time (best and median of N repeats) and tracemalloc
+  peak memory for snapshot, load_snapshot, compare_snapshots,
+  analyze_competition and ranking.
+
+Everything is seeded, so two runs with the same options measure the same
+work and results can be saved with --output and compared between versions.
+
+Usage:
+    python benchmarks.py --subnets 64 --uids 256 --history 48 --output baseline.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from main import SubnetCompetitionTracker
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Blocks per minute at 12 second blocks
+BLOCKS_PER_MINUTE = 5
+
+# Chain time of a SyntheticNetwork's start block
+SYNTHETIC_GENESIS = datetime(2025, 1, 1)
+
+
+class SyntheticNetwork:
+    """Deterministic subnet state that churns a fixed fraction of UIDs per step."""
+
+    def __init__(self, subnets: int = 32, uids: int = 256, churn: float = 0.02,
+                 dereg_rate: float = 0.0, seed: int = 0, start_block: int = 4_000_000,
+                 archive: bool = False):
+        """
+        Args:
+            subnets: Number of subnets (netuids 0..subnets-1)
+            uids: UIDs per subnet
+            churn: Fraction of occupied UIDs replaced by a new hotkey per step
+            dereg_rate: Fraction of occupied UIDs vacated per step; vacated UIDs
+                are registered again on the following step
+            seed: Random seed
+            start_block: Block of the initial state
+            archive: Keep every past state, so it can be read at a block
+        """
+        self.rng = random.Random(seed)
+        self.uids = uids
+        self.churn = churn
+        self.dereg_rate = dereg_rate
+        self.block = start_block
+        self.start_block = start_block
+        self.subnets: Dict[int, Dict[int, str]] = {
+            netuid: {uid: self.hotkey() for uid in range(uids)} for netuid in range(subnets)
+        }
+        # (block, state) of every step, oldest first
+        self.archive = [(self.block, self._copy())] if archive else None
+
+    def _copy(self) -> Dict[int, Dict[int, str]]:
+        return {netuid: dict(mapping) for netuid, mapping in self.subnets.items()}
+
+    def state_at(self, block: Optional[int] = None) -> Dict[int, Dict[int, str]]:
+        """
+        Subnet state as of a block.
+
+        Without an archive, every block reads the current state.
+
+        Args:
+            block: Block to read at (default: the current state)
+
+        Raises:
+            ValueError: If the block is before the archived start block
+        """
+        if block is None or block >= self.block or self.archive is None:
+            return self.subnets
+        if block < self.start_block:
+            raise ValueError(f"Block {block} is before the start block {self.start_block}")
+        state = self.archive[0][1]
+        for archived_block, archived in self.archive:
+            if archived_block > block:
+                break
+            state = archived
+        return state
+
+    def timestamp_millis(self, block: int) -> int:
+        """Unix milliseconds of a block, 12 seconds apart from SYNTHETIC_GENESIS."""
+        return int(SYNTHETIC_GENESIS.timestamp() * 1000) + (block - self.start_block) * 12_000
+
+    def hotkey(self) -> str:
+        """A random 48-character SS58-looking address."""
+        return "5" + "".join(self.rng.choices(BASE58_ALPHABET, k=47))
+
+    def step(self, blocks: int = 300):
+        """Advance the chain and apply one round of churn to every subnet."""
+        self.block += blocks
+        for mapping in self.subnets.values():
+            for uid in range(self.uids):
+                if uid not in mapping:
+                    mapping[uid] = self.hotkey()
+            occupied = list(mapping)
+            for uid in self.rng.sample(occupied, int(len(occupied) * self.churn)):
+                mapping[uid] = self.hotkey()
+            for uid in self.rng.sample(occupied, int(len(occupied) * self.dereg_rate)):
+                del mapping[uid]
+        if self.archive is not None:
+            self.archive.append((self.block, self._copy()))
+
+    def snapshot(self, timestamp: str, network: str = "finney") -> Dict:
+        """The current state in take_snapshot's layout."""
+        return {
+            "timestamp": timestamp,
+            "network": network,
+            "subnets": {
+                str(netuid): {
+                    "uid_hotkey_map": dict(sorted(mapping.items())),
+                    "n_neurons": len(mapping),
+                    "block": self.block
+                }
+                for netuid, mapping in self.subnets.items()
+            }
+        }
+
+
+def generate_series(data_dir: str, subnets: int = 32, uids: int = 256, churn: float = 0.02,
+                    history: int = 24, interval_minutes: int = 60, dereg_rate: float = 0.0,
+                    seed: int = 0, snapshot_format: str = "json", keyframe_interval: int = 0) -> List[Path]:
+    """
+    Write a synthetic snapshot history through the tracker's own save path.
+
+    Args:
+        data_dir: Directory to write snapshots into
+        subnets: Number of subnets
+        uids: UIDs per subnet
+        churn: Fraction of UIDs replaced between consecutive snapshots
+        history: Number of snapshots
+        interval_minutes: Time between snapshots
+        dereg_rate: Fraction of UIDs vacated between consecutive snapshots
+        seed: Random seed
+        snapshot_format: "json" or "binary"
+        keyframe_interval: Store every Nth snapshot in full and the rest as deltas
+
+    Returns:
+        Paths of the written snapshots, oldest first
+    """
+    network = SyntheticNetwork(subnets=subnets, uids=uids, churn=churn, dereg_rate=dereg_rate, seed=seed)
+    tracker = SubnetCompetitionTracker(data_dir=data_dir, snapshot_format=snapshot_format,
+                                       keyframe_interval=keyframe_interval)
+    start = datetime(2025, 1, 1)
+    paths = []
+    for i in range(history):
+        if i:
+            network.step(interval_minutes * BLOCKS_PER_MINUTE)
+        timestamp = (start + timedelta(minutes=i * interval_minutes)).isoformat()
+        paths.append(tracker.save_snapshot(network.snapshot(timestamp)))
+    return paths
+
+
+class _SubnetInfo:
+    """The SubnetInfo fields read by registration_costs.cost_record."""
+
+    def __init__(self, netuid: int, burn: float, max_n: int, subnetwork_n: int):
+        self.netuid = netuid
+        self.burn = burn
+        self.max_n = max_n
+        self.subnetwork_n = subnetwork_n
+        self.difficulty = 10_000_000
+        self.immunity_period = 5000
+        self.tempo = 360
+
+
+class _Metagraph:
+    """The metagraph attributes fetch_subnet_record reads."""
+
+    def __init__(self, mapping: Dict[int, str], block: int):
+        self.uids = np.array(list(mapping), dtype=np.int64)
+        self.hotkeys = list(mapping.values())
+        self.block = np.int64(block)
+
+
+class _ScaleValue:
+    """Mimics a SCALE-decoded object with a .value attribute."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeSubtensor:
+    """
+    Offline stand-in for bt.Subtensor backed by a SyntheticNetwork.
+
+    Every call sleeps for latency seconds and raises ConnectionError with
+    probability failure_rate, so retry and concurrency behaviour can be
+    measured without a node.
+    """
+
+    def __init__(self, network: Optional[SyntheticNetwork] = None, latency: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            network: Chain state to serve (default: a fresh SyntheticNetwork)
+            latency: Seconds added to every call
+            failure_rate: Probability that a call raises ConnectionError
+            seed: Seed for failure injection
+        """
+        self.chain = network or SyntheticNetwork(seed=seed)
+        self.network = "fake"
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+            fail = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("injected failure")
+
+    def get_current_block(self) -> int:
+        self._call()
+        return self.chain.block
+
+    def get_all_subnets_netuid(self, block: Optional[int] = None) -> List[int]:
+        self._call()
+        return list(self.chain.state_at(block))
+
+    def metagraph(self, netuid: int, block: Optional[int] = None, lite: bool = True) -> _Metagraph:
+        self._call()
+        return _Metagraph(self.chain.state_at(block)[netuid], block or self.chain.block)
+
+    def query_map_subtensor(self, name: str, block: Optional[int] = None, params: Optional[List] = None):
+        self._call()
+        if name != "Keys":
+            raise ValueError(f"FakeSubtensor has no storage map {name}")
+        mapping = self.chain.state_at(block).get(params[0], {})
+        return [(_ScaleValue(uid), _ScaleValue(hotkey)) for uid, hotkey in mapping.items()]
+
+    def query_module(self, module: str, name: str, block: Optional[int] = None, params: Optional[List] = None):
+        self._call()
+        if (module, name) != ("Timestamp", "Now"):
+            raise ValueError(f"FakeSubtensor has no storage item {module}.{name}")
+        return _ScaleValue(self.chain.timestamp_millis(block if block is not None else self.chain.block))
+
+    def get_all_subnets_info(self, block: Optional[int] = None) -> List[_SubnetInfo]:
+        self._call()
+        return [
+            _SubnetInfo(netuid, 0.001 * (netuid + 1), self.chain.uids, len(mapping))
+            for netuid, mapping in self.chain.subnets.items()
+        ]
+
+    def tempo(self, netuid: int, block: Optional[int] = None) -> int:
+        self._call()
+        return 360
+
+    def close(self):
+        pass
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discard the tracker's progress output."""
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            yield
+
+
+def measure(fn: Callable, repeat: int = 3, setup: Optional[Callable] = None) -> Dict:
+    """
+    Time fn over repeat runs, then run it once more under tracemalloc.
+
+    Args:
+        fn: Work to measure
+        repeat: Timed runs
+        setup: Called before every run, outside the timed region
+
+    Returns:
+        Best and median seconds and peak traced memory in MiB
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+        "peak_mib": peak / (1024 * 1024)
+    }
+
+
+def run_benchmarks(options: argparse.Namespace) -> Dict:
+    """
+    Generate a synthetic history and benchmark each stage against it.
+
+    Args:
+        options: Parsed command-line options
+
+    Returns:
+        Report with the configuration and one measurement per stage
+    """
+    root = Path(options.data_dir) if options.data_dir else Path(tempfile.mkdtemp(prefix="sct-bench-"))
+    history_dir = root / "history"
+    sweep_dir = root / "sweeps"
+    if history_dir.exists():
+        shutil.rmtree(history_dir)
+    history_dir.mkdir(parents=True)
+    sweep_dir.mkdir(parents=True, exist_ok=True)
+
+    stages = set(options.only.split(",")) if options.only else None
+    results = {}
+
+    def wanted(name: str) -> bool:
+        return stages is None or name in stages
+
+    history_bytes = 0
+    try:
+        with quiet():
+            started = time.perf_counter()
+            paths = generate_series(
+                str(history_dir), subnets=options.subnets, uids=options.uids, churn=options.churn,
+                history=options.history, dereg_rate=options.dereg_rate, seed=options.seed,
+                snapshot_format=options.format, keyframe_interval=options.keyframe_every
+            )
+            generate_seconds = time.perf_counter() - started
+        history_bytes = sum(path.stat().st_size for path in paths)
+
+        tracker = SubnetCompetitionTracker(data_dir=str(history_dir), diff_engine=options.diff_engine,
+                                           use_cache=False, jobs=options.jobs)
+
+        if wanted("snapshot"):
+            chain = SyntheticNetwork(subnets=options.subnets, uids=options.uids, churn=options.churn,
+                                     seed=options.seed)
+            fake = FakeSubtensor(chain, latency=options.latency_ms / 1000,
+                                 failure_rate=options.failure_rate, seed=options.seed)
+            collector = SubnetCompetitionTracker(data_dir=str(sweep_dir), workers=options.workers,
+                                                 lite=options.lite, snapshot_format=options.format)
+            collector._new_subtensor = lambda: fake
+
+            def sweep():
+                with quiet():
+                    collector.take_snapshot()
+
+            results["snapshot"] = measure(sweep, options.repeat, setup=chain.step)
+            results["snapshot"]["fake_calls"] = fake.calls
+            results["snapshot"]["fake_failures"] = fake.failures
+            collector.close()
+
+        if wanted("load"):
+            def load_all():
+                tracker._state_cache = None
+                for path in paths:
+                    tracker.load_snapshot(path)
+            results["load_snapshot"] = measure(load_all, options.repeat)
+            results["load_snapshot"]["per_file_ms"] = results["load_snapshot"]["best_s"] / len(paths) * 1000
+
+        if wanted("compare") and len(paths) > 1:
+            loaded = [tracker.load_snapshot(path) for path in paths]
+
+            def compare_all(snapshots=loaded):
+                for old, new in zip(snapshots, snapshots[1:]):
+                    tracker.compare_snapshots(old, new)
+            results["compare_snapshots"] = measure(compare_all, options.repeat)
+            results["compare_snapshots"]["per_pair_ms"] = (
+                results["compare_snapshots"]["best_s"] / (len(loaded) - 1) * 1000)
+            # Don't hold the loaded history through the analyze stage
+            del loaded, compare_all
+
+        analysis = {}
+        if wanted("analyze"):
+            def analyze():
+                with quiet():
+                    analysis["results"] = tracker.analyze_competition()
+            results["analyze_competition"] = measure(analyze, options.repeat)
+
+        if wanted("rank"):
+            if "results" not in analysis:
+                with quiet():
+                    analysis["results"] = tracker.analyze_competition()
+
+            def rank():
+                with quiet():
+                    for sort_by in ("replacements", "deregistrations", "percentage", "changes"):
+                        tracker.print_competition_ranking(analysis["results"], sort_by=sort_by)
+            results["ranking"] = measure(rank, options.repeat)
+    finally:
+        if not options.data_dir and not options.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "config": {
+            key: getattr(options, key)
+            for key in ("subnets", "uids", "churn", "dereg_rate", "history", "format", "keyframe_every",
+                        "diff_engine", "jobs", "workers", "lite", "latency_ms", "failure_rate", "repeat", "seed")
+        },
+        "python": sys.version.split()[0],
+        "generate_s": generate_seconds,
+        "history_bytes": history_bytes,
+        "stages": results
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None):
+    """Print a report, with the change against a baseline report when given."""
+    config = report["config"]
+    print("="*90)
+    print(f"BENCHMARK: {config['subnets']} subnets x {config['uids']} UIDs, {config['history']} snapshots, "
+          f"churn {config['churn']}, format {config['format']}, diff {config['diff_engine']}")
+    print("="*90)
+    print(f"{'Stage':<22} {'Best (s)':<12} {'Median (s)':<12} {'Peak MiB':<10} {'vs baseline':<12}")
+    print("-"*90)
+    for stage, stats in report["stages"].items():
+        change = ""
+        if baseline and stage in baseline.get("stages", {}):
+            before = baseline["stages"][stage]["best_s"]
+            change = f"{stats['best_s'] / before:.2f}x" if before > 0 else ""
+        print(f"{stage:<22} {stats['best_s']:<12.4f} {stats['median_s']:<12.4f} "
+              f"{stats['peak_mib']:<10.1f} {change:<12}")
+    print("="*90)
+
+
+def main():
+    """Benchmark CLI."""
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the subnet competition tracker")
+    parser.add_argument("--subnets", type=int, default=32, help="Synthetic subnets (default: 32)")
+    parser.add_argument("--uids", type=int, default=256, help="UIDs per subnet (default: 256)")
+    parser.add_argument("--churn", type=float, default=0.02,
+                        help="Fraction of UIDs replaced between snapshots (default: 0.02)")
+    parser.add_argument("--dereg-rate", type=float, default=0.0,
+                        help="Fraction of UIDs vacated between snapshots (default: 0)")
+    parser.add_argument("--history", type=int, default=24, help="Snapshots in the history (default: 24)")
+    parser.add_argument("--format", choices=["json", "binary"], default="json",
+                        help="Snapshot file format (default: json)")
+    parser.add_argument("--keyframe-every", type=int, default=0,
+                        help="Store every Nth snapshot in full and the rest as deltas (default: 0)")
+    parser.add_argument("--diff-engine", choices=["python", "numpy"], default="python",
+                        help="Diff implementation for compare/analyze (default: python)")
+    parser.add_argument("--jobs", type=int, default=1, help="Analyze worker processes (default: 1)")
+    parser.add_argument("--workers", type=int, default=1, help="Snapshot fetch workers (default: 1)")
+    parser.add_argument("--lite", action="store_true", help="Benchmark the lite collection path")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Latency added to every fake Subtensor call (default: 0)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability that a fake Subtensor call fails (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--only", help="Comma-separated stages: snapshot,load,compare,analyze,rank")
+    parser.add_argument("--data-dir", help="Write the synthetic data here instead of a temporary directory")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary directory")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier --output report to compare against")
+    options = parser.parse_args()
+
+    report = run_benchmarks(options)
+    baseline = None
+    if options.baseline:
+        with open(options.baseline, "r") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Shared pytest fixtures: trackers wired to the synthetic chain from benchmarks.py."""
+
+import pytest
+
+from benchmarks import FakeSubtensor
+from main import SubnetCompetitionTracker
+
+
+@pytest.fixture
+def make_tracker():
+    """Factory for trackers whose connections all read a SyntheticNetwork."""
+    def make(data_dir, chain, **kwargs) -> SubnetCompetitionTracker:
+        tracker = SubnetCompetitionTracker(data_dir=data_dir, use_cache=False, retries=0, **kwargs)
+        fake = FakeSubtensor(chain)
+        tracker._new_subtensor = lambda: fake
+        return tracker
+    return make
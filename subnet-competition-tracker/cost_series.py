@@ -0,0 +1,221 @@
+"""
+Registration cost time series.
+
+Burn cost and occupancy are recorded per subnet alongside each snapshot so
+churn can be related to the price of a slot. Rows are stored column by
+column in data_dir/registration_costs/, one append-only raw little-endian
+file per field:
+
+    time.i8             unix milliseconds of the snapshot the row was taken with
+    block.i8            block the costs were read at
+    netuid.i4
+    burn.f8             burn cost in TAO
+    subnetwork_n.i4     registered neurons
+    max_n.i4            slots
+    difficulty.u8
+    immunity_period.i4  blocks
+
+meta.json holds the committed row count. Appends truncate every column back
+to that count before writing, so a partly written row left by an
+interrupted run is discarded, and loading a column is one np.fromfile.
+
+Joining the series with per-pair churn is an as-of join (the latest cost
+row of the same subnet at or before each pair's start) done with
+searchsorted over (netuid << 44 | time) keys, and the per-subnet metrics
+are bincount reductions, so the work stays vectorized over long histories.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from snapshot_index import timestamp_millis
+
+COST_SERIES_DIRNAME = "registration_costs"
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("time", "<i8"),
+    ("block", "<i8"),
+    ("netuid", "<i4"),
+    ("burn", "<f8"),
+    ("subnetwork_n", "<i4"),
+    ("max_n", "<i4"),
+    ("difficulty", "<u8"),
+    ("immunity_period", "<i4"),
+)
+
+# Field of a registration_costs.cost_record for each stored column
+_RECORD_FIELDS = {
+    "netuid": "netuid",
+    "burn": "burn_cost_tao",
+    "subnetwork_n": "current_neurons",
+    "max_n": "max_neurons",
+    "difficulty": "difficulty",
+    "immunity_period": "immunity_period_blocks",
+}
+
+_TIME_BITS = 44
+
+
+class CostSeries:
+    """Append-only columnar store of per-subnet registration costs."""
+
+    def __init__(self, directory: Path):
+        """
+        Open the series, starting empty when it does not exist.
+
+        Args:
+            directory: Directory holding the column files
+        """
+        self.directory = Path(directory)
+        self.meta_path = self.directory / "meta.json"
+        try:
+            with open(self.meta_path, "r") as f:
+                self.rows = int(json.load(f)["rows"])
+        except (OSError, ValueError, KeyError):
+            self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _column_path(self, name: str, dtype: str) -> Path:
+        return self.directory / f"{name}.{dtype[1:]}"
+
+    def append(self, timestamp: str, block: int, costs: Dict[int, Dict]) -> int:
+        """
+        Append one sweep of registration costs.
+
+        Args:
+            timestamp: ISO timestamp of the snapshot taken in the same pass
+            block: Block the costs were read at
+            costs: RegistrationCostClient.get_all() result
+
+        Returns:
+            Number of rows appended
+        """
+        records = list(costs.values())
+        if not records:
+            return 0
+        self.directory.mkdir(exist_ok=True)
+
+        n = len(records)
+        values = {
+            "time": np.full(n, timestamp_millis(timestamp)),
+            "block": np.full(n, block),
+        }
+        for column, field in _RECORD_FIELDS.items():
+            values[column] = [record[field] for record in records]
+
+        for name, dtype in COLUMNS:
+            size = self.rows * np.dtype(dtype).itemsize
+            with open(self._column_path(name, dtype), "ab") as f:
+                f.truncate(size)
+                f.write(np.asarray(values[name], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.rows += n
+        tmp = self.meta_path.with_name(f".{self.meta_path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"rows": self.rows, "columns": [name for name, _ in COLUMNS]}, f)
+        os.replace(tmp, self.meta_path)
+        return n
+
+    def load(self) -> Dict[str, np.ndarray]:
+        """Every committed row, as one array per column."""
+        columns = {}
+        for name, dtype in COLUMNS:
+            path = self._column_path(name, dtype)
+            if self.rows and path.exists():
+                columns[name] = np.fromfile(path, dtype=dtype, count=self.rows)
+            else:
+                columns[name] = np.zeros(0, dtype=dtype)
+        return columns
+
+
+def churn_cost_metrics(costs: Dict[str, np.ndarray], pair_times: List[Tuple[int, int]],
+                       pair_summaries: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Relate per-pair churn to the registration cost in effect when each pair started.
+
+    Every (pair, subnet) with a cost row recorded no earlier than one pair
+    length before the pair's start is an observation, including pairs in
+    which the subnet had no changes.
+
+    Args:
+        costs: CostSeries.load() columns
+        pair_times: (old, new) unix milliseconds of each snapshot pair
+        pair_summaries: summarize_changes() result of each pair, aligned with pair_times
+
+    Returns:
+        Dictionary mapping netuid to burn, replacements per TAO of burn and
+        churn per period when the subnet was full vs not full
+    """
+    if not len(costs["netuid"]) or not pair_times:
+        return {}
+
+    cost_netuids = costs["netuid"].astype(np.int64)
+    cost_keys = (cost_netuids << _TIME_BITS) | costs["time"]
+    order = np.argsort(cost_keys, kind="stable")
+    cost_keys = cost_keys[order]
+    burn = costs["burn"][order]
+    full = costs["subnetwork_n"][order] >= costs["max_n"][order]
+    cost_times = costs["time"][order]
+
+    # Observation grid: every pair x every subnet seen in the series
+    netuids = np.unique(cost_netuids)
+    column_of = {int(netuid): i for i, netuid in enumerate(netuids)}
+    times = np.array(pair_times, dtype=np.int64).reshape(-1, 2)
+    replacements = np.zeros((len(times), len(netuids)), dtype=np.int64)
+    changes = np.zeros((len(times), len(netuids)), dtype=np.int64)
+    for row, summary in enumerate(pair_summaries):
+        for netuid, counters in summary.items():
+            column = column_of.get(int(netuid))
+            if column is not None:
+                replacements[row, column] = counters["total_replacements"]
+                changes[row, column] = counters["total_changes"]
+
+    obs_netuids = np.tile(netuids, len(times))
+    obs_start = np.repeat(times[:, 0], len(netuids))
+    obs_span = np.repeat(times[:, 1] - times[:, 0], len(netuids))
+    replacements = replacements.ravel()
+    changes = changes.ravel()
+
+    # As-of join: last cost row of the same subnet at or before the pair start
+    positions = np.searchsorted(cost_keys, (obs_netuids << _TIME_BITS) | obs_start, side="right") - 1
+    clipped = np.maximum(positions, 0)
+    matched = ((positions >= 0)
+               & ((cost_keys[clipped] >> _TIME_BITS) == obs_netuids)
+               & (cost_times[clipped] >= obs_start - obs_span))
+
+    columns = np.searchsorted(netuids, obs_netuids[matched])
+    obs_burn = burn[clipped[matched]]
+    obs_full = full[clipped[matched]]
+    obs_replacements = replacements[matched]
+    obs_changes = changes[matched]
+
+    size = len(netuids)
+    periods = np.bincount(columns, minlength=size)
+    burn_sum = np.bincount(columns, weights=obs_burn, minlength=size)
+    replacement_sum = np.bincount(columns, weights=obs_replacements, minlength=size)
+    burned = np.bincount(columns, weights=obs_replacements * obs_burn, minlength=size)
+    full_periods = np.bincount(columns, weights=obs_full, minlength=size)
+    full_changes = np.bincount(columns, weights=obs_changes * obs_full, minlength=size)
+    open_changes = np.bincount(columns, weights=obs_changes * ~obs_full, minlength=size)
+
+    metrics = {}
+    for i in np.flatnonzero(periods):
+        open_periods = periods[i] - full_periods[i]
+        metrics[str(int(netuids[i]))] = {
+            "cost_periods": int(periods[i]),
+            "avg_burn_tao": float(burn_sum[i] / periods[i]),
+            "replacements_per_tao": float(replacement_sum[i] / burn_sum[i]) if burn_sum[i] > 0 else None,
+            "replacement_burn_tao": float(burned[i]),
+            "full_periods": int(full_periods[i]),
+            "churn_when_full": float(full_changes[i] / full_periods[i]) if full_periods[i] else None,
+            "churn_when_not_full": float(open_changes[i] / open_periods) if open_periods else None,
+        }
+    return metrics
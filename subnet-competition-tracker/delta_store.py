@@ -0,0 +1,170 @@
+"""
+Keyframe + delta snapshot storage.
+
+Consecutive snapshots differ in only a handful of UIDs, so storing every
+sweep in full wastes most of the disk. With a keyframe interval of N, every
+Nth snapshot is written in full (a keyframe) and the ones in between are
+written as deltas against the previous snapshot:
+
+    {
+      "timestamp": "...",
+      "network": "finney",
+      "delta": {"keyframe": "snapshot_<ts>", "previous": "snapshot_<ts>"},
+      "subnets": {
+        "1": {"n_neurons": 256, "block": 1234567, "digest": "9f2c...",
+              "set": {"12": "5F..."}, "unset": ["40"]}
+      },
+      "removed_subnets": ["77"]
+    }
+
+Every subnet present in the new snapshot carries its n_neurons, block and
+map digest; "set" and "unset" are only written when UIDs changed. A subnet that failed
+to fetch is stored as {"missing": true}, and the first delta after such a
+gap sets its whole map again. Any point in time is
+rebuilt by loading the nearest earlier keyframe and replaying the deltas
+after it in order. Files are referenced by stem (name without suffix), so a
+keyframe converted from JSON to binary keeps its chain intact.
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+DELTA_SUFFIX = ".delta.json"
+
+
+def is_delta_path(path: Path) -> bool:
+    """Whether a snapshot path holds a delta rather than a full snapshot."""
+    return Path(path).name.endswith(DELTA_SUFFIX)
+
+
+def snapshot_stem(path: Path) -> str:
+    """File name without its format suffix (.json, .sctb or .delta.json)."""
+    name = Path(path).name
+    if name.endswith(DELTA_SUFFIX):
+        return name[:-len(DELTA_SUFFIX)]
+    return Path(name).stem
+
+
+def build_delta(old_snapshot: Dict, new_snapshot: Dict, changes: Dict[str, Dict],
+                keyframe: str, previous: str) -> Dict:
+    """
+    Encode new_snapshot as a delta against old_snapshot.
+
+    Args:
+        old_snapshot: Full state of the previous snapshot
+        new_snapshot: Full state being stored
+        changes: compare_snapshots(old_snapshot, new_snapshot)
+        keyframe: Stem of the keyframe this delta chain starts from
+        previous: Stem of the snapshot this delta applies to
+
+    Returns:
+        Delta document in the layout described in the module docstring
+    """
+    old_subnets = old_snapshot.get("subnets", {})
+    new_subnets = new_snapshot.get("subnets", {})
+
+    subnets = {}
+    for netuid, data in new_subnets.items():
+        if data.get("missing"):
+            subnets[netuid] = {"missing": True}
+            continue
+        record = {"n_neurons": data.get("n_neurons"), "block": data.get("block")}
+        if data.get("digest"):
+            record["digest"] = data["digest"]
+        change = changes.get(netuid)
+        if old_subnets.get(netuid, {}).get("missing"):
+            # compare_snapshots skips subnets missing on either side
+            if data.get("uid_hotkey_map"):
+                record["set"] = dict(data["uid_hotkey_map"])
+        elif change:
+            updates = {}
+            for item in change["replacements"]:
+                updates[str(item["uid"])] = item["new_hotkey"]
+            for item in change["new_registrations"]:
+                updates[str(item["uid"])] = item["hotkey"]
+            if updates:
+                record["set"] = updates
+            if change["deregistrations"]:
+                record["unset"] = [str(item["uid"]) for item in change["deregistrations"]]
+        subnets[netuid] = record
+
+    return {
+        "timestamp": new_snapshot.get("timestamp"),
+        "network": new_snapshot.get("network"),
+        "delta": {"keyframe": keyframe, "previous": previous},
+        "subnets": subnets,
+        "removed_subnets": sorted(set(old_subnets) - set(new_subnets), key=int)
+    }
+
+
+def apply_delta(state: Dict, delta: Dict) -> Dict:
+    """
+    Replay a delta on top of a full snapshot state.
+
+    The input state is left untouched: the subnets mapping is copied and
+    only subnets whose UIDs changed get a fresh uid_hotkey_map, so callers
+    can keep holding the previous state (as analyze does for each pair).
+    Unchanged maps are shared as they are, so a lazily loaded keyframe map
+    stays undecoded down the chain.
+
+    Args:
+        state: Full snapshot the delta was built against
+        delta: Delta document from build_delta()
+
+    Returns:
+        Full snapshot state at the delta's timestamp
+    """
+    old_subnets = state.get("subnets", {})
+    subnets = {}
+    for netuid, record in delta.get("subnets", {}).items():
+        if record.get("missing"):
+            subnets[netuid] = {"missing": True}
+            continue
+        previous = old_subnets.get(netuid, {})
+        mapping = previous.get("uid_hotkey_map", {})
+        digest = record.get("digest")
+        if "set" in record or "unset" in record:
+            mapping = dict(mapping)
+            for uid in record.get("unset", []):
+                mapping.pop(uid, None)
+            mapping.update(record.get("set", {}))
+        elif digest is None:
+            # Unchanged map: the previous digest still holds
+            digest = previous.get("digest")
+        subnets[netuid] = {
+            "uid_hotkey_map": mapping,
+            "n_neurons": record.get("n_neurons"),
+            "block": record.get("block")
+        }
+        if digest:
+            subnets[netuid]["digest"] = digest
+
+    return {
+        "timestamp": delta.get("timestamp"),
+        "network": delta.get("network"),
+        "subnets": subnets
+    }
+
+
+def delta_chain(snapshots: List[Path], target: Path) -> List[Path]:
+    """
+    Files needed to rebuild target, from its keyframe up to target itself.
+
+    Args:
+        snapshots: All snapshot paths sorted by timestamp
+        target: The snapshot to rebuild
+
+    Returns:
+        [keyframe, delta, ..., target]
+    """
+    target = Path(target)
+    position = next((i for i, path in enumerate(snapshots) if path == target), None)
+    if position is None:
+        raise ValueError(f"{target} is not in the snapshot directory")
+
+    start = position
+    while start >= 0 and is_delta_path(snapshots[start]):
+        start -= 1
+    if start < 0:
+        raise ValueError(f"No keyframe found before {target.name}")
+    return snapshots[start:position + 1]
@@ -0,0 +1,225 @@
+"""
+Vectorized snapshot diff engine.
+
+compare_snapshots rebuilds int-keyed dicts for both sides of every subnet
+and walks the union of UIDs in Python. This engine turns each snapshot into
+two aligned arrays covering every subnet at once: a sorted key column
+(netuid << 32 | uid) and the interned hotkey id at that slot. A pair is then
+diffed in one pass over the union of keys:
+
+    present_old = old_id != ABSENT
+    present_new = new_id != ABSENT
+    replacements      = present_old & present_new & (old_id != new_id)
+    deregistrations   = present_old & ~present_new
+    new_registrations = present_new & ~present_old
+
+and per-subnet counts come from a bincount over the netuid column. Empty
+hotkey strings are treated as absent, matching the truthiness checks in
+compare_snapshots, so the counts are identical. Subnets marked missing on
+either side are dropped from the pair, as compare_snapshots skips them.
+
+Subnets whose map digests match on both sides cannot have changed. Their
+slots are masked out of the pair's key union, like missing subnets, so
+they are never aligned or counted. Each snapshot is still vectorized whole
+and only once, so the new side of one pair is reused as the old side of
+the next.
+"""
+
+import itertools
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+ABSENT = -1
+_UID_BITS = 32
+
+
+class HotkeyInterner:
+    """
+    Assigns stable integer ids to hotkey strings.
+
+    Ids are unique but not dense: interning a whole snapshot goes through
+    dict.setdefault with a running counter so the loop stays in C, and the
+    counter also advances for hotkeys that were already known.
+    """
+
+    def __init__(self):
+        # Empty and missing hotkeys count as absent slots
+        self._ids: Dict[str, int] = {"": ABSENT, None: ABSENT}
+        self._counter = itertools.count()
+        self._reverse: Dict[int, str] = {}
+        self._reverse_size = 0
+
+    def __len__(self) -> int:
+        return len(self._ids) - 2
+
+    def intern_many(self, hotkeys: Iterable[str], count: int) -> np.ndarray:
+        """Ids for a sequence of hotkeys, allocating new ones on first sight."""
+        return np.fromiter(map(self._ids.setdefault, hotkeys, self._counter), dtype=np.int64, count=count)
+
+    def hotkey(self, idx: int) -> str:
+        """Hotkey string for an id."""
+        if self._reverse_size != len(self._ids):
+            self._reverse = {v: k for k, v in self._ids.items() if v != ABSENT}
+            self._reverse_size = len(self._ids)
+        return self._reverse[int(idx)]
+
+
+class SnapshotVectors:
+    """Column form of one snapshot: sorted slot keys, hotkey ids and per-subnet sizes."""
+
+    __slots__ = ("keys", "ids", "map_sizes", "missing")
+
+    def __init__(self, keys: np.ndarray, ids: np.ndarray, map_sizes: Dict[int, int], missing: List[int]):
+        self.keys = keys
+        self.ids = ids
+        self.map_sizes = map_sizes
+        self.missing = missing
+
+
+class VectorizedDiffEngine:
+    """
+    Array-based replacement for compare_snapshots.
+
+    The engine remembers the vectors of the last snapshots it saw, so when
+    pairs are compared in sequence (as analyze does) the new side of one
+    pair is reused as the old side of the next instead of being rebuilt.
+    """
+
+    def __init__(self):
+        self.interner = HotkeyInterner()
+        self._memo: List[Tuple[Dict, SnapshotVectors]] = []
+
+    def vectorize(self, snapshot: Dict, memoize: bool = True) -> SnapshotVectors:
+        """
+        Column form of a snapshot, reusing recently built ones.
+
+        Args:
+            snapshot: Snapshot dict as returned by load_snapshot()
+            memoize: Remember the vectors for the next pair
+
+        Returns:
+            SnapshotVectors covering every subnet
+        """
+        for seen, vectors in self._memo:
+            if seen is snapshot:
+                return vectors
+
+        subnets = snapshot.get("subnets", {})
+        mappings = [
+            (int(netuid), data.get("uid_hotkey_map", {}))
+            for netuid, data in subnets.items() if not data.get("missing")
+        ]
+        missing = [int(netuid) for netuid, data in subnets.items() if data.get("missing")]
+        sizes = [len(mapping) for _, mapping in mappings]
+        total = sum(sizes)
+
+        netuids = np.repeat(np.array([netuid for netuid, _ in mappings], dtype=np.int64),
+                            np.array(sizes, dtype=np.int64))
+        uids = np.fromiter(itertools.chain.from_iterable(map(int, m) for _, m in mappings),
+                           dtype=np.int64, count=total)
+        ids = self.interner.intern_many(
+            itertools.chain.from_iterable(m.values() for _, m in mappings), total)
+
+        keys = (netuids << _UID_BITS) | uids
+        order = np.argsort(keys, kind="stable")
+        vectors = SnapshotVectors(keys[order], ids[order],
+                                  {netuid: size for (netuid, _), size in zip(mappings, sizes)}, missing)
+
+        if memoize:
+            # Holding the snapshot keeps its id() from being reused while memoized
+            self._memo = (self._memo + [(snapshot, vectors)])[-2:]
+        return vectors
+
+    @staticmethod
+    def _align(vectors: SnapshotVectors, keys: np.ndarray) -> np.ndarray:
+        """Hotkey ids of vectors at each of keys, ABSENT where the slot is missing."""
+        if len(vectors.keys) == 0:
+            return np.full(len(keys), ABSENT, dtype=np.int64)
+        positions = np.searchsorted(vectors.keys, keys)
+        clipped = np.minimum(positions, len(vectors.keys) - 1)
+        found = vectors.keys[clipped] == keys
+        return np.where(found, vectors.ids[clipped], ABSENT)
+
+    def compare(self, old_snapshot: Dict, new_snapshot: Dict, materialize: bool = True) -> Dict[str, Dict]:
+        """
+        Compare two snapshots, producing the same result as compare_snapshots.
+
+        Args:
+            old_snapshot: Earlier snapshot
+            new_snapshot: Later snapshot
+            materialize: Build the per-UID change lists; when False only the
+                counts are returned and the list fields are omitted
+
+        Returns:
+            Dictionary mapping netuid to change statistics
+        """
+        old_subnets = old_snapshot.get("subnets", {})
+        new_subnets = new_snapshot.get("subnets", {})
+        unchanged = [
+            int(netuid) for netuid, data in new_subnets.items()
+            if data.get("digest") and data.get("digest") == old_subnets.get(netuid, {}).get("digest")
+        ]
+        old = self.vectorize(old_snapshot)
+        new = self.vectorize(new_snapshot)
+
+        # Sorted union of slot keys (np.union1d's hash-based unique is slower here)
+        keys = np.concatenate([old.keys, new.keys])
+        keys.sort(kind="stable")
+        if len(keys):
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        skipped = old.missing + new.missing + unchanged
+        if skipped:
+            keys = keys[~np.isin(keys >> _UID_BITS, skipped)]
+        old_ids = self._align(old, keys)
+        new_ids = self._align(new, keys)
+
+        present_old = old_ids != ABSENT
+        present_new = new_ids != ABSENT
+        replaced = present_old & present_new & (old_ids != new_ids)
+        deregistered = present_old & ~present_new
+        registered = present_new & ~present_old
+
+        if not len(keys):
+            return {}
+
+        # Keys are sorted, so each subnet is a contiguous run; reduce each mask per run
+        subnet_of_key = keys >> _UID_BITS
+        starts = np.concatenate(([0], np.flatnonzero(subnet_of_key[1:] != subnet_of_key[:-1]) + 1))
+        ends = np.append(starts[1:], len(keys))
+        netuids = subnet_of_key[starts]
+        replacement_counts = np.add.reduceat(replaced.astype(np.int64), starts)
+        deregistration_counts = np.add.reduceat(deregistered.astype(np.int64), starts)
+        registration_counts = np.add.reduceat(registered.astype(np.int64), starts)
+        totals = replacement_counts + deregistration_counts + registration_counts
+
+        changes = {}
+        uid_mask = (1 << _UID_BITS) - 1
+        hotkey = self.interner.hotkey
+        for position in np.flatnonzero(totals):
+            netuid = int(netuids[position])
+            change = {
+                "total_changes": int(totals[position]),
+                "replacement_count": int(replacement_counts[position]),
+                "new_registration_count": int(registration_counts[position]),
+                "deregistration_count": int(deregistration_counts[position]),
+                "total_uids_old": old.map_sizes.get(netuid, 0),
+                "total_uids_new": new.map_sizes.get(netuid, 0)
+            }
+            if materialize:
+                lo, hi = starts[position], ends[position]
+                change["replacements"] = [
+                    {"uid": int(keys[i] & uid_mask), "old_hotkey": hotkey(old_ids[i]), "new_hotkey": hotkey(new_ids[i])}
+                    for i in lo + np.flatnonzero(replaced[lo:hi])
+                ]
+                change["new_registrations"] = [
+                    {"uid": int(keys[i] & uid_mask), "hotkey": hotkey(new_ids[i])}
+                    for i in lo + np.flatnonzero(registered[lo:hi])
+                ]
+                change["deregistrations"] = [
+                    {"uid": int(keys[i] & uid_mask), "hotkey": hotkey(old_ids[i])}
+                    for i in lo + np.flatnonzero(deregistered[lo:hi])
+                ]
+            changes[str(netuid)] = change
+
+        return changes
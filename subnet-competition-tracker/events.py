@@ -0,0 +1,345 @@
+"""
+Event-driven churn ingestion.
+
+Snapshot diffing only sees the state at each sweep, so a UID that changes
+hands twice between sweeps counts as one replacement. This module instead
+scans blocks for SubtensorModule registration events and appends every
+slot change to an append-only JSONL log:
+
+    {"block": 4123456, "netuid": 8, "uid": 12, "kind": "replacement",
+     "hotkey": "5F...", "old_hotkey": "5D..."}
+
+kind is one of "replacement", "new_registration" or "deregistration".
+Registrations are classified against the slot state the ingestor keeps
+(seeded from the latest snapshot when available). A checkpointed cursor
+records the scanned block range, the log size and the size of each
+subnet:
+
+    {"first_block": 4123001, "last_block": 4125400, "log_size": 183220,
+     "subnet_sizes": {"8": 256, ...}}
+
+The slot state itself is not saved. A resumed run rebuilds it from the
+newest snapshot inside the scanned range and the logged events after each
+subnet's block in it (or from the log alone when there is none), so an
+interrupted run resumes exactly where it stopped without duplicating
+events.
+
+Chain access goes through a small source interface (get_current_block,
+get_block_events), so FakeChain can stand in for a node in tests.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+EVENT_LOG_FILENAME = "events.jsonl"
+CURSOR_FILENAME = "events_cursor.json"
+
+
+def _attributes(event: Dict) -> List:
+    """Positional attributes of a decoded event, whatever shape the decoder produced."""
+    attributes = event.get("attributes", [])
+    if isinstance(attributes, dict):
+        return list(attributes.values())
+    if isinstance(attributes, (list, tuple)):
+        return [a.get("value") if isinstance(a, dict) and "value" in a else a for a in attributes]
+    return [attributes]
+
+
+class SubtensorEventSource:
+    """Reads registration events from a Subtensor node."""
+
+    def __init__(self, subtensor):
+        """
+        Args:
+            subtensor: Connected bt.Subtensor
+        """
+        self.subtensor = subtensor
+
+    def get_current_block(self) -> int:
+        return int(self.subtensor.get_current_block())
+
+    def get_block_events(self, block: int) -> List[Dict]:
+        """
+        Normalized registration events in a block.
+
+        Returns:
+            [{"kind": "registered", "netuid", "uid", "hotkey"} |
+             {"kind": "subnet_removed", "netuid"}, ...]
+        """
+        substrate = self.subtensor.substrate
+        block_hash = substrate.get_block_hash(block)
+        events = []
+        for record in substrate.get_events(block_hash=block_hash):
+            record = getattr(record, "value", record)
+            event = record.get("event", record)
+            if event.get("module_id") != "SubtensorModule":
+                continue
+            name = event.get("event_id")
+            attributes = _attributes(event)
+            if name == "NeuronRegistered" and len(attributes) >= 3:
+                netuid, uid, hotkey = attributes[:3]
+                events.append({"kind": "registered", "netuid": int(netuid), "uid": int(uid), "hotkey": str(hotkey)})
+            elif name == "NetworkRemoved" and attributes:
+                events.append({"kind": "subnet_removed", "netuid": int(attributes[0])})
+        return events
+
+
+class FakeChain:
+    """In-memory chain exposing the same interface as SubtensorEventSource."""
+
+    def __init__(self, head: int = 0):
+        self.head = head
+        self.blocks: Dict[int, List[Dict]] = {}
+
+    def register(self, block: int, netuid: int, uid: int, hotkey: str):
+        """Emit a NeuronRegistered event at block."""
+        self.blocks.setdefault(block, []).append(
+            {"kind": "registered", "netuid": netuid, "uid": uid, "hotkey": hotkey})
+        self.head = max(self.head, block)
+
+    def remove_subnet(self, block: int, netuid: int):
+        """Emit a NetworkRemoved event at block."""
+        self.blocks.setdefault(block, []).append({"kind": "subnet_removed", "netuid": netuid})
+        self.head = max(self.head, block)
+
+    def get_current_block(self) -> int:
+        return self.head
+
+    def get_block_events(self, block: int) -> List[Dict]:
+        return list(self.blocks.get(block, []))
+
+
+class EventIngestor:
+    """Scans block ranges into the append-only event log with a resumable cursor."""
+
+    def __init__(self, source, data_dir: Path):
+        """
+        Args:
+            source: SubtensorEventSource, FakeChain or anything with the same methods
+            data_dir: Directory holding the event log and cursor
+        """
+        self.source = source
+        self.data_dir = Path(data_dir)
+        self.log_path = self.data_dir / EVENT_LOG_FILENAME
+        self.cursor_path = self.data_dir / CURSOR_FILENAME
+        self.cursor = self._load_cursor()
+        # netuid -> uid -> hotkey; None until seeded or rebuilt
+        self.slots: Optional[Dict[str, Dict[str, str]]] = None
+
+    def _load_cursor(self) -> Dict:
+        try:
+            with open(self.cursor_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"last_block": None, "first_block": None, "log_size": 0, "subnet_sizes": {}}
+
+    def _save_cursor(self):
+        tmp = self.cursor_path.with_name(f".{self.cursor_path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.cursor, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.cursor_path)
+
+    @staticmethod
+    def _snapshot_slots(snapshot: Dict) -> Dict[str, Dict[str, str]]:
+        return {
+            str(netuid): {str(uid): hotkey for uid, hotkey in data.get("uid_hotkey_map", {}).items() if hotkey}
+            for netuid, data in snapshot.get("subnets", {}).items() if not data.get("missing")
+        }
+
+    def seed(self, snapshot: Dict, block: int):
+        """
+        Initialize slot state from a snapshot before the first ingest.
+
+        Args:
+            snapshot: Snapshot whose uid_hotkey_map values become the known slot holders
+            block: Block the snapshot was taken at; ingestion starts after it
+        """
+        if self.cursor["last_block"] is not None:
+            return
+        self.slots = self._snapshot_slots(snapshot)
+        self.cursor["last_block"] = block
+        self.cursor["first_block"] = block + 1
+
+    def rebuild(self, snapshot: Optional[Dict] = None) -> int:
+        """
+        Rebuild the slot state at the cursor from a snapshot and the committed log.
+
+        Args:
+            snapshot: A snapshot read inside the scanned block range, whose
+                subnets replace the logged events up to their own block
+                (default: replay the whole log)
+
+        Returns:
+            Number of logged events replayed
+        """
+        self.slots = self._snapshot_slots(snapshot) if snapshot is not None else {}
+        read_at = {}
+        if snapshot is not None:
+            read_at = {str(netuid): data["block"] for netuid, data in snapshot.get("subnets", {}).items()
+                       if not data.get("missing") and data.get("block") is not None}
+        replayed = 0
+        for event in read_events(self.log_path, self.cursor["log_size"]):
+            netuid = str(event["netuid"])
+            if netuid in read_at and event["block"] <= read_at[netuid]:
+                continue
+            subnet = self.slots.setdefault(netuid, {})
+            if event["kind"] == "deregistration":
+                subnet.pop(str(event["uid"]), None)
+                if not subnet:
+                    # Deregistrations come from a removed subnet, one per slot
+                    del self.slots[netuid]
+            else:
+                subnet[str(event["uid"])] = event["hotkey"]
+            replayed += 1
+        return replayed
+
+    def _classify(self, block: int, event: Dict) -> List[Dict]:
+        """Turn a chain event into slot-change records, updating slot state."""
+        slots = self.slots
+        netuid = str(event["netuid"])
+
+        if event["kind"] == "subnet_removed":
+            removed = slots.pop(netuid, {})
+            return [
+                {"block": block, "netuid": event["netuid"], "uid": int(uid), "kind": "deregistration", "hotkey": hotkey}
+                for uid, hotkey in removed.items()
+            ]
+
+        uid = str(event["uid"])
+        subnet = slots.setdefault(netuid, {})
+        old_hotkey = subnet.get(uid)
+        subnet[uid] = event["hotkey"]
+        record = {"block": block, "netuid": event["netuid"], "uid": event["uid"], "hotkey": event["hotkey"]}
+        if old_hotkey and old_hotkey != event["hotkey"]:
+            record.update(kind="replacement", old_hotkey=old_hotkey)
+        elif old_hotkey:
+            # Same hotkey re-registered into its own slot: no ownership change
+            return []
+        else:
+            record["kind"] = "new_registration"
+        return [record]
+
+    def ingest(self, from_block: Optional[int] = None, to_block: Optional[int] = None,
+               batch_blocks: int = 100) -> int:
+        """
+        Scan blocks after the cursor (or from from_block) up to to_block.
+
+        The log and cursor are committed together every batch_blocks
+        blocks. On start the log is truncated back to the size recorded in
+        the cursor, discarding anything appended after the last checkpoint.
+        A resumed run rebuilds its slot state from the log alone unless
+        rebuild() or seed() was called first.
+
+        Args:
+            from_block: First block to scan when there is no cursor yet
+            to_block: Last block to scan (default: chain head)
+            batch_blocks: Blocks per checkpoint
+
+        Returns:
+            Number of events appended
+
+        Raises:
+            ValueError: If there is no cursor yet and no from_block
+        """
+        if self.cursor["last_block"] is None:
+            if from_block is None:
+                raise ValueError("No ingest cursor yet; give the first block to scan")
+            start = from_block
+            self.cursor["first_block"] = start
+            self.slots = {}
+        else:
+            start = self.cursor["last_block"] + 1
+        head = self.source.get_current_block()
+        to_block = head if to_block is None else min(to_block, head)
+
+        if self.log_path.exists() and self.log_path.stat().st_size != self.cursor["log_size"]:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(self.cursor["log_size"])
+        if self.slots is None:
+            self.rebuild()
+
+        appended = 0
+        with open(self.log_path, "a") as log:
+            for batch_start in range(start, to_block + 1, batch_blocks):
+                batch_end = min(batch_start + batch_blocks - 1, to_block)
+                for block in range(batch_start, batch_end + 1):
+                    for event in self.source.get_block_events(block):
+                        for record in self._classify(block, event):
+                            log.write(json.dumps(record) + "\n")
+                            appended += 1
+                log.flush()
+                os.fsync(log.fileno())
+                self.cursor["last_block"] = batch_end
+                self.cursor["log_size"] = log.tell()
+                self.cursor["subnet_sizes"] = {netuid: len(slots) for netuid, slots in self.slots.items()}
+                self._save_cursor()
+                print(f"  Scanned blocks {batch_start}-{batch_end} ({appended} events so far)")
+        return appended
+
+
+def read_events(log_path: Path, size: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Iterate over the records in an event log.
+
+    Args:
+        log_path: Event log to read
+        size: Only read the first size bytes (the committed part of the log)
+    """
+    try:
+        with open(log_path, "rb") as f:
+            read = 0
+            for line in f:
+                read += len(line)
+                if size is not None and read > size:
+                    return
+                if line.strip():
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
+
+
+def summarize_events(log_path: Path, cursor: Dict, period_blocks: int) -> Dict[str, Dict]:
+    """
+    Aggregate an event log into analyze_competition's per-subnet counters.
+
+    Every subnet is observed over the same scanned block range, so
+    time_periods is the number of period_blocks windows in that range and
+    the subnet size comes from the cursor's subnet_sizes.
+
+    Args:
+        log_path: Event log to read
+        cursor: Ingestor cursor (first/last block and subnet sizes)
+        period_blocks: Blocks per analysis period
+
+    Returns:
+        Dictionary mapping netuid to subnet_stats counters
+    """
+    if cursor.get("last_block") is None or cursor.get("first_block") is None:
+        return {}
+    span = cursor["last_block"] - cursor["first_block"] + 1
+    periods = max(1, -(-span // period_blocks))
+
+    counts: Dict[str, Dict[str, int]] = {}
+    for event in read_events(log_path, cursor.get("log_size")):
+        netuid = str(event["netuid"])
+        stats = counts.setdefault(netuid, {"replacement": 0, "new_registration": 0, "deregistration": 0})
+        stats[event["kind"]] += 1
+
+    subnet_stats = {}
+    sizes = cursor.get("subnet_sizes", {})
+    for netuid, stats in counts.items():
+        n_uids = sizes.get(netuid, 0)
+        subnet_stats[netuid] = {
+            "total_replacements": stats["replacement"],
+            "total_new_registrations": stats["new_registration"],
+            "total_deregistrations": stats["deregistration"],
+            "total_changes": stats["replacement"] + stats["new_registration"] + stats["deregistration"],
+            "time_periods": periods,
+            "total_uids": n_uids * periods,
+            "uid_samples": periods
+        }
+    return subnet_stats
@@ -7,7 +7,20 @@ registration costs using the Bittensor SDK.
 """
 
 import sys
-import bittensor as bt
+
+from registration_costs import RegistrationCostClient
+
+
+# One client per network, shared by every example so all lookups reuse a single
+# connection and the block-keyed cache of the batched subnet-info fetch
+_clients = {}
+
+
+def get_cost_client(network: str = "finney") -> RegistrationCostClient:
+    """Shared registration cost client for a network."""
+    if network not in _clients:
+        _clients[network] = RegistrationCostClient(network=network)
+    return _clients[network]
 
 
 def get_registration_cost(netuid: int, network: str = "finney") -> dict:
@@ -21,24 +34,7 @@ def get_registration_cost(netuid: int, network: str = "finney") -> dict:
     Returns:
         Dictionary with cost and subnet information
     """
-    st = bt.Subtensor(network=network)
-    info = st.get_subnet_info(netuid=netuid)
-
-    # Parse burn cost (comes as Balance object like "τ0.004396")
-    cost_tao = float(str(info.burn).replace('τ', ''))
-
-    return {
-        "netuid": netuid,
-        "burn_cost_tao": cost_tao,
-        "burn_cost_alpha": info.burn,  # Original Balance object
-        "max_neurons": info.max_n,
-        "current_neurons": info.subnetwork_n,
-        "occupancy_percent": (info.subnetwork_n / info.max_n * 100) if info.max_n > 0 else 0,
-        "is_full": info.subnetwork_n >= info.max_n,
-        "difficulty": info.difficulty,
-        "immunity_period_blocks": info.immunity_period,
-        "tempo": info.tempo
-    }
+    return get_cost_client(network).get(netuid)
 
 
 def compare_registration_costs(netuids: list, network: str = "finney"):
@@ -58,9 +54,23 @@ def compare_registration_costs(netuids: list, network: str = "finney"):
           f"{'Full':<6} {'Difficulty':<15}")
     print("-"*100)
 
+    client = get_cost_client(network)
+    try:
+        all_costs = client.get_all()
+    except Exception as e:
+        print(f"Error fetching registration costs: {e}", file=sys.stderr)
+        return
+    errors = client.errors()
+
     costs = []
     for netuid in netuids:
-        info = get_registration_cost(netuid, network)
+        if netuid in errors:
+            print(f"Error fetching subnet {netuid}: {errors[netuid]}")
+            continue
+        if netuid not in all_costs:
+            print(f"Subnet {netuid} not found on {network}")
+            continue
+        info = all_costs[netuid]
         costs.append(info)
 
         print(f"{info['netuid']:<8} "
@@ -70,6 +80,10 @@ def compare_registration_costs(netuids: list, network: str = "finney"):
               f"{'Yes' if info['is_full'] else 'No':<6} "
               f"{info['difficulty']:<15,}")
 
+    if not costs:
+        print("\nNo registration costs to compare.")
+        return
+
     print()
     print("="*100)
     print("COST ANALYSIS")
@@ -152,8 +166,15 @@ def get_all_subnet_costs(network: str = "finney", output_csv: bool = False):
         network: Bittensor network (default: finney)
         output_csv: If True, output CSV format for easy import
     """
-    st = bt.Subtensor(network=network)
-    all_netuids = st.get_all_subnets_netuid()
+    client = get_cost_client(network)
+    try:
+        all_costs = client.get_all()
+    except Exception as e:
+        print(f"Error fetching registration costs: {e}", file=sys.stderr)
+        return
+    # Subnets the batched fetch returned but could not decode
+    errors = client.errors()
+    all_netuids = sorted(set(all_costs) | set(errors))
 
     print(f"Found {len(all_netuids)} subnets on {network}")
     print()
@@ -161,25 +182,21 @@ def get_all_subnet_costs(network: str = "finney", output_csv: bool = False):
     if output_csv:
         print("netuid,burn_cost_tao,current_neurons,max_neurons,occupancy_pct,is_full,difficulty")
         for netuid in all_netuids:
-            try:
-                info = get_registration_cost(netuid, network)
-                print(f"{info['netuid']},"
-                      f"{info['burn_cost_tao']:.6f},"
-                      f"{info['current_neurons']},"
-                      f"{info['max_neurons']},"
-                      f"{info['occupancy_percent']:.2f},"
-                      f"{info['is_full']},"
-                      f"{info['difficulty']}")
-            except Exception as e:
-                print(f"{netuid},ERROR,ERROR,ERROR,ERROR,ERROR,ERROR # {e}", file=sys.stderr)
+            if netuid in errors:
+                print(f"{netuid},ERROR,ERROR,ERROR,ERROR,ERROR,ERROR # {errors[netuid]}", file=sys.stderr)
+                continue
+            info = all_costs[netuid]
+            print(f"{info['netuid']},"
+                  f"{info['burn_cost_tao']:.6f},"
+                  f"{info['current_neurons']},"
+                  f"{info['max_neurons']},"
+                  f"{info['occupancy_percent']:.2f},"
+                  f"{info['is_full']},"
+                  f"{info['difficulty']}")
     else:
-        costs = []
-        for netuid in all_netuids:
-            try:
-                info = get_registration_cost(netuid, network)
-                costs.append(info)
-            except Exception as e:
-                print(f"Error fetching subnet {netuid}: {e}")
+        for netuid, error in errors.items():
+            print(f"Error fetching subnet {netuid}: {error}")
+        costs = list(all_costs.values())
 
         # Sort by cost
         costs.sort(key=lambda x: x['burn_cost_tao'], reverse=True)
@@ -197,8 +214,6 @@ def get_all_subnet_costs(network: str = "finney", output_csv: bool = False):
 
 def main():
     """Run examples."""
-    import sys
-
     print("\n" + "="*100)
     print("EXAMPLE 1: Get registration cost for a single subnet")
     print("="*100 + "\n")
@@ -216,9 +231,6 @@ def main():
     print("EXAMPLE 3: Get costs for all subnets (top 20 by cost)")
     print("="*100 + "\n")
 
-    st = bt.Subtensor(network="finney")
-    all_netuids = st.get_all_subnets_netuid()[:20]  # Limit to first 20 for demo
-
     get_all_subnet_costs(network="finney", output_csv=False)
 
 
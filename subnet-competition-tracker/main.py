@@ -8,40 +8,214 @@ UIDs change ownership (hotkeys).
 """
 
 import json
+import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 from collections import defaultdict
 
+from analysis_cache import CACHE_FILENAME, AnalysisCache
+from anomaly import ALERT_LOG_FILENAME, ANOMALY_STATE_FILENAME, ChurnDetector, append_alerts
+from backfill import block_timestamp, checkpoint_path, parse_blocks, pinned_blocks
+from delta_store import DELTA_SUFFIX, apply_delta, build_delta, delta_chain, is_delta_path, snapshot_stem
+from events import CURSOR_FILENAME, EVENT_LOG_FILENAME, EventIngestor, SubtensorEventSource, summarize_events
+from metrics import Metrics
+from query_server import serve
+from registration_costs import RegistrationCostClient
+from retention import (ARCHIVE_FILENAME, QUARANTINE_DIRNAME, PairArchive, is_empty, merge_pairs, parse_age,
+                       plan_retention)
+from rolling import ROLLING_FILENAME, WINDOWS, RollingRankings, block_increments
+from shards import SHARD_DIRNAME, SHARD_MAX_BLOCK_SPREAD, SHARD_STALE_AFTER, merge_shards, parse_shard, read_shards, shard_filename, shard_netuids
+from sqlite_store import SnapshotStore
+from sweep_checkpoint import CHECKPOINT_FILENAME, SweepCheckpoint
+from tenure import TENURE_INDEX_FILENAME, TenureIndex
+from snapshot_format import BINARY_SUFFIX, BinarySnapshot, convert_json_snapshot, map_digest, write_binary_snapshot
+from snapshot_index import SNAPSHOT_INDEX_FILENAME, SnapshotIndex, parse_bound, read_blocks, stem_millis, subnet_blocks
+from snapshot_stream import SnapshotOrderError, iter_snapshot_subnets, merge_walk
+
 if TYPE_CHECKING:
     import bittensor as bt
 
 
+# Average Subtensor block time, used to pace the daemon's block polling
+BLOCK_TIME_SECONDS = 12
+
+# First delay between fetch retries; doubles with every attempt
+RETRY_BASE_DELAY = 0.5
+
+# --sort-by name -> results field the ranking is ordered by
+SORT_KEYS = {
+    "replacements": "competition_score",
+    "deregistrations": "avg_deregistrations_per_period",
+    "percentage": "replacement_percentage",
+    "changes": "avg_total_changes_per_period",
+    "tenure": "median_tenure_blocks",
+    "blocks": "replacements_per_1k_blocks"
+}
+
+
+@contextmanager
+def _atomic_open(path: Path, mode: str = 'w'):
+    """
+    Open a hidden temporary file next to path and rename it into place on success.
+
+    The temporary name starts with a dot, so it never matches the
+    snapshot_* glob and concurrent analyze runs only see complete files.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _scale_value(obj):
+    """Unwrap a SCALE-decoded storage key/value into a plain Python value."""
+    return getattr(obj, "value", obj)
+
+
 class SubnetCompetitionTracker:
     """Tracks and analyzes subnet competition based on deregistrations/replacements."""
 
-    def __init__(self, data_dir: str = "snapshots", network: str = "finney"):
+    def __init__(self, data_dir: str = "snapshots", network: str = "finney", workers: int = 1,
+                 lite: bool = False, snapshot_format: str = "json", keyframe_interval: int = 0,
+                 use_cache: bool = True, diff_engine: str = "python", sqlite_path: Optional[str] = None,
+                 jobs: int = 1, track_tenure: bool = False, record_costs: bool = False,
+                 metrics_file: Optional[str] = None, profile: bool = False,
+                 retries: int = 3, subnet_deadline: float = 60.0, streaming: bool = False,
+                 track_rankings: bool = False, shard: Optional[Tuple[int, int]] = None,
+                 detect_anomalies: bool = False, anomaly_threshold: float = 4.0,
+                 alert_sink: Optional[str] = None):
         """
         Initialize the tracker.
 
         Args:
             data_dir: Directory to store snapshot data
             network: Bittensor network to monitor (default: finney)
+            workers: Number of concurrent metagraph fetches per sweep (default: 1)
+            lite: Read only the UID->hotkey storage instead of full metagraphs
+            snapshot_format: File format for new snapshots, "json" or "binary"
+            keyframe_interval: Write every Nth snapshot in full and the rest as
+                deltas against the previous one (0 or 1: always full)
+            use_cache: Reuse per-pair results from earlier analyze runs
+            diff_engine: Snapshot diff implementation, "python" or "numpy" (vectorized)
+            sqlite_path: Also record every new snapshot in this SQLite store
+            jobs: Worker processes used to diff snapshot pairs in analyze (default: 1)
+            track_tenure: Update the tenure index after every new snapshot
+            record_costs: Record per-subnet registration costs with every snapshot
+            metrics_file: Write phase timings and counters here (.prom for
+                Prometheus textfile format, JSON otherwise)
+            profile: Also run each phase under cProfile and tracemalloc
+            retries: Extra attempts per subnet after a failed fetch (default: 3)
+            subnet_deadline: Seconds after a subnet's first attempt past which
+                it is not retried again (default: 60)
+            streaming: Diff snapshot pairs in analyze subnet by subnet from the
+                files instead of loading whole snapshots
+            track_rankings: Update the rolling rankings after every new snapshot
+            shard: (I, N) to collect only shard I of N and write it to
+                data_dir/shards for the merge command (default: everything)
+            detect_anomalies: Score every new snapshot pair for churn spikes
+            anomaly_threshold: Standard deviations above a subnet's running
+                mean churn that raise an alert (default: 4)
+            alert_sink: JSON lines file alerts are appended to (default: data_dir/alerts.jsonl)
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.network = network
         self.subtensor = None
+        self.workers = max(1, workers)
+        self.lite = lite
+        self.snapshot_format = snapshot_format
+        self.keyframe_interval = keyframe_interval
+        self.use_cache = use_cache
+        self.diff_engine = diff_engine
+        self._vector_engine = None
+        self.sqlite_path = Path(sqlite_path) if sqlite_path else None
+        self._store = None
+        self.jobs = max(1, jobs)
+        self.track_tenure = track_tenure
+        self.record_costs = record_costs
+        self._cost_client = None
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.metrics = Metrics(profile=profile)
+        self.retries = max(0, retries)
+        self.subnet_deadline = subnet_deadline
+        self.streaming = streaming
+        self.track_rankings = track_rankings
+        self.shard = shard
+        self.detect_anomalies = detect_anomalies
+        self.anomaly_threshold = anomaly_threshold
+        self.alert_sink = Path(alert_sink) if alert_sink else self.data_dir / ALERT_LOG_FILENAME
+        # Last fully rebuilt snapshot, so sequential delta loads replay one file each
+        self._state_cache = None
+        self._executor = None
+        self._worker_local = threading.local()
+        self._worker_connections = []
+        self._worker_lock = threading.Lock()
+
+    def _new_subtensor(self):
+        """Open a new connection to the configured network."""
+        import bittensor as bt
+        return bt.Subtensor(network=self.network)
 
     def connect(self):
         """Connect to the Bittensor network."""
         if self.subtensor is None:
-            import bittensor as bt
             print(f"Connecting to {self.network} network...")
-            self.subtensor = bt.Subtensor(network=self.network)
+            with self.metrics.phase("connect"):
+                self.subtensor = self._new_subtensor()
             print(f"Connected to {self.subtensor.network}")
 
+    def _worker_subtensor(self):
+        """
+        Return the calling worker thread's own connection.
+
+        Substrate websocket connections are not safe to share between threads,
+        so each pool worker opens one connection on first use and keeps it for
+        the lifetime of the pool.
+        """
+        subtensor = getattr(self._worker_local, "subtensor", None)
+        if subtensor is None:
+            with self.metrics.phase("connect"):
+                subtensor = self._new_subtensor()
+            self._worker_local.subtensor = subtensor
+            with self._worker_lock:
+                self._worker_connections.append(subtensor)
+        return subtensor
+
+    def close(self):
+        """Shut down the worker pool and close every open connection."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._worker_lock:
+            connections, self._worker_connections = self._worker_connections, []
+        self._worker_local = threading.local()
+        if self.subtensor is not None:
+            connections.append(self.subtensor)
+            self.subtensor = None
+        self._cost_client = None
+        for subtensor in connections:
+            try:
+                subtensor.close()
+            except Exception:
+                pass
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
     def get_all_subnet_ids(self) -> List[int]:
         """
         Fetch all subnet IDs from the network.
@@ -51,25 +225,48 @@ class SubnetCompetitionTracker:
         """
         try:
             self.connect()
-            netuids = self.subtensor.get_all_subnets_netuid()
+            with self.metrics.phase("subnet_list"):
+                netuids = self.subtensor.get_all_subnets_netuid()
             return netuids
         except Exception as e:
             print(f"Failed to get subnet IDs: {e}", file=sys.stderr)
             return []
 
-    def get_subnet_metagraph(self, netuid: int) -> Optional[object]:
+    def get_current_block(self, subtensor: Optional[object] = None) -> Optional[int]:
+        """
+        Fetch the current chain head block number.
+
+        Args:
+            subtensor: Connection to use (default: the tracker's shared connection)
+
+        Returns:
+            Block number, or None on error
+        """
+        try:
+            if subtensor is None:
+                self.connect()
+                subtensor = self.subtensor
+            return int(subtensor.get_current_block())
+        except Exception as e:
+            print(f"Failed to get current block: {e}", file=sys.stderr)
+            return None
+
+    def get_subnet_metagraph(self, netuid: int, subtensor: Optional[object] = None) -> Optional[object]:
         """
         Fetch metagraph data for a specific subnet.
 
         Args:
             netuid: The subnet netuid
+            subtensor: Connection to use (default: the tracker's shared connection)
 
         Returns:
             Metagraph object, or None on error
         """
         try:
-            self.connect()
-            metagraph = self.subtensor.metagraph(netuid=netuid)
+            if subtensor is None:
+                self.connect()
+                subtensor = self.subtensor
+            metagraph = subtensor.metagraph(netuid=netuid)
             return metagraph
         except Exception as e:
             print(f"Failed to get metagraph for subnet {netuid}: {e}", file=sys.stderr)
@@ -94,169 +291,1923 @@ class SubnetCompetitionTracker:
 
         return mapping
 
-    def take_snapshot(self) -> str:
+    def fetch_subnet_record(self, netuid: int, subtensor: Optional[object] = None) -> Optional[Dict]:
+        """
+        Fetch one subnet and build its snapshot record.
+
+        Args:
+            netuid: The subnet netuid
+            subtensor: Connection to use (default: the tracker's shared connection)
+
+        Returns:
+            Record with uid_hotkey_map, n_neurons and block, or None on error
+        """
+        with self.metrics.phase("fetch", netuid=netuid):
+            metagraph = self.get_subnet_metagraph(netuid, subtensor=subtensor)
+        if not metagraph:
+            self.metrics.count("fetch_failures", netuid=netuid)
+            return None
+
+        with self.metrics.phase("extract", netuid=netuid):
+            return {
+                "uid_hotkey_map": self.extract_uid_hotkey_mapping(metagraph),
+                "n_neurons": len(metagraph.uids),
+                "block": metagraph.block.item() if hasattr(metagraph.block, 'item') else int(metagraph.block)
+            }
+
+    def fetch_subnet_record_lite(self, netuid: int, block: Optional[int] = None,
+                                 subtensor: Optional[object] = None) -> Optional[Dict]:
+        """
+        Build a subnet's snapshot record from the Keys storage map only.
+
+        Reads the (uid -> hotkey) double map for the subnet in one paged
+        query_map call instead of downloading the full metagraph (weights,
+        bonds, stakes, axons), which is all extract_uid_hotkey_mapping keeps.
+        The Keys map holds exactly SubnetworkN entries, so the neuron count
+        comes from the same query.
+
+        Args:
+            netuid: The subnet netuid
+            block: Block to read at, so a whole sweep can be pinned to one block
+            subtensor: Connection to use (default: the tracker's shared connection)
+
+        Returns:
+            Record with uid_hotkey_map, n_neurons and block, or None on error
+        """
+        try:
+            if subtensor is None:
+                self.connect()
+                subtensor = self.subtensor
+            # The query map pages lazily, so the fetch phase covers iterating it
+            with self.metrics.phase("fetch", netuid=netuid):
+                if block is None:
+                    block = int(subtensor.get_current_block())
+                keys = list(subtensor.query_map_subtensor("Keys", block=block, params=[netuid]))
+            with self.metrics.phase("extract", netuid=netuid):
+                mapping = {int(_scale_value(uid)): str(_scale_value(hotkey)) for uid, hotkey in keys}
+        except Exception as e:
+            print(f"Failed to get hotkeys for subnet {netuid}: {e}", file=sys.stderr)
+            self.metrics.count("fetch_failures", netuid=netuid)
+            return None
+
+        return {
+            "uid_hotkey_map": dict(sorted(mapping.items())),
+            "n_neurons": len(mapping),
+            "block": block
+        }
+
+    def _fetch_record(self, netuid: int, block: Optional[int] = None,
+                      subtensor: Optional[object] = None) -> Optional[Dict]:
+        """Fetch a subnet record with the configured collection mode, with its map digest."""
+        # Reads pinned to a block go through the Keys map; full metagraphs are read at the head
+        if self.lite or block is not None:
+            record = self.fetch_subnet_record_lite(netuid, block=block, subtensor=subtensor)
+        else:
+            record = self.fetch_subnet_record(netuid, subtensor=subtensor)
+        if record is not None:
+            record["digest"] = map_digest(record["uid_hotkey_map"])
+        return record
+
+    def _drop_connection(self, worker: bool):
+        """Close the connection a failed fetch used, so the next attempt reconnects."""
+        if worker:
+            subtensor = getattr(self._worker_local, "subtensor", None)
+            self._worker_local.subtensor = None
+            with self._worker_lock:
+                if subtensor in self._worker_connections:
+                    self._worker_connections.remove(subtensor)
+        else:
+            subtensor, self.subtensor = self.subtensor, None
+            self._cost_client = None
+        if subtensor is not None:
+            try:
+                subtensor.close()
+            except Exception:
+                pass
+
+    def _fetch_with_retry(self, netuid: int, block: Optional[int] = None, worker: bool = False) -> Optional[Dict]:
+        """
+        Fetch a subnet record, retrying failures with exponential backoff.
+
+        Each retry reconnects first. The deadline is checked between
+        attempts, so a single call that hangs is bounded by the client's
+        own timeout rather than by subnet_deadline.
+
+        Args:
+            netuid: The subnet netuid
+            block: Block to read at (lite mode)
+            worker: Use the calling pool thread's connection instead of the shared one
+
+        Returns:
+            The record, or None once retries or the deadline are exhausted
+        """
+        deadline = time.monotonic() + self.subnet_deadline
+        delay = RETRY_BASE_DELAY
+        for attempt in range(self.retries + 1):
+            subtensor = self._worker_subtensor() if worker else None
+            record = self._fetch_record(netuid, block=block, subtensor=subtensor)
+            if record is not None:
+                return record
+
+            remaining = deadline - time.monotonic()
+            if attempt == self.retries or remaining <= 0:
+                break
+            self.metrics.count("fetch_retries", netuid=netuid)
+            self._drop_connection(worker)
+            # Jitter keeps workers that failed together from retrying in lockstep
+            time.sleep(min(delay * random.uniform(0.5, 1.0), remaining))
+            delay *= 2
+        return None
+
+    def _fetch_subnets_serial(self, subnet_ids: List[int], block: Optional[int] = None,
+                              on_record: Optional[Callable[[int, Dict], None]] = None) -> List[int]:
+        """
+        Fetch subnets one after another over the shared connection.
+
+        Args:
+            subnet_ids: Subnets to fetch
+            block: Block to read at (lite mode)
+            on_record: Called with (netuid, record) as soon as each subnet is fetched
+
+        Returns:
+            Netuids that could not be fetched
+        """
+        failed = []
+        for netuid in subnet_ids:
+            print(f"  Fetching subnet {netuid}...", end=" ", flush=True)
+            record = self._fetch_with_retry(netuid, block=block)
+            if record:
+                if on_record is not None:
+                    on_record(netuid, record)
+                print(f"✓ ({len(record['uid_hotkey_map'])} UIDs)")
+            else:
+                failed.append(netuid)
+                print("✗ (failed)")
+        return failed
+
+    def _fetch_subnets_concurrent(self, subnet_ids: List[int], block: Optional[int] = None,
+                                  on_record: Optional[Callable[[int, Dict], None]] = None) -> List[int]:
+        """
+        Fetch subnets on the bounded worker pool, one connection per worker.
+
+        on_record is called from the calling thread, in completion order.
+
+        Returns:
+            Netuids that could not be fetched
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch")
+
+        def fetch(netuid: int) -> Optional[Dict]:
+            return self._fetch_with_retry(netuid, block=block, worker=True)
+
+        failed = []
+        futures = {self._executor.submit(fetch, netuid): netuid for netuid in subnet_ids}
+        for future in as_completed(futures):
+            netuid = futures[future]
+            record = future.result()
+            if record:
+                if on_record is not None:
+                    on_record(netuid, record)
+                print(f"  Subnet {netuid}: ✓ ({len(record['uid_hotkey_map'])} UIDs)")
+            else:
+                failed.append(netuid)
+                print(f"  Subnet {netuid}: ✗ (failed)")
+        return failed
+
+    def _list_subnets_with_retry(self) -> List[int]:
+        """Subnet netuids, retried like subnet fetches so a transient error doesn't empty the sweep."""
+        delay = RETRY_BASE_DELAY
+        for attempt in range(self.retries + 1):
+            subnet_ids = [netuid for netuid in self.get_all_subnet_ids() if netuid is not None]
+            if subnet_ids or attempt == self.retries:
+                return subnet_ids
+            self._drop_connection(worker=False)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            delay *= 2
+        return []
+
+    def take_snapshot(self, sweep: Optional[str] = None) -> Optional[str]:
+        """
+        Take a snapshot of all subnet metagraphs.
+
+        Each subnet is retried with backoff. Subnets that still fail are
+        recorded as {"missing": true} instead of being left out, so analysis
+        skips them rather than counting all their UIDs as deregistered and
+        re-registered. Fetched subnets are appended to a checkpoint as they
+        arrive, and an interrupted sweep resumes from it without fetching
+        them again.
+
+        With a shard set, only that shard's netuids are fetched and the
+        result is written to data_dir/shards instead, for merge_shard_sweeps().
+
+        Args:
+            sweep: Label shared by the shards of one sweep, required with a
+                shard set; lite shards read at this block when it is a block
+                number
+
+        Returns:
+            Path to the snapshot (or shard) file, or None if no subnets could be listed
+        """
+        checkpoint_name = CHECKPOINT_FILENAME
+        if self.shard is not None:
+            if sweep is None:
+                # Labels computed independently by each collector can straddle a boundary and never merge
+                print("A shard needs a sweep label shared by every shard of the sweep; pass --sweep", file=sys.stderr)
+                return None
+            # Shards of one sweep may share a data directory
+            checkpoint_name = CHECKPOINT_FILENAME.replace(".jsonl", f".{self.shard[0]}of{self.shard[1]}.jsonl")
+        checkpoint = SweepCheckpoint(self.data_dir / checkpoint_name)
+        header = checkpoint.resume(self.network, self.lite)
+        if header is not None and self.shard is not None and header.get("sweep") != sweep:
+            # The interrupted shard belongs to another sweep; resuming it would never write this one
+            print(f"Discarding the checkpoint of sweep {header.get('sweep')} to collect sweep {sweep}")
+            checkpoint.close()
+            header = None
+        if header is not None:
+            timestamp = header["timestamp"]
+            block = header.get("block")
+            print(f"Resuming snapshot started at {timestamp} ({len(checkpoint.offsets)} subnets already fetched)...")
+        else:
+            timestamp = datetime.now().isoformat()
+            block = None
+            print(f"Taking snapshot at {timestamp}...")
+
+        try:
+            # Ascending netuid order lets compare_snapshot_files stream the file
+            subnet_ids = sorted(self._list_subnets_with_retry())
+            if not subnet_ids:
+                print("No subnets returned by the network; snapshot not written", file=sys.stderr)
+                return None
+            print(f"Found {len(subnet_ids)} subnets")
+            targets = subnet_ids
+            if self.shard is not None:
+                targets = shard_netuids(subnet_ids, self.shard)
+                print(f"Shard {self.shard[0]}/{self.shard[1]}: fetching {len(targets)} of them")
+
+            if header is None:
+                header = {"timestamp": timestamp, "network": self.network, "lite": self.lite}
+                if self.shard is not None and self.lite and sweep.isdigit():
+                    # Every shard of the sweep reads at the same block
+                    block = int(sweep)
+                else:
+                    # Lite sweeps read every subnet at the same block
+                    block = self.get_current_block() if self.lite else None
+                header["block"] = block
+                if self.shard is not None:
+                    header["sweep"] = sweep
+                checkpoint.start(header)
+            if self.lite:
+                print(f"Lite mode: reading hotkeys at block {block}")
+
+            pending = [netuid for netuid in targets if netuid not in checkpoint.offsets]
+            if self.workers > 1 and len(pending) > 1:
+                print(f"Fetching with {self.workers} workers...")
+                missing = self._fetch_subnets_concurrent(pending, block=block, on_record=checkpoint.add)
+            else:
+                missing = self._fetch_subnets_serial(pending, block=block, on_record=checkpoint.add)
+            if missing:
+                print(f"Marking {len(missing)} subnets as missing: {sorted(missing)}")
+                self.metrics.count("subnets_missing", len(missing))
+
+            with self.metrics.phase("serialize"):
+                snapshot = None
+                if self.shard is not None:
+                    snapshot_file = self._write_shard(sweep, header, subnet_ids, targets, set(missing), checkpoint)
+                elif self._streams_snapshots():
+                    snapshot_file, blocks = self._stream_snapshot(timestamp, subnet_ids, set(missing), checkpoint)
+                else:
+                    # Keep netuid order stable regardless of completion order
+                    snapshot = {
+                        "timestamp": timestamp,
+                        "network": self.network,
+                        "subnets": {
+                            str(netuid): {"missing": True} if netuid in missing else checkpoint.read(netuid)
+                            for netuid in subnet_ids
+                        }
+                    }
+                    snapshot_file = self.save_snapshot(snapshot)
+                    blocks = subnet_blocks(snapshot["subnets"])
+                    self.metrics.count("uids_collected", sum(
+                        len(data.get("uid_hotkey_map", {})) for data in snapshot["subnets"].values()))
+        finally:
+            checkpoint.close()
+        checkpoint.remove()
+        self.metrics.count("subnets_collected", len(targets) - len(missing))
+
+        # Costs are one batched call for every subnet, so only the first shard records them
+        if self.record_costs and (self.shard is None or self.shard[0] == 1):
+            self.record_registration_costs(timestamp, block)
+
+        if self.shard is not None:
+            self.metrics.count("bytes_written", snapshot_file.stat().st_size)
+            print(f"\nShard saved to {snapshot_file}")
+            return str(snapshot_file)
+
+        self._record_snapshot(snapshot_file, snapshot, blocks)
+        return str(snapshot_file)
+
+    def _record_snapshot(self, snapshot_file: Path, snapshot: Optional[Dict], blocks: Dict[str, int]):
+        """
+        Index a snapshot that was just written and update the stores that follow new snapshots.
+
+        Args:
+            snapshot_file: The written snapshot
+            snapshot: Its contents (None when streamed, which rules out the SQLite store)
+            blocks: subnet_blocks() of the snapshot
+        """
+        SnapshotIndex(self.data_dir / SNAPSHOT_INDEX_FILENAME).add(snapshot_file, blocks)
+
+        self.metrics.count("snapshots")
+        self.metrics.count("bytes_written", snapshot_file.stat().st_size)
+        print(f"\nSnapshot saved to {snapshot_file}")
+
+        if self.sqlite_path is not None:
+            self.get_store().add_snapshot(snapshot_stem(snapshot_file), snapshot)
+            print(f"Snapshot recorded in {self.sqlite_path}")
+        if self.track_tenure:
+            self.update_tenure_index()
+        if self.track_rankings:
+            self.update_rolling_rankings()
+        if self.detect_anomalies:
+            try:
+                self.update_churn_detector()
+            except Exception as e:
+                # Detection must never cost a snapshot
+                print(f"Churn detection failed: {e}", file=sys.stderr)
+
+    def _write_shard(self, sweep: str, header: Dict, subnet_ids: List[int], targets: List[int],
+                     missing: set, checkpoint: SweepCheckpoint) -> Path:
+        """
+        Write this collector's shard of a sweep from the checkpoint.
+
+        Args:
+            sweep: Sweep label
+            header: Checkpoint header (timestamp, network, lite, block)
+            subnet_ids: Every netuid the subnet listing returned
+            targets: The netuids of this shard
+            missing: Netuids that could not be fetched
+
+        Returns:
+            Path to the shard file
+        """
+        shard_dir = self.data_dir / SHARD_DIRNAME
+        shard_dir.mkdir(exist_ok=True)
+        shard = {
+            "sweep": sweep,
+            "shard": list(self.shard),
+            "timestamp": header["timestamp"],
+            "network": header["network"],
+            "lite": header["lite"],
+            "block": header["block"],
+            "listed": subnet_ids,
+            "subnets": {
+                str(netuid): {"missing": True} if netuid in missing else checkpoint.read(netuid)
+                for netuid in targets
+            }
+        }
+        self.metrics.count("uids_collected", sum(
+            len(data.get("uid_hotkey_map", {})) for data in shard["subnets"].values()))
+        shard_file = shard_dir / shard_filename(sweep, self.shard)
+        with _atomic_open(shard_file) as f:
+            json.dump(shard, f, separators=(",", ":"))
+        return shard_file
+
+    def merge_shard_sweeps(self, stale_after_ms: Optional[int] = None,
+                           max_block_spread: int = SHARD_MAX_BLOCK_SPREAD) -> List[str]:
+        """
+        Merge every complete sweep in data_dir/shards into a snapshot.
+
+        Sweeps are merged oldest first. A sweep with shards still missing,
+        or whose shards disagree (network, mode, split, lite block) or read
+        their subnets more than max_block_spread blocks apart, is left in
+        place and reported. The shard files of a merged sweep are deleted.
+        A sweep left unmerged that is older than the latest snapshot will
+        never be merged; its shards are deleted once the newest of them is
+        stale_after_ms old.
+
+        Args:
+            stale_after_ms: Age in milliseconds after which such a sweep is
+                removed (default: SHARD_STALE_AFTER)
+            max_block_spread: Most blocks between the earliest and latest subnet read of a sweep
+
+        Returns:
+            Paths of the snapshots written
+        """
+        if stale_after_ms is None:
+            stale_after_ms = parse_age(SHARD_STALE_AFTER)
+        written = []
+        unmerged = []
+        sweeps = read_shards(self.data_dir / SHARD_DIRNAME)
+        for sweep, entries in sorted(sweeps.items(), key=lambda x: min(shard["timestamp"] for _, shard in x[1])):
+            try:
+                snapshot, report = merge_shards([shard for _, shard in entries], max_block_spread)
+            except ValueError as e:
+                print(f"✗ {e}", file=sys.stderr)
+                unmerged.append((sweep, entries))
+                continue
+
+            stem = f"snapshot_{snapshot['timestamp'].replace(':', '-')}"
+            snapshots = self.get_all_snapshots()
+            if snapshots and snapshot_stem(snapshots[-1]) >= stem:
+                print(f"✗ Sweep {sweep}: not newer than {snapshots[-1].name}, left unmerged", file=sys.stderr)
+                unmerged.append((sweep, entries))
+                continue
+
+            print(f"✓ Sweep {sweep}: {len(entries)} shards, {report['subnets']} subnets, "
+                  f"blocks {report['min_block']}-{report['max_block']}")
+            if report["missing"]:
+                print(f"  Marked {len(report['missing'])} subnets as missing: {report['missing']}")
+                self.metrics.count("subnets_missing", len(report["missing"]))
+            with self.metrics.phase("serialize"):
+                snapshot_file = self.save_snapshot(snapshot)
+            self._record_snapshot(snapshot_file, snapshot, subnet_blocks(snapshot["subnets"]))
+            for path, _ in entries:
+                path.unlink()
+            written.append(str(snapshot_file))
+
+        snapshots = self.get_all_snapshots()
+        if not snapshots:
+            return written
+        latest = snapshot_stem(snapshots[-1])
+        now = datetime.now()
+        for sweep, entries in unmerged:
+            started = min(shard["timestamp"] for _, shard in entries)
+            if f"snapshot_{started.replace(':', '-')}" >= latest:
+                # Its missing shards may still arrive
+                continue
+            newest = datetime.fromisoformat(max(shard["timestamp"] for _, shard in entries))
+            age_ms = (now - newest).total_seconds() * 1000
+            if age_ms < stale_after_ms:
+                print(f"✗ Sweep {sweep}: older than {snapshots[-1].name} and still unmerged; "
+                      f"removed in {(stale_after_ms - age_ms) / 60000:.0f} min", file=sys.stderr)
+                continue
+            for path, _ in entries:
+                path.unlink()
+            print(f"✗ Sweep {sweep}: older than {snapshots[-1].name} and never completed; "
+                  f"removed {len(entries)} stale shard files", file=sys.stderr)
+        return written
+
+    def _streams_snapshots(self) -> bool:
+        """
+        Whether new snapshots can be written straight from the checkpoint.
+
+        Binary encoding, delta building and the SQLite store need the whole
+        snapshot in memory; a plain JSON snapshot does not.
+        """
+        return self.snapshot_format == "json" and self.keyframe_interval <= 1 and self.sqlite_path is None
+
+    def _stream_snapshot(self, timestamp: str, subnet_ids: List[int], missing: set,
+                         checkpoint: SweepCheckpoint) -> tuple:
+        """
+        Write a JSON snapshot one subnet at a time from the checkpoint.
+
+        Only one subnet record is held in memory at a time. The output is
+        byte-for-byte what json.dump(snapshot, f, indent=2) would write.
+
+        Returns:
+            (snapshot path, subnet_blocks() of the snapshot)
+        """
+        stem = f"snapshot_{timestamp.replace(':', '-')}"
+        snapshot_file = self.data_dir / f"{stem}.json"
+        uids = 0
+        blocks = {}
+        with _atomic_open(snapshot_file) as f:
+            f.write(f'{{\n  "timestamp": {json.dumps(timestamp)},\n  "network": {json.dumps(self.network)},\n  "subnets": {{')
+            for position, netuid in enumerate(subnet_ids):
+                record = {"missing": True} if netuid in missing else checkpoint.read(netuid)
+                uids += len(record.get("uid_hotkey_map", {}))
+                blocks.update(subnet_blocks({str(netuid): record}))
+                body = json.dumps(record, indent=2).replace("\n", "\n    ")
+                f.write(f'{"," if position else ""}\n    {json.dumps(str(netuid))}: {body}')
+            f.write("\n  }\n}" if subnet_ids else "}\n}")
+        self.metrics.count("uids_collected", uids)
+        return snapshot_file, blocks
+
+    def record_registration_costs(self, timestamp: str, block: Optional[int] = None) -> int:
+        """
+        Append every subnet's registration costs to the cost series in data_dir.
+
+        Costs for all subnets come from one batched call over the tracker's
+        connection.
+
+        Args:
+            timestamp: Timestamp of the snapshot taken in the same pass
+            block: Block to read at (default: chain head)
+
+        Returns:
+            Number of subnets recorded
+        """
+        from cost_series import COST_SERIES_DIRNAME, CostSeries
+
+        try:
+            self.connect()
+            if block is None:
+                block = self.get_current_block()
+            if self._cost_client is None:
+                self._cost_client = RegistrationCostClient(network=self.network, subtensor=self.subtensor)
+            with self.metrics.phase("costs"):
+                costs = self._cost_client.get_all(block=block)
+        except Exception as e:
+            print(f"Error fetching registration costs: {e}", file=sys.stderr)
+            return 0
+        for netuid, error in self._cost_client.errors(block).items():
+            print(f"Skipping subnet {netuid}: {error}", file=sys.stderr)
+
+        recorded = CostSeries(self.data_dir / COST_SERIES_DIRNAME).append(timestamp, block or 0, costs)
+        print(f"Recorded registration costs for {recorded} subnets at block {block}")
+        return recorded
+
+    def save_snapshot(self, snapshot: Dict, keyframe: bool = False) -> Path:
+        """
+        Write a snapshot to data_dir in the configured format.
+
+        With a keyframe interval, snapshots between keyframes are written as
+        deltas against the previous snapshot instead.
+
+        Args:
+            snapshot: Snapshot dict with timestamp, network and subnets
+            keyframe: Always write it in full (e.g. when it is not the newest snapshot)
+
+        Returns:
+            Path to the written file
+        """
+        stem = f"snapshot_{snapshot['timestamp'].replace(':', '-')}"
+        # Match the string-keyed layout load_snapshot returns, with every map's digest
+        state = {
+            **snapshot,
+            "subnets": {
+                netuid: {
+                    **data,
+                    "uid_hotkey_map": {str(k): v for k, v in data["uid_hotkey_map"].items()},
+                    "digest": data.get("digest") or map_digest(data["uid_hotkey_map"])
+                }
+                if "uid_hotkey_map" in data else data
+                for netuid, data in snapshot["subnets"].items()
+            }
+        }
+
+        if self.keyframe_interval > 1 and not keyframe:
+            delta = self._build_delta(state)
+            if delta is not None:
+                snapshot_file = self.data_dir / f"{stem}{DELTA_SUFFIX}"
+                with _atomic_open(snapshot_file) as f:
+                    json.dump(delta, f, separators=(",", ":"))
+                self._state_cache = (snapshot_file.name, state)
+                return snapshot_file
+
+        snapshot_file = self._write_full_snapshot(stem, state)
+        self._state_cache = (snapshot_file.name, state)
+        return snapshot_file
+
+    def _build_delta(self, state: Dict) -> Optional[Dict]:
+        """Delta for state against the latest snapshot, or None when a keyframe is due."""
+        snapshots = self.get_all_snapshots()
+        if not snapshots:
+            return None
+
+        previous = snapshots[-1]
+        chain = delta_chain(snapshots, previous)
+        if len(chain) >= self.keyframe_interval:
+            return None
+
+        old_state = self.load_snapshot(previous)
+        changes = self.compare_snapshots(old_state, state)
+        return build_delta(old_state, state, changes,
+                           keyframe=snapshot_stem(chain[0]), previous=snapshot_stem(previous))
+
+    def _write_full_snapshot(self, stem: str, snapshot: Dict) -> Path:
+        """Write a full snapshot (keyframe) in the configured format."""
+        if self.snapshot_format == "binary":
+            return write_binary_snapshot(snapshot, self.data_dir / f"{stem}{BINARY_SUFFIX}")
+
+        snapshot_file = self.data_dir / f"{stem}.json"
+        with _atomic_open(snapshot_file) as f:
+            json.dump(snapshot, f, indent=2)
+        return snapshot_file
+
+    def backfill(self, blocks: List[int]) -> List[str]:
+        """
+        Write snapshots of every subnet pinned to historical blocks.
+
+        Blocks run in parallel on up to `workers` threads, each with its own
+        connection, which must reach an archive node. Within a block, every
+        subnet's Keys map is read at that block. Blocks that already have a
+        pinned snapshot are skipped, and blocks interrupted earlier resume
+        from their checkpoint. With sqlite_path set, each written snapshot
+        is also recorded in the store, from the calling thread.
+
+        Args:
+            blocks: Block numbers to reconstruct
+
+        Returns:
+            Paths of the snapshots written, oldest block first
+        """
+        done = pinned_blocks(self.update_snapshot_index().entries)
+        requested = sorted(set(blocks))
+        todo = [block for block in requested if block not in done]
+        print(f"Backfilling {len(todo)} blocks ({len(requested) - len(todo)} already have a snapshot) "
+              f"with {self.workers} workers...")
+
+        write_lock = threading.Lock()
+        written = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill")
+        try:
+            futures = {executor.submit(self._backfill_block, block, write_lock): block for block in todo}
+            for future in as_completed(futures):
+                path = future.result()
+                if path is not None:
+                    written[futures[future]] = str(path)
+                    if self.sqlite_path is not None:
+                        # sqlite3 connections stay on the thread that opened them
+                        self.get_store().add_snapshot(snapshot_stem(path), self.load_snapshot(path))
+        finally:
+            executor.shutdown(wait=True)
+            self.close()
+        if written and self.sqlite_path is not None:
+            print(f"Backfilled snapshots recorded in {self.sqlite_path}")
+
+        tenure = TenureIndex(self.data_dir / TENURE_INDEX_FILENAME)
+        if written and tenure.last_snapshot is not None and \
+                min(snapshot_stem(path) for path in written.values()) < tenure.last_snapshot:
+            # The index only follows snapshots newer than the last one it saw
+            (self.data_dir / TENURE_INDEX_FILENAME).unlink()
+            print("Tenure index predates the backfilled snapshots; it will be rebuilt on the next update")
+        return [written[block] for block in sorted(written)]
+
+    def _read_block_header(self, block: int) -> Optional[tuple]:
+        """(timestamp, sorted netuids) at a block over the worker's connection, retried like subnet fetches."""
+        delay = RETRY_BASE_DELAY
+        for attempt in range(self.retries + 1):
+            try:
+                subtensor = self._worker_subtensor()
+                millis = int(_scale_value(subtensor.query_module("Timestamp", "Now", block=block)))
+                netuids = sorted(int(netuid) for netuid in subtensor.get_all_subnets_netuid(block=block))
+                return block_timestamp(millis), netuids
+            except Exception as e:
+                print(f"Error reading block {block}: {e}", file=sys.stderr)
+            if attempt == self.retries:
+                break
+            self._drop_connection(worker=True)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            delay *= 2
+        return None
+
+    def _backfill_block(self, block: int, write_lock: threading.Lock) -> Optional[Path]:
+        """
+        Reconstruct and write the snapshot of one block.
+
+        Returns:
+            Path to the snapshot, or None if the block could not be read or placed
+        """
+        checkpoint = SweepCheckpoint(checkpoint_path(self.data_dir, block))
+        # Historical sweeps are resumable at any age
+        header = checkpoint.resume(self.network, True, max_age_seconds=float("inf"))
+        try:
+            if header is None:
+                read = self._read_block_header(block)
+                if read is None:
+                    print(f"✗ Block {block}: could not read its timestamp and subnets", file=sys.stderr)
+                    return None
+                timestamp, netuids = read
+                header = {"timestamp": timestamp, "network": self.network, "lite": True,
+                          "block": block, "netuids": netuids}
+                checkpoint.start(header)
+
+            missing = set()
+            for netuid in header["netuids"]:
+                if netuid in checkpoint.offsets:
+                    continue
+                record = self._fetch_with_retry(netuid, block=block, worker=True)
+                if record is None:
+                    missing.add(netuid)
+                else:
+                    checkpoint.add(netuid, record)
+
+            snapshot = {
+                "timestamp": header["timestamp"],
+                "network": self.network,
+                "subnets": {
+                    str(netuid): {"missing": True} if netuid in missing else checkpoint.read(netuid)
+                    for netuid in header["netuids"]
+                }
+            }
+        finally:
+            checkpoint.close()
+
+        stem = f"snapshot_{header['timestamp'].replace(':', '-')}"
+        with write_lock:
+            snapshots = self.get_all_snapshots()
+            later = [path for path in snapshots if snapshot_stem(path) > stem]
+            if any(snapshot_stem(path) == stem for path in snapshots):
+                print(f"✗ Block {block}: a snapshot named {stem} already exists", file=sys.stderr)
+                return None
+            if later and is_delta_path(later[0]):
+                # A delta must directly follow the snapshot it was built against
+                print(f"✗ Block {block}: falls inside the delta chain of {later[0].name}", file=sys.stderr)
+                return None
+            earlier = [path for path in snapshots if snapshot_stem(path) < stem]
+            if earlier and later and PairArchive(self.data_dir / ARCHIVE_FILENAME).get(earlier[-1], later[0]):
+                # The snapshots between them were compacted away; their counts are archived as one pair
+                print(f"✗ Block {block}: falls inside the compacted pair {snapshot_stem(earlier[-1])} -> "
+                      f"{snapshot_stem(later[0])}", file=sys.stderr)
+                return None
+            with self.metrics.phase("serialize"):
+                snapshot_file = self.save_snapshot(snapshot, keyframe=True)
+            SnapshotIndex(self.data_dir / SNAPSHOT_INDEX_FILENAME).add(snapshot_file, subnet_blocks(snapshot["subnets"]))
+        checkpoint.remove()
+
+        self.metrics.count("snapshots")
+        self.metrics.count("subnets_collected", len(header["netuids"]) - len(missing))
+        self.metrics.count("bytes_written", snapshot_file.stat().st_size)
+        print(f"✓ Block {block}: {len(header['netuids'])} subnets"
+              + (f", {len(missing)} missing" if missing else "") + f" -> {snapshot_file.name}")
+        return snapshot_file
+
+    def next_sweep_block(self, block: int, interval_blocks: int, tempo_netuid: Optional[int] = None,
+                         tempo: Optional[int] = None) -> int:
+        """
+        First block after block at which the daemon should start a sweep.
+
+        Args:
+            block: Current block
+            interval_blocks: Sweep every this many blocks (multiples of the interval)
+            tempo_netuid: Align to this subnet's epoch boundaries instead
+            tempo: The subnet's tempo, required with tempo_netuid
+
+        Returns:
+            Target block number
+        """
+        if tempo_netuid is not None and tempo:
+            # Subtensor runs a subnet's epoch when (block + netuid + 1) % (tempo + 1) == 0
+            period = tempo + 1
+            remaining = period - (block + tempo_netuid + 1) % period
+            return block + remaining
+        return (block // interval_blocks + 1) * interval_blocks
+
+    def run_daemon(self, interval_blocks: int = 50, tempo_netuid: Optional[int] = None,
+                   max_sweeps: Optional[int] = None):
+        """
+        Keep a connection open and take snapshots on a block-aligned schedule.
+
+        Sweeps run on a background thread. If a sweep is still running when
+        the next boundary arrives, that boundary is skipped rather than
+        starting an overlapping sweep. Connection errors drop every open
+        connection and the loop reconnects with exponential backoff.
+
+        Args:
+            interval_blocks: Sweep at every multiple of this many blocks
+            tempo_netuid: Align sweeps to this subnet's epoch instead
+            max_sweeps: Stop after starting this many sweeps (default: run forever)
+        """
+        print(f"Starting collector daemon on {self.network} "
+              + (f"(aligned to subnet {tempo_netuid} epochs)" if tempo_netuid is not None
+                 else f"(every {interval_blocks} blocks)"))
+
+        sweep_thread = None
+        sweeps = 0
+        backoff = 1
+        clock = None
+        target = None
+        tempo = None
+
+        def sweep(label: str):
+            try:
+                self.take_snapshot(sweep=label)
+                self.write_metrics()
+            except Exception as e:
+                print(f"Sweep failed: {e}", file=sys.stderr)
+                # Drop the sweep's connections so the next sweep reconnects
+                self.close()
+
+        try:
+            while max_sweeps is None or sweeps < max_sweeps:
+                # The clock uses its own connection so polling never shares a socket with a sweep
+                try:
+                    if clock is None:
+                        clock = self._new_subtensor()
+                        if tempo_netuid is not None:
+                            tempo = int(clock.tempo(tempo_netuid))
+                    block = int(clock.get_current_block())
+                    backoff = 1
+                except Exception as e:
+                    print(f"Lost connection ({e}), reconnecting in {backoff}s...", file=sys.stderr)
+                    clock = None
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 300)
+                    continue
+
+                if target is None:
+                    target = self.next_sweep_block(block, interval_blocks, tempo_netuid, tempo)
+                    print(f"Block {block}: next sweep at block {target}")
+
+                if block < target:
+                    time.sleep(min(target - block, 5) * BLOCK_TIME_SECONDS / 2)
+                    continue
+
+                if sweep_thread is not None and sweep_thread.is_alive():
+                    print(f"Block {block}: previous sweep still running, skipping")
+                else:
+                    print(f"Block {block}: starting sweep")
+                    sweep_thread = threading.Thread(target=sweep, args=(str(target),), name="sweep", daemon=True)
+                    sweep_thread.start()
+                    sweeps += 1
+                target = self.next_sweep_block(block, interval_blocks, tempo_netuid, tempo)
+        except KeyboardInterrupt:
+            print("\nStopping collector daemon...")
+        finally:
+            if sweep_thread is not None:
+                sweep_thread.join()
+            if clock is not None:
+                try:
+                    clock.close()
+                except Exception:
+                    pass
+            self.close()
+
+    def update_tenure_index(self) -> TenureIndex:
+        """
+        Bring the tenure index up to date with the snapshots in data_dir.
+
+        Only snapshots newer than the one the index last saw are loaded, and
+        each is applied from its compare_snapshots result. If that snapshot
+        no longer exists, the index is rebuilt from the first snapshot.
+
+        Returns:
+            The updated index
+        """
+        index = TenureIndex(self.data_dir / TENURE_INDEX_FILENAME)
+        snapshots = self.get_all_snapshots()
+        stems = [snapshot_stem(path) for path in snapshots]
+        if not snapshots:
+            return index
+
+        if index.last_snapshot in stems:
+            position = stems.index(index.last_snapshot)
+        else:
+            if index.last_snapshot is not None:
+                print(f"Tenure index points at missing snapshot {index.last_snapshot}, rebuilding")
+            position = 0
+            index.start(stems[0], self.load_snapshot(snapshots[0]))
+
+        pending = snapshots[position + 1:]
+        if pending:
+            previous = self.load_snapshot(snapshots[position])
+            # Subnets missing from that sweep are compared against the last state the index saw
+            previous = {**previous, "subnets": {
+                netuid: (index.observed(netuid) or data) if data.get("missing") else data
+                for netuid, data in previous["subnets"].items()
+            }}
+            for path in pending:
+                current = self.load_snapshot(path)
+                index.update(snapshot_stem(path), current, self.compare_snapshots(previous, current))
+                # Subnets missing from this sweep are compared against their last good state next time
+                previous = {**current, "subnets": {
+                    netuid: previous["subnets"].get(netuid, data) if data.get("missing") else data
+                    for netuid, data in current["subnets"].items()
+                }}
+
+        if pending or position == 0:
+            index.save()
+        return index
+
+    def update_rolling_rankings(self, rankings: Optional[RollingRankings] = None) -> RollingRankings:
+        """
+        Bring the rolling rankings up to date with the snapshots in data_dir.
+
+        Only the pairs after the last snapshot the state saw are diffed, so
+        after every new snapshot this is one pair. If the snapshots the state
+        was built from are no longer contiguous in data_dir (files removed
+        or added in between), it is rebuilt from the first snapshot.
+
+        Args:
+            rankings: State already in memory (default: load it from data_dir)
+
+        Returns:
+            The updated state
+        """
+        if rankings is None:
+            rankings = RollingRankings(self.data_dir / ROLLING_FILENAME)
+        snapshots = self.get_all_snapshots()
+        stems = [snapshot_stem(path) for path in snapshots]
+        if not snapshots:
+            return rankings
+
+        rebuilt = False
+        if not rankings.covers(stems):
+            if rankings.last_snapshot is not None:
+                print("Rolling rankings no longer match the snapshot history, rebuilding")
+            rankings.reset(stems[0], stem_millis(stems[0]))
+            rebuilt = True
+
+        position = stems.index(rankings.last_snapshot)
+        pending = snapshots[position + 1:]
+        for old_path, new_path, summary, spans, block_totals in self._pair_summaries(snapshots[position:]):
+            rankings.add_pair(snapshot_stem(old_path), snapshot_stem(new_path),
+                              stem_millis(snapshot_stem(old_path)), stem_millis(snapshot_stem(new_path)),
+                              summary, spans, block_totals)
+
+        if pending or rebuilt:
+            rankings.save()
+        return rankings
+
+    def update_churn_detector(self) -> List[Dict]:
+        """
+        Score the snapshot pairs written since the detector last ran.
+
+        A new detector warms up on the whole history. If the snapshot it
+        last saw is gone, it skips ahead to the latest snapshot and keeps its
+        statistics. Alerts are printed and appended to alert_sink.
+
+        Returns:
+            The alerts raised
+        """
+        detector = ChurnDetector(self.data_dir / ANOMALY_STATE_FILENAME, threshold=self.anomaly_threshold)
+        snapshots = self.get_all_snapshots()
+        stems = [snapshot_stem(path) for path in snapshots]
+        if not snapshots:
+            return []
+
+        if detector.last_snapshot is None:
+            position = 0
+        elif detector.last_snapshot in stems:
+            position = stems.index(detector.last_snapshot)
+        else:
+            print(f"Churn detector points at missing snapshot {detector.last_snapshot}, "
+                  f"resuming from {stems[-1]}")
+            position = len(stems) - 1
+
+        alerts = []
+        for _, new_path, summary, spans, _ in self._pair_summaries(snapshots[position:]):
+            alerts.extend(detector.observe(snapshot_stem(new_path), summary, spans))
+        if detector.last_snapshot != stems[-1]:
+            detector.state["last_snapshot"] = stems[-1]
+
+        for alert in alerts:
+            print(f"Churn alert: {alert['text']}")
+        append_alerts(self.alert_sink, alerts)
+        self.metrics.count("churn_alerts", len(alerts))
+        detector.save()
+        return alerts
+
+    def rolling_results(self, window: str) -> Dict:
+        """
+        Analysis results for a rolling window, from the materialized rankings.
+
+        Args:
+            window: A rolling.WINDOWS name (1h, 24h, 7d or all), ending at the latest snapshot
+
+        Returns:
+            The same results analyze_competition(since=<latest - window>) computes
+        """
+        rankings = self.update_rolling_rankings()
+        totals = rankings.window(window)
+        if not totals["pairs"]:
+            print(f"No snapshot pairs within the last {window}.")
+            return {}
+
+        print(f"\nRolling window {window}: {totals['pairs'] + 1} snapshots from "
+              f"{totals['first_snapshot']} to {rankings.last_snapshot}")
+        return self.window_results(rankings, window)
+
+    def window_results(self, rankings: RollingRankings, window: str) -> Dict:
+        """Analysis results for one window of an up-to-date rolling state, without output."""
+        totals = rankings.window(window)
+        results = self._finalize_results(
+            {netuid: {**self._new_subnet_stats(), **stats} for netuid, stats in totals["subnet_stats"].items()})
+        return self._apply_block_rates(results, totals["block_totals"])
+
+    def attach_tenure_stats(self, results: Dict, index: Optional[TenureIndex] = None) -> Dict:
+        """
+        Add tenure distribution fields from the tenure index to analysis results.
+
+        Args:
+            results: Output of analyze_competition(), updated in place
+            index: An up-to-date index (default: bring the one in data_dir up to date)
+
+        Returns:
+            The same results dict
+        """
+        if index is None:
+            index = self.update_tenure_index()
+        for netuid, stats in results.items():
+            stats.update(index.distribution(netuid))
+        return results
+
+    def write_metrics(self):
+        """Write the run's metrics to metrics_file, if one was configured."""
+        if self.metrics_file is not None:
+            self.metrics.write(self.metrics_file)
+
+    def get_store(self) -> SnapshotStore:
+        """Open the SQLite store (data_dir/snapshots.db unless sqlite_path is set)."""
+        if self._store is None:
+            if self.sqlite_path is None:
+                self.sqlite_path = self.data_dir / "snapshots.db"
+            self._store = SnapshotStore(self.sqlite_path)
+        return self._store
+
+    def import_to_sqlite(self) -> int:
+        """
+        Import every snapshot in data_dir that the SQLite store does not have yet.
+
+        Returns:
+            Number of snapshots imported
+        """
+        store = self.get_store()
+        imported = 0
+        for path in self.get_all_snapshots():
+            stem = snapshot_stem(path)
+            if store.has_snapshot(stem):
+                continue
+            store.add_snapshot(stem, self.load_snapshot(path))
+            imported += 1
+            print(f"  Imported {path.name}")
+        return imported
+
+    def benchmark_collection(self, sample: int = 8) -> Dict:
+        """
+        Time the full-metagraph and lite collection paths on the same subnets.
+
+        Args:
+            sample: Number of subnets to fetch with each path
+
+        Returns:
+            Per-path timings plus the number of subnets whose maps differ
+        """
+        netuids = [netuid for netuid in self.get_all_subnet_ids() if netuid is not None][:sample]
+        if not netuids:
+            return {}
+
+        block = self.get_current_block()
+        timings = {}
+        maps = {}
+        for mode, fetch in (
+            ("full", lambda n: self.fetch_subnet_record(n)),
+            ("lite", lambda n: self.fetch_subnet_record_lite(n, block=block)),
+        ):
+            started = time.perf_counter()
+            records = {netuid: fetch(netuid) for netuid in netuids}
+            elapsed = time.perf_counter() - started
+            maps[mode] = {n: r["uid_hotkey_map"] for n, r in records.items() if r}
+            timings[mode] = {
+                "seconds": elapsed,
+                "per_subnet_ms": elapsed / len(netuids) * 1000,
+                "subnets_ok": len(maps[mode]),
+                "uids": sum(len(m) for m in maps[mode].values()),
+            }
+
+        mismatched = [n for n in netuids if maps["full"].get(n) != maps["lite"].get(n)]
+        return {
+            "netuids": netuids,
+            "full": timings["full"],
+            "lite": timings["lite"],
+            "speedup": timings["full"]["seconds"] / timings["lite"]["seconds"] if timings["lite"]["seconds"] > 0 else 0,
+            "mismatched_netuids": mismatched
+        }
+
+    def load_snapshot(self, filepath: str) -> Dict:
+        """
+        Load a snapshot from file (JSON, binary or delta).
+
+        Binary snapshots are loaded lazily: only the header is parsed, and
+        each subnet's uid_hotkey_map is decoded the first time it is read.
+        """
+        if is_delta_path(filepath):
+            return self._load_delta_snapshot(Path(filepath))
+
+        if Path(filepath).suffix == BINARY_SUFFIX:
+            state = BinarySnapshot(filepath).to_dict(lazy=True)
+        else:
+            with open(filepath, 'r') as f:
+                state = json.load(f)
+        self._state_cache = (Path(filepath).name, state)
+        return state
+
+    def _load_delta_snapshot(self, filepath: Path) -> Dict:
+        """Rebuild a delta snapshot by replaying its chain from the nearest keyframe."""
+        chain = delta_chain(self.get_all_snapshots(), self.data_dir / filepath.name)
+        names = [path.name for path in chain]
+
+        # Resume from the last rebuilt state when it sits on this chain
+        cached_name, state = self._state_cache or (None, None)
+        if cached_name in names:
+            start = names.index(cached_name) + 1
+        else:
+            state = self.load_snapshot(chain[0])
+            start = 1
+
+        for previous, path in zip(chain[start - 1:], chain[start:]):
+            with open(path, 'r') as f:
+                delta = json.load(f)
+            if delta["delta"]["previous"] != snapshot_stem(previous):
+                raise ValueError(f"{path.name} was built against {delta['delta']['previous']}, "
+                                 f"not {snapshot_stem(previous)}")
+            state = apply_delta(state, delta)
+            self._state_cache = (path.name, state)
+
+        return state
+
+    def get_all_snapshots(self) -> List[Path]:
+        """
+        Get all snapshot files sorted by timestamp.
+
+        When a snapshot exists in both formats (e.g. after convert), only the
+        binary copy is returned so the period is not analyzed twice.
+        """
+        snapshots = {}
+        for path in self.data_dir.glob("snapshot_*.json"):
+            snapshots.setdefault(path.stem, path)
+        for path in self.data_dir.glob(f"snapshot_*{BINARY_SUFFIX}"):
+            snapshots[path.stem] = path
+        return [snapshots[stem] for stem in sorted(snapshots)]
+
+    def convert_snapshots(self, delete_source: bool = False) -> List[Path]:
+        """
+        Convert every JSON snapshot in data_dir to the binary format.
+
+        Args:
+            delete_source: Remove each JSON file once its binary copy is written
+
+        Returns:
+            Paths of the binary files written
+        """
+        converted = []
+        for json_path in sorted(self.data_dir.glob("snapshot_*.json")):
+            if is_delta_path(json_path):
+                continue
+            binary_path = json_path.with_suffix(BINARY_SUFFIX)
+            if not binary_path.exists():
+                convert_json_snapshot(json_path, binary_path)
+                converted.append(binary_path)
+                print(f"  {json_path.name} -> {binary_path.name} "
+                      f"({json_path.stat().st_size:,} -> {binary_path.stat().st_size:,} bytes)")
+            if delete_source:
+                json_path.unlink()
+        return converted
+
+    def compact(self, keep_full: int, keep_hourly: int, dry_run: bool = False) -> Dict:
+        """
+        Apply the retention policy to data_dir (see retention.py).
+
+        Empty and unreadable snapshots are quarantined. Of the rest, the
+        snapshots the policy drops are summed into archived pairs between
+        the ones it keeps, kept deltas that were built against a removed
+        file are rewritten in full, and only then are files removed.
+
+        Args:
+            keep_full: Age in milliseconds, before the latest snapshot, up to which every snapshot is kept
+            keep_hourly: Age up to which the last snapshot of each hour is kept; older days keep their last
+            dry_run: Report what would be removed without touching any snapshot
+
+        Returns:
+            {"quarantined", "dropped", "rewritten", "archived_pairs", "bytes_freed"}
+        """
+        archive = PairArchive(self.data_dir / ARCHIVE_FILENAME)
+        if archive.pending and not dry_run:
+            print(f"Finishing an interrupted compaction ({len(archive.pending)} files)")
+            self._remove_pending(archive)
+
+        snapshots = self.get_all_snapshots()
+        index = SnapshotIndex(self.data_dir / SNAPSHOT_INDEX_FILENAME)
+        quarantine = {}
+        for path in index.unindexed(snapshots):
+            try:
+                read_blocks(path)
+            except Exception as e:
+                quarantine[path] = f"unreadable ({e})"
+        # A delta can't be rebuilt past an unreadable file in its chain
+        chain_error = "no keyframe before it"
+        for path in snapshots:
+            if not is_delta_path(path):
+                chain_error = None
+            elif chain_error is not None:
+                quarantine.setdefault(path, chain_error)
+            if path in quarantine and chain_error is None:
+                chain_error = f"{path.name} in its delta chain is unreadable"
+
+        valid = [path for path in snapshots if path not in quarantine]
+        with self.metrics.phase("index"):
+            index.refresh(valid)
+        for path in valid:
+            # Sweeps that fetched no subnet have no blocks
+            if index.blocks(path):
+                continue
+            try:
+                if is_empty(path):
+                    quarantine[path] = "no fetched subnets"
+            except Exception as e:
+                quarantine[path] = f"unreadable ({e})"
+
+        history = [path for path in snapshots if path not in quarantine]
+        keep = plan_retention([snapshot_stem(path) for path in history], keep_full, keep_hourly)
+        kept = [path for path, flag in zip(history, keep) if flag]
+        dropped = [path for path, flag in zip(history, keep) if not flag]
+        survivors = set(kept)
+        # Deltas built against a file that is going away
+        rewrite = [path for previous, path in zip(snapshots, snapshots[1:])
+                   if path in survivors and is_delta_path(path) and previous not in survivors]
+        # Consecutive kept snapshots with dropped ones in between become archived pairs
+        position = {path: i for i, path in enumerate(history)}
+        ranges = [(old, new) for old, new in zip(kept, kept[1:]) if position[new] - position[old] > 1]
+        report = {
+            "quarantined": len(quarantine),
+            "dropped": len(dropped),
+            "rewritten": len(rewrite),
+            "archived_pairs": len(ranges),
+            "bytes_freed": sum(path.stat().st_size for path in dropped)
+        }
+        for path, reason in quarantine.items():
+            print(f"  quarantine {path.name}: {reason}")
+        if dry_run or not (quarantine or dropped):
+            return report
+
+        def steps(first: Path, last: Path) -> List[tuple]:
+            """Consecutive pairs of the history from first to last."""
+            run = history[position[first]:position[last] + 1]
+            return list(zip(run, run[1:]))
+
+        # Pairs archived by an earlier compaction are merged as they are; the rest need a summary
+        cache = AnalysisCache(self.data_dir / CACHE_FILENAME) if self.use_cache else None
+        summaries = {}
+        missing = []
+        for first, last in ranges:
+            for pair in steps(first, last):
+                if archive.get(*pair) is not None:
+                    continue
+                summary = cache.get(*pair) if cache is not None else None
+                if summary is None:
+                    missing.append(pair)
+                else:
+                    summaries[pair] = summary
+        if missing:
+            print(f"Diffing {len(missing)} pairs to archive their counts...")
+        computed, _ = self._summarize_pairs(missing)
+        summaries.update(computed)
+
+        for first, last in ranges:
+            entries = []
+            for old_path, new_path in steps(first, last):
+                archived = archive.get(old_path, new_path)
+                if archived is None:
+                    summary = summaries[(old_path, new_path)]
+                    archived = {"pairs": 1, "summary": summary, "block_totals": block_increments(
+                        summary, self._index_spans(index, old_path, new_path))}
+                entries.append(archived)
+            archive.put(first, last, merge_pairs(entries))
+
+        # Rebuild while every file of their chains is still there
+        for path in rewrite:
+            state = self.load_snapshot(path)
+            full = {**state, "subnets": {
+                netuid: {**data, "uid_hotkey_map": dict(data["uid_hotkey_map"])} if "uid_hotkey_map" in data else data
+                for netuid, data in state["subnets"].items()
+            }}
+            written = self._write_full_snapshot(snapshot_stem(path), full)
+            path.unlink()
+            print(f"  {path.name} -> {written.name} (its delta chain is compacted)")
+
+        # The pairs that replace the dropped files are saved before any of them is removed,
+        # and the pairs they supersede only go once they are
+        archive.pending = [path.name for path in dropped]
+        archive.save()
+        archive.prune(kept)
+        self._remove_pending(archive)
+
+        quarantine_dir = self.data_dir / QUARANTINE_DIRNAME
+        quarantine_dir.mkdir(exist_ok=True)
+        for path in quarantine:
+            os.replace(path, quarantine_dir / path.name)
+
+        self.update_snapshot_index()
+        if (self.data_dir / ROLLING_FILENAME).exists():
+            self.update_rolling_rankings()
+        return report
+
+    def _remove_pending(self, archive: PairArchive):
+        """Delete the files a compaction archived, then clear them from the archive."""
+        for name in archive.pending:
+            (self.data_dir / name).unlink(missing_ok=True)
+        archive.pending = []
+        archive.save()
+
+    def compare_snapshots(self, old_snapshot: Dict, new_snapshot: Dict,
+                          counts_only: bool = False) -> Dict[str, Dict]:
+        """
+        Compare two snapshots to detect deregistrations and replacements.
+
+        Args:
+            old_snapshot: Earlier snapshot
+            new_snapshot: Later snapshot
+            counts_only: Allow the engine to skip building per-UID change lists
+                (the numpy engine then omits them; the count fields are always set)
+
+        Subnets whose map digests match on both sides are skipped without
+        reading their maps, so with lazily loaded (binary) snapshots the
+        cost follows the number of subnets that changed.
+
+        Returns:
+            Dictionary mapping netuid to change statistics
+        """
+        if self.diff_engine == "numpy":
+            if self._vector_engine is None:
+                from diff_engine import VectorizedDiffEngine
+                self._vector_engine = VectorizedDiffEngine()
+            return self._vector_engine.compare(old_snapshot, new_snapshot, materialize=not counts_only)
+
+        changes = {}
+
+        old_subnets = old_snapshot.get("subnets", {})
+        new_subnets = new_snapshot.get("subnets", {})
+
+        # Check all subnets that exist in both snapshots
+        for netuid in set(old_subnets.keys()) | set(new_subnets.keys()):
+            change = self._compare_subnet(old_subnets.get(netuid, {}), new_subnets.get(netuid, {}))
+            if change:
+                changes[netuid] = change
+
+        return changes
+
+    @staticmethod
+    def _compare_subnet(old_data: Dict, new_data: Dict) -> Optional[Dict]:
+        """
+        Change statistics of one subnet between two snapshots.
+
+        Args:
+            old_data: Subnet record in the earlier snapshot ({} if absent)
+            new_data: Subnet record in the later snapshot ({} if absent)
+
+        Returns:
+            The compare_snapshots() entry for the subnet, or None if nothing changed
+        """
+        # A subnet that failed to fetch on either side can't be compared
+        if old_data.get("missing") or new_data.get("missing"):
+            return None
+        # Equal digests mean equal maps; skip without reading them
+        if old_data.get("digest") and old_data.get("digest") == new_data.get("digest"):
+            return None
+
+        old_mapping = old_data.get("uid_hotkey_map", {})
+        new_mapping = new_data.get("uid_hotkey_map", {})
+
+        # Convert string keys to int for comparison
+        old_mapping = {int(k): v for k, v in old_mapping.items()}
+        new_mapping = {int(k): v for k, v in new_mapping.items()}
+
+        # Find UIDs where hotkey changed (deregistration + replacement)
+        replacements = []
+        new_registrations = []
+        deregistrations = []
+
+        for uid in set(old_mapping.keys()) | set(new_mapping.keys()):
+            old_hotkey = old_mapping.get(uid)
+            new_hotkey = new_mapping.get(uid)
+
+            if old_hotkey and new_hotkey and old_hotkey != new_hotkey:
+                # UID exists in both but hotkey changed = replacement
+                replacements.append({
+                    "uid": uid,
+                    "old_hotkey": old_hotkey,
+                    "new_hotkey": new_hotkey
+                })
+            elif old_hotkey and not new_hotkey:
+                # UID was in old but not new = deregistration (no replacement yet)
+                deregistrations.append({"uid": uid, "hotkey": old_hotkey})
+            elif new_hotkey and not old_hotkey:
+                # UID in new but not old = new registration
+                new_registrations.append({"uid": uid, "hotkey": new_hotkey})
+
+        if not (replacements or new_registrations or deregistrations):
+            return None
+        return {
+            "replacements": replacements,
+            "new_registrations": new_registrations,
+            "deregistrations": deregistrations,
+            "total_changes": len(replacements) + len(new_registrations) + len(deregistrations),
+            "replacement_count": len(replacements),
+            "new_registration_count": len(new_registrations),
+            "deregistration_count": len(deregistrations),
+            "total_uids_old": len(old_mapping),
+            "total_uids_new": len(new_mapping)
+        }
+
+    def compare_snapshot_files(self, old_path: Path, new_path: Path) -> Dict[str, Dict]:
+        """
+        Compare two snapshot files while holding about one subnet per side in memory.
+
+        Both files are streamed and walked together in netuid order, and
+        each subnet is diffed as soon as both sides of it have been read.
+        Delta snapshots, and files whose subnets are not in netuid order,
+        are loaded in full and compared with compare_snapshots() instead.
+
+        Args:
+            old_path: Earlier snapshot file
+            new_path: Later snapshot file
+
+        Returns:
+            Same result as compare_snapshots() on the loaded snapshots
+        """
+        if not (is_delta_path(old_path) or is_delta_path(new_path)):
+            changes = {}
+            try:
+                for netuid, old_data, new_data in merge_walk(iter_snapshot_subnets(old_path),
+                                                             iter_snapshot_subnets(new_path)):
+                    change = self._compare_subnet(old_data or {}, new_data or {})
+                    if change:
+                        changes[netuid] = change
+                return changes
+            except SnapshotOrderError as e:
+                print(f"{e}; loading {Path(old_path).name} and {Path(new_path).name} in full", file=sys.stderr)
+
+        return self.compare_snapshots(self.load_snapshot(old_path), self.load_snapshot(new_path))
+
+    @staticmethod
+    def _new_subnet_stats() -> Dict:
+        """Zeroed per-subnet aggregate used by analyze_competition."""
+        return {
+            "total_replacements": 0,
+            "total_new_registrations": 0,
+            "total_deregistrations": 0,
+            "total_changes": 0,
+            "time_periods": 0,
+            "total_uids": 0,
+            "uid_samples": 0
+        }
+
+    def summarize_changes(self, changes: Dict[str, Dict]) -> Dict[str, Dict]:
         """
-        Take a snapshot of all subnet metagraphs.
+        Reduce a compare_snapshots() result to per-subnet stat increments.
+
+        Summaries only hold counters, so they can be cached and summed in
+        any grouping to produce the same aggregate.
+
+        Args:
+            changes: Output of compare_snapshots()
 
         Returns:
-            Path to the snapshot file
+            Dictionary mapping netuid to the increments for that pair
         """
-        timestamp = datetime.now().isoformat()
-        snapshot = {
-            "timestamp": timestamp,
-            "network": self.network,
-            "subnets": {}
-        }
+        summary = {}
+        for netuid, change_data in changes.items():
+            summary[netuid] = {
+                "total_replacements": change_data["replacement_count"],
+                "total_new_registrations": change_data["new_registration_count"],
+                "total_deregistrations": change_data["deregistration_count"],
+                "total_changes": change_data["total_changes"],
+                "time_periods": 1,
+                # Track average UIDs for percentage calculation
+                "total_uids": change_data.get("total_uids_new", 0),
+                "uid_samples": 1
+            }
+        return summary
 
-        print(f"Taking snapshot at {timestamp}...")
-        subnet_ids = self.get_all_subnet_ids()
-        print(f"Found {len(subnet_ids)} subnets")
+    @staticmethod
+    def merge_subnet_stats(subnet_stats: Dict[str, Dict], summary: Dict[str, Dict]):
+        """Add per-subnet increments (or partial aggregates) into subnet_stats in place."""
+        for netuid, increments in summary.items():
+            stats = subnet_stats[netuid]
+            for key, value in increments.items():
+                stats[key] = stats.get(key, 0) + value
 
-        for netuid in subnet_ids:
-            if netuid is None:
-                continue
-            print(f"  Fetching subnet {netuid}...", end=" ", flush=True)
-            metagraph = self.get_subnet_metagraph(netuid)
-            if metagraph:
-                uid_mapping = self.extract_uid_hotkey_mapping(metagraph)
-
-                # Store basic metadata as well
-                snapshot["subnets"][str(netuid)] = {
-                    "uid_hotkey_map": uid_mapping,
-                    "n_neurons": len(metagraph.uids),
-                    "block": metagraph.block.item() if hasattr(metagraph.block, 'item') else int(metagraph.block)
-                }
-                print(f"✓ ({len(uid_mapping)} UIDs)")
+    def iter_snapshot_pairs(self, snapshots: List[Path]):
+        """
+        Yield consecutive (old_path, old_snapshot, new_path, new_snapshot) pairs.
+
+        A sliding window over the sequence: each file is parsed once and
+        reused as the old side of the following pair. A file the tracker
+        loaded or wrote last (e.g. the previous sweep's snapshot in the
+        daemon) is taken from memory.
+
+        Args:
+            snapshots: Snapshot paths in timestamp order
+        """
+        previous_path = None
+        previous = None
+        for path in snapshots:
+            cached_name, cached = self._state_cache or (None, None)
+            if Path(path).name == cached_name:
+                current = cached
             else:
-                print("✗ (failed)")
+                with self.metrics.phase("load"):
+                    current = self.load_snapshot(path)
+            if previous_path is not None:
+                yield previous_path, previous, path, current
+            previous_path, previous = path, current
 
-        # Save snapshot
-        snapshot_file = self.data_dir / f"snapshot_{timestamp.replace(':', '-')}.json"
-        with open(snapshot_file, 'w') as f:
-            json.dump(snapshot, f, indent=2)
+    def _pair_summaries(self, snapshots: List[Path]):
+        """
+        Yield (old_path, new_path, summary, spans, block_totals) for consecutive snapshots.
 
-        print(f"\nSnapshot saved to {snapshot_file}")
-        return str(snapshot_file)
+        summary is summarize_changes() of the pair and spans the blocks
+        between the two reads of every subnet with a block on both sides.
+        Pairs merged by compact are read from the pair archive and come
+        with their block_totals (None for pairs that were diffed).
+        """
+        archive = PairArchive(self.data_dir / ARCHIVE_FILENAME)
+        run = []
+        for old_path, new_path in zip(snapshots, snapshots[1:]):
+            archived = archive.get(old_path, new_path)
+            if archived is None:
+                run = run or [old_path]
+                run.append(new_path)
+                continue
+            yield from self._diff_run(run)
+            run = []
+            spans = {netuid: totals["blocks"] for netuid, totals in archived["block_totals"].items()}
+            yield old_path, new_path, archived["summary"], spans, archived["block_totals"]
+        yield from self._diff_run(run)
+
+    def _diff_run(self, run: List[Path]):
+        """_pair_summaries() of a contiguous run of snapshots, diffing every pair."""
+        for old_path, old, new_path, new in self.iter_snapshot_pairs(run):
+            with self.metrics.phase("diff"):
+                summary = self.summarize_changes(self.compare_snapshots(old, new, counts_only=True))
+            old_blocks = subnet_blocks(old["subnets"])
+            spans = {
+                netuid: block - old_blocks[netuid]
+                for netuid, block in subnet_blocks(new["subnets"]).items()
+                if netuid in old_blocks and block > old_blocks[netuid]
+            }
+            yield old_path, new_path, summary, spans, None
+
+    @staticmethod
+    def _contiguous_runs(pairs: List[tuple]) -> List[List[Path]]:
+        """Group consecutive pairs into runs of snapshot paths [a, b, c, ...]."""
+        runs = []
+        for old_path, new_path in pairs:
+            if not runs or runs[-1][-1] != old_path:
+                runs.append([old_path])
+            runs[-1].append(new_path)
+        return runs
+
+    def _summarize_pairs(self, pairs: List[tuple]) -> tuple:
+        """
+        Diff the given pairs, loading each file at most once per contiguous run.
 
-    def load_snapshot(self, filepath: str) -> Dict:
-        """Load a snapshot from file."""
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        Returns:
+            (per-pair summaries, subnet_stats aggregated over those pairs)
+        """
+        if self.jobs > 1 and len(pairs) > 1:
+            return self._summarize_pairs_parallel(pairs)
+
+        summaries = {}
+        for run in self._contiguous_runs(pairs):
+            summaries.update(self._summarize_run(run))
+        partial = defaultdict(self._new_subnet_stats)
+        for summary in summaries.values():
+            self.merge_subnet_stats(partial, summary)
+        return summaries, partial
+
+    def _summarize_pairs_parallel(self, pairs: List[tuple]) -> tuple:
+        """
+        Diff pairs on a process pool, one chunk of consecutive pairs per task.
 
-    def get_all_snapshots(self) -> List[Path]:
-        """Get all snapshot files sorted by timestamp."""
-        snapshots = list(self.data_dir.glob("snapshot_*.json"))
-        return sorted(snapshots)
+        Each chunk returns its per-pair summaries and its partial
+        subnet_stats. Partials only hold counters, so merging them in
+        completion order gives the same totals as the serial path.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunk_pairs = max(1, -(-len(pairs) // (self.jobs * 4)))
+        chunks = []
+        for run in self._contiguous_runs(pairs):
+            for start in range(0, len(run) - 1, chunk_pairs):
+                chunks.append([str(path) for path in run[start:start + chunk_pairs + 1]])
 
-    def compare_snapshots(self, old_snapshot: Dict, new_snapshot: Dict) -> Dict[str, Dict]:
+        options = {
+            "data_dir": str(self.data_dir),
+            "network": self.network,
+            "diff_engine": self.diff_engine,
+            "use_cache": False,
+            "streaming": self.streaming
+        }
+        print(f"Diffing {len(pairs)} pairs in {len(chunks)} chunks on {self.jobs} processes...")
+
+        summaries = {}
+        partial = defaultdict(self._new_subnet_stats)
+        # Loading happens in the workers, so the parallel diff phase includes it
+        with self.metrics.phase("diff"), ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            futures = [pool.submit(_analyze_chunk, options, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                chunk_summaries, chunk_stats = future.result()
+                for old_path, new_path, summary in chunk_summaries:
+                    summaries[(Path(old_path), Path(new_path))] = summary
+                self.merge_subnet_stats(partial, chunk_stats)
+        return summaries, partial
+
+    def _summarize_run(self, run: List[Path]) -> Dict[tuple, Dict]:
+        """Summaries for every consecutive pair in a contiguous run of snapshots."""
+        summaries = {}
+        if self.streaming:
+            # Every file is read twice (as the new, then the old side), but only one subnet at a time
+            for old_path, new_path in zip(run, run[1:]):
+                with self.metrics.phase("diff"):
+                    summaries[(old_path, new_path)] = self.summarize_changes(
+                        self.compare_snapshot_files(old_path, new_path))
+            return summaries
+
+        for old_path, old_snap, new_path, new_snap in self.iter_snapshot_pairs(run):
+            with self.metrics.phase("diff"):
+                changes = self.compare_snapshots(old_snap, new_snap, counts_only=True)
+                summaries[(old_path, new_path)] = self.summarize_changes(changes)
+        return summaries
+
+    def ingest_events(self, from_block: Optional[int] = None, to_block: Optional[int] = None,
+                      batch_blocks: int = 100, source: Optional[object] = None) -> Optional[int]:
         """
-        Compare two snapshots to detect deregistrations and replacements.
+        Scan chain registration events into the event log in data_dir.
+
+        On the first run the slot state is seeded from the latest snapshot,
+        so the first registration on an occupied UID counts as a replacement,
+        and scanning starts right after that snapshot's block. A resumed run
+        rebuilds the slot state from the newest snapshot inside the scanned
+        block range and the events logged after it.
 
         Args:
-            old_snapshot: Earlier snapshot
-            new_snapshot: Later snapshot
+            from_block: First block to scan when no cursor exists (overrides snapshot seeding)
+            to_block: Last block to scan (default: chain head)
+            batch_blocks: Blocks per checkpoint
+            source: Event source (default: the tracker's Subtensor connection)
 
         Returns:
-            Dictionary mapping netuid to change statistics
+            Number of events appended, or None if there is nowhere to start
         """
-        changes = {}
-
-        old_subnets = old_snapshot.get("subnets", {})
-        new_subnets = new_snapshot.get("subnets", {})
+        ingestor = EventIngestor(source, self.data_dir)
+        cursor = ingestor.cursor
+        if cursor["last_block"] is None and from_block is None:
+            snapshots = self.get_all_snapshots()
+            if snapshots:
+                latest = self.load_snapshot(snapshots[-1])
+                blocks = [data.get("block") for data in latest.get("subnets", {}).values() if data.get("block")]
+                if blocks:
+                    ingestor.seed(latest, max(blocks))
+                    print(f"Seeded slot state from {snapshots[-1].name} at block {max(blocks)}")
+            if cursor["last_block"] is None:
+                print("No ingest cursor and no snapshot with block numbers to seed from; "
+                      "pass --from-block to choose the first block to scan", file=sys.stderr)
+                return None
+        elif cursor["last_block"] is not None:
+            # The newest snapshot read inside the scanned range, so the log covers everything after it
+            entries = [entry for entry in self.update_snapshot_index().entries if entry["block"] is not None
+                       and cursor["first_block"] - 1 <= entry["block"] <= cursor["last_block"]]
+            snapshot = self.load_snapshot(self.data_dir / entries[-1]["name"]) if entries else None
+            replayed = ingestor.rebuild(snapshot)
+            print(f"Rebuilt slot state at block {cursor['last_block']} from "
+                  + (f"{entries[-1]['name']} and " if entries else "") + f"{replayed} logged events")
+
+        if source is None:
+            self.connect()
+            ingestor.source = SubtensorEventSource(self.subtensor)
+        return ingestor.ingest(from_block=from_block, to_block=to_block, batch_blocks=batch_blocks)
 
-        # Check all subnets that exist in both snapshots
-        for netuid in set(old_subnets.keys()) | set(new_subnets.keys()):
-            old_mapping = old_subnets.get(netuid, {}).get("uid_hotkey_map", {})
-            new_mapping = new_subnets.get(netuid, {}).get("uid_hotkey_map", {})
-
-            # Convert string keys to int for comparison
-            old_mapping = {int(k): v for k, v in old_mapping.items()}
-            new_mapping = {int(k): v for k, v in new_mapping.items()}
-
-            # Find UIDs where hotkey changed (deregistration + replacement)
-            replacements = []
-            new_registrations = []
-            deregistrations = []
-
-            for uid in set(old_mapping.keys()) | set(new_mapping.keys()):
-                old_hotkey = old_mapping.get(uid)
-                new_hotkey = new_mapping.get(uid)
-
-                if old_hotkey and new_hotkey and old_hotkey != new_hotkey:
-                    # UID exists in both but hotkey changed = replacement
-                    replacements.append({
-                        "uid": uid,
-                        "old_hotkey": old_hotkey,
-                        "new_hotkey": new_hotkey
-                    })
-                elif old_hotkey and not new_hotkey:
-                    # UID was in old but not new = deregistration (no replacement yet)
-                    deregistrations.append({"uid": uid, "hotkey": old_hotkey})
-                elif new_hotkey and not old_hotkey:
-                    # UID in new but not old = new registration
-                    new_registrations.append({"uid": uid, "hotkey": new_hotkey})
-
-            if replacements or new_registrations or deregistrations:
-                changes[netuid] = {
-                    "replacements": replacements,
-                    "new_registrations": new_registrations,
-                    "deregistrations": deregistrations,
-                    "total_changes": len(replacements) + len(new_registrations) + len(deregistrations),
-                    "replacement_count": len(replacements),
-                    "total_uids_old": len(old_mapping),
-                    "total_uids_new": len(new_mapping)
-                }
+    def update_snapshot_index(self, snapshots: Optional[List[Path]] = None) -> SnapshotIndex:
+        """
+        Bring the snapshot metadata index up to date with the files in data_dir.
 
-        return changes
+        Args:
+            snapshots: get_all_snapshots() result, if already listed
 
-    def analyze_competition(self, min_snapshots: int = 2) -> Dict:
+        Returns:
+            The refreshed index, aligned with the snapshot list
+        """
+        if snapshots is None:
+            snapshots = self.get_all_snapshots()
+        index = SnapshotIndex(self.data_dir / SNAPSHOT_INDEX_FILENAME)
+        with self.metrics.phase("index"):
+            read = index.refresh(snapshots)
+        if read:
+            print(f"Indexed {read} snapshots")
+        return index
+
+    def analyze_competition(self, min_snapshots: int = 2, source: str = "snapshots",
+                            period_blocks: int = 360, since: Optional[str] = None,
+                            until: Optional[str] = None, window: Optional[str] = None) -> Dict:
         """
-        Analyze competition across all snapshots.
+        Analyze competition across all snapshots, or the ones inside a window.
+
+        With the analysis cache enabled, pairs diffed by an earlier run are
+        not reloaded, and new pairs are merged into the cached aggregate.
 
         Args:
             min_snapshots: Minimum number of snapshots required for analysis
+            source: "snapshots" to diff snapshot pairs, or "events" to count
+                every slot change in the ingested event log
+            period_blocks: Blocks per period when source is "events"
+            since: Only snapshots at or after this ISO timestamp or block
+            until: Only snapshots at or before this ISO timestamp or block
+            window: Read a rolling window (1h, 24h, 7d, all) from the
+                materialized rankings instead of diffing the history
 
         Returns:
             Analysis results with competition metrics per subnet
         """
+        windowed = since is not None or until is not None
+        if window is not None:
+            if windowed or source != "snapshots":
+                print("--window can't be combined with --since/--until or --source events", file=sys.stderr)
+                return {}
+            if window not in WINDOWS:
+                print(f"Unknown window {window}; choose from {', '.join(WINDOWS)}", file=sys.stderr)
+                return {}
+            with self.metrics.phase("aggregate"):
+                return self.rolling_results(window)
+        if source == "events":
+            if windowed:
+                print("--since/--until only apply to snapshot analysis", file=sys.stderr)
+                return {}
+            cursor_path = self.data_dir / CURSOR_FILENAME
+            if not cursor_path.exists():
+                print("No event log found. Run the ingest command first.")
+                return {}
+            with open(cursor_path, 'r') as f:
+                cursor = json.load(f)
+            print(f"\nAnalyzing events from block {cursor['first_block']} to {cursor['last_block']}...")
+            with self.metrics.phase("aggregate"):
+                return self._finalize_results(
+                    summarize_events(self.data_dir / EVENT_LOG_FILENAME, cursor, period_blocks))
+
+        try:
+            since_bound, until_bound = parse_bound(since), parse_bound(until)
+        except ValueError as e:
+            print(f"Invalid window bound: {e}", file=sys.stderr)
+            return {}
+
         snapshots = self.get_all_snapshots()
+        index = self.update_snapshot_index(snapshots)
+        if windowed:
+            snapshots = snapshots[index.window(since_bound, until_bound)]
 
         if len(snapshots) < min_snapshots:
             print(f"Need at least {min_snapshots} snapshots for analysis. Found {len(snapshots)}.")
             return {}
 
-        print(f"\nAnalyzing {len(snapshots)} snapshots...")
+        if windowed:
+            print(f"\nAnalyzing {len(snapshots)} snapshots from {snapshots[0].name} to {snapshots[-1].name}...")
+        else:
+            print(f"\nAnalyzing {len(snapshots)} snapshots...")
 
         # Aggregate changes across all snapshot pairs
-        subnet_stats = defaultdict(lambda: {
-            "total_replacements": 0,
-            "total_new_registrations": 0,
-            "total_deregistrations": 0,
-            "total_changes": 0,
-            "time_periods": 0,
-            "total_uids": 0,
-            "uid_samples": 0
-        })
+        subnet_stats = defaultdict(self._new_subnet_stats)
+        pairs = list(zip(snapshots, snapshots[1:]))
+
+        with self.metrics.phase("cache"):
+            cache = AnalysisCache(self.data_dir / CACHE_FILENAME) if self.use_cache else None
+            start = 0
+            if cache is not None:
+                start, cached_stats = cache.resume_aggregate(pairs)
+                self.merge_subnet_stats(subnet_stats, cached_stats)
+
+            pending = pairs[start:]
+            summaries = {}
+            # Pairs merged by compact have no files in between to diff
+            archive = PairArchive(self.data_dir / ARCHIVE_FILENAME)
+            for old_path, new_path in pairs:
+                archived = archive.get(old_path, new_path)
+                if archived is not None:
+                    summaries[(old_path, new_path)] = archived["summary"]
+            if cache is not None:
+                for old_path, new_path in pending:
+                    if (old_path, new_path) in summaries:
+                        continue
+                    summary = cache.get(old_path, new_path)
+                    if summary is not None:
+                        summaries[(old_path, new_path)] = summary
+
+        missing = [pair for pair in pending if pair not in summaries]
+        if cache is not None and pairs:
+            print(f"Reused {len(pairs) - len(missing)} cached pairs, diffing {len(missing)} new")
+        computed, computed_stats = self._summarize_pairs(missing)
+        self.metrics.count("pairs_diffed", len(missing))
+        self.metrics.count("pairs_cached", len(pairs) - len(missing))
+
+        with self.metrics.phase("aggregate"):
+            for pair in pending:
+                if pair not in computed:
+                    self.merge_subnet_stats(subnet_stats, summaries[pair])
+            self.merge_subnet_stats(subnet_stats, computed_stats)
+
+            if cache is not None:
+                for (old_path, new_path), summary in computed.items():
+                    cache.put(old_path, new_path, summary)
+                # A window only sees part of the history, so it must not
+                # evict or replace what full runs have cached
+                if not windowed:
+                    cache.prune(pairs)
+                    cache.set_aggregate(pairs, subnet_stats)
+                cache.save()
+
+            results = self._finalize_results(subnet_stats)
+            self.attach_block_rates(results, pairs, {**summaries, **computed}, index, cache, archive)
+            self.attach_cost_metrics(results, pairs, {**summaries, **computed}, cache)
+        return results
 
-        for i in range(len(snapshots) - 1):
-            old_snap = self.load_snapshot(snapshots[i])
-            new_snap = self.load_snapshot(snapshots[i + 1])
+    def attach_block_rates(self, results: Dict, pairs: List[tuple], summaries: Dict[tuple, Dict],
+                           index: SnapshotIndex, cache: Optional[AnalysisCache] = None,
+                           archive: Optional[PairArchive] = None) -> Dict:
+        """
+        Add churn rates per 1000 blocks to analysis results.
 
-            changes = self.compare_snapshots(old_snap, new_snap)
+        Snapshots can be minutes or days apart, so counts per period are not
+        comparable across pairs. Each pair instead contributes the blocks
+        between the two reads of each subnet, taken from the snapshot index.
+        Subnets without a block on both sides (older snapshots, missing
+        fetches) contribute neither blocks nor changes for that pair.
 
-            for netuid, change_data in changes.items():
-                stats = subnet_stats[netuid]
-                stats["total_replacements"] += change_data["replacement_count"]
-                stats["total_new_registrations"] += len(change_data["new_registrations"])
-                stats["total_deregistrations"] += len(change_data["deregistrations"])
-                stats["total_changes"] += change_data["total_changes"]
-                stats["time_periods"] += 1
+        Args:
+            results: Output of _finalize_results(), updated in place
+            pairs: Every consecutive (old, new) snapshot pair analyzed
+            summaries: Per-pair summaries at hand; the rest are read from cache
+            index: Snapshot index refreshed over the analyzed snapshots
+            cache: Analysis cache holding summaries of already aggregated pairs
+            archive: Pair archive; a merged pair adds the block totals of the pairs it replaced
 
-                # Track average UIDs for percentage calculation
-                stats["total_uids"] += change_data.get("total_uids_new", 0)
-                stats["uid_samples"] += 1
+        Returns:
+            The same results dict
+        """
+        totals = defaultdict(lambda: {"blocks": 0, "total_replacements": 0,
+                                      "total_deregistrations": 0, "total_changes": 0})
+        for old_path, new_path in pairs:
+            summary = summaries.get((old_path, new_path))
+            if summary is None and cache is not None:
+                summary = cache.get(old_path, new_path)
+            if summary is None:
+                continue
+            archived = archive.get(old_path, new_path) if archive is not None else None
+            if archived is not None:
+                increments = archived["block_totals"]
+            else:
+                increments = block_increments(summary, self._index_spans(index, old_path, new_path))
+            for netuid, increment in increments.items():
+                total = totals[netuid]
+                for key, value in increment.items():
+                    total[key] += value
+
+        return self._apply_block_rates(results, totals)
+
+    @staticmethod
+    def _index_spans(index: SnapshotIndex, old_path: Path, new_path: Path) -> Dict[str, int]:
+        """Blocks between the two reads of every subnet with a block in both indexed snapshots."""
+        old_blocks = index.blocks(old_path)
+        return {
+            netuid: block - old_blocks[netuid]
+            for netuid, block in index.blocks(new_path).items()
+            if netuid in old_blocks and block > old_blocks[netuid]
+        }
+
+    @staticmethod
+    def _apply_block_rates(results: Dict, totals: Dict[str, Dict]) -> Dict:
+        """Set the per-1000-block rates from per-subnet blocks and counters."""
+        for netuid, stats in results.items():
+            total = totals.get(netuid)
+            if not total or not total["blocks"]:
+                continue
+            per_1k = 1000 / total["blocks"]
+            stats.update({
+                "blocks_observed": total["blocks"],
+                "replacements_per_1k_blocks": total["total_replacements"] * per_1k,
+                "deregistrations_per_1k_blocks": total["total_deregistrations"] * per_1k,
+                "changes_per_1k_blocks": total["total_changes"] * per_1k
+            })
+        return results
+
+    def attach_cost_metrics(self, results: Dict, pairs: List[tuple], summaries: Dict[tuple, Dict],
+                            cache: Optional[AnalysisCache] = None) -> Dict:
+        """
+        Add registration cost metrics to analysis results when a cost series was recorded.
 
-        # Calculate competition scores
+        Args:
+            results: Output of _finalize_results(), updated in place
+            pairs: Every consecutive (old, new) snapshot pair analyzed
+            summaries: Per-pair summaries at hand; the rest are read from cache
+            cache: Analysis cache holding summaries of already aggregated pairs
+
+        Returns:
+            The same results dict
+        """
+        from cost_series import COST_SERIES_DIRNAME, CostSeries, churn_cost_metrics
+
+        series = CostSeries(self.data_dir / COST_SERIES_DIRNAME)
+        if not len(series) or not pairs:
+            return results
+
+        pair_times = []
+        pair_summaries = []
+        for old_path, new_path in pairs:
+            summary = summaries.get((old_path, new_path))
+            if summary is None and cache is not None:
+                summary = cache.get(old_path, new_path)
+            if summary is None:
+                continue
+            pair_times.append((stem_millis(snapshot_stem(old_path)), stem_millis(snapshot_stem(new_path))))
+            pair_summaries.append(summary)
+
+        for netuid, metrics in churn_cost_metrics(series.load(), pair_times, pair_summaries).items():
+            if netuid in results:
+                results[netuid].update(metrics)
+        return results
+
+    def _finalize_results(self, subnet_stats: Dict[str, Dict]) -> Dict:
+        """Turn aggregated counters into per-subnet competition metrics."""
         results = {}
         for netuid, stats in subnet_stats.items():
             # Competition score = replacements per time period
@@ -277,44 +2228,84 @@ class SubnetCompetitionTracker:
 
         return results
 
-    def print_competition_ranking(self, results: Dict, sort_by: str = "replacements"):
+    @staticmethod
+    def rank_results(results: Dict, sort_by: str = "replacements") -> List[tuple]:
         """
-        Print subnet competition ranking.
+        Order analysis results for a ranking.
 
         Args:
             results: Analysis results from analyze_competition()
-            sort_by: Field to sort by (replacements, deregistrations, percentage, changes)
-        """
-        if not results:
-            print("No competition data available.")
-            return
+            sort_by: A SORT_KEYS name (replacements, deregistrations, percentage, changes, tenure, blocks)
 
-        # Determine sort key based on parameter
-        sort_keys = {
-            "replacements": "competition_score",
-            "deregistrations": "avg_deregistrations_per_period",
-            "percentage": "replacement_percentage",
-            "changes": "avg_total_changes_per_period"
-        }
-        sort_key = sort_keys.get(sort_by, "competition_score")
+        Returns:
+            (netuid, stats) tuples, most competitive first
 
+        Raises:
+            ValueError: If sort_by is not a SORT_KEYS name
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort_by}; choose from {', '.join(SORT_KEYS)}")
+        sort_key = SORT_KEYS[sort_by]
+
+        if sort_key == "median_tenure_blocks":
+            # Shorter tenures = more competitive; subnets without completed tenures go last
+            return sorted(
+                results.items(),
+                key=lambda x: x[1].get(sort_key) if x[1].get(sort_key) is not None else float("inf")
+            )
+        if sort_key == "replacements_per_1k_blocks":
+            # Subnets without block coverage go last
+            return sorted(
+                results.items(),
+                key=lambda x: x[1].get(sort_key, -1),
+                reverse=True
+            )
         # Sort by selected metric (descending)
-        ranked = sorted(
+        return sorted(
             results.items(),
             key=lambda x: x[1][sort_key],
             reverse=True
         )
 
+    def print_competition_ranking(self, results: Dict, sort_by: str = "replacements"):
+        """
+        Print subnet competition ranking.
+
+        Args:
+            results: Analysis results from analyze_competition()
+            sort_by: Field to sort by (replacements, deregistrations, percentage, changes, tenure, blocks)
+        """
+        if not results:
+            print("No competition data available.")
+            return
+
+        ranked = self.rank_results(results, sort_by)
+        show_tenure = any("median_tenure_blocks" in stats for stats in results.values())
+        show_blocks = any("replacements_per_1k_blocks" in stats for stats in results.values())
+
         print("\n" + "="*130)
         print("SUBNET COMPETITION RANKING")
         print(f"(Sorted by: {sort_by})")
         print("="*130)
         print()
         print(f"{'Rank':<6} {'Netuid':<8} {'Repl.':<8} {'Dereg.':<8} {'% Repl.':<10} "
-              f"{'Total Repl.':<12} {'Total Dereg.':<12} {'Avg UIDs':<10} {'Periods':<10}")
+              f"{'Total Repl.':<12} {'Total Dereg.':<12} {'Avg UIDs':<10} {'Periods':<10}"
+              + (f" {'Repl./1kB':<10} {'Chg./1kB':<10}" if show_blocks else "")
+              + (f" {'Med. Tenure':<12}" if show_tenure else ""))
         print("-"*130)
 
         for rank, (netuid, stats) in enumerate(ranked, 1):
+            rates = ""
+            if show_blocks:
+                if "replacements_per_1k_blocks" in stats:
+                    rates = (f" {stats['replacements_per_1k_blocks']:<10.2f}"
+                             f" {stats['changes_per_1k_blocks']:<10.2f}")
+                else:
+                    rates = f" {'-':<10} {'-':<10}"
+            tenure = ""
+            if show_tenure:
+                median = stats.get("median_tenure_blocks")
+                tenure = f" {median:<12.0f}" if median is not None else f" {'-':<12}"
             print(f"{rank:<6} {netuid:<8} "
                   f"{stats['avg_replacements_per_period']:<8.2f} "
                   f"{stats['avg_deregistrations_per_period']:<8.2f} "
@@ -322,9 +2313,13 @@ class SubnetCompetitionTracker:
                   f"{stats['total_replacements']:<12} "
                   f"{stats['total_deregistrations']:<12} "
                   f"{stats['avg_uids']:<10.0f} "
-                  f"{stats['time_periods']:<10}")
+                  f"{stats['time_periods']:<10}"
+                  + rates
+                  + tenure)
 
         print()
+        if show_blocks:
+            print("Repl./1kB and Chg./1kB: replacements and total changes per 1000 blocks")
         print("="*130)
         top_netuid = ranked[0][0]
         top_stats = ranked[0][1]
@@ -334,6 +2329,57 @@ class SubnetCompetitionTracker:
               f"{top_stats['replacement_percentage']:.1f}% replaced")
         print("="*130)
 
+    def print_cost_correlation(self, results: Dict):
+        """
+        Print registration cost against churn for subnets with a recorded cost series.
+
+        Args:
+            results: Analysis results with cost metrics from attach_cost_metrics()
+        """
+        rows = sorted(
+            ((netuid, stats) for netuid, stats in results.items() if "cost_periods" in stats),
+            key=lambda x: x[1]["replacements_per_tao"] if x[1]["replacements_per_tao"] is not None else -1,
+            reverse=True
+        )
+        if not rows:
+            return
+
+        def rate(value):
+            return f"{value:<14.2f}" if value is not None else f"{'-':<14}"
+
+        print("\n" + "="*100)
+        print("REGISTRATION COST VS CHURN")
+        print("(Churn = total changes per period, at the cost in effect when the period started)")
+        print("="*100)
+        print(f"{'Netuid':<8} {'Avg Burn (τ)':<14} {'Repl./τ':<14} {'τ Burned':<12} "
+              f"{'Full Periods':<14} {'Churn Full':<14} {'Churn Open':<14}")
+        print("-"*100)
+        for netuid, stats in rows:
+            print(f"{netuid:<8} {stats['avg_burn_tao']:<14.6f} {rate(stats['replacements_per_tao'])} "
+                  f"{stats['replacement_burn_tao']:<12.4f} "
+                  f"{stats['full_periods']}/{stats['cost_periods']:<11} "
+                  f"{rate(stats['churn_when_full'])} {rate(stats['churn_when_not_full'])}")
+        print("="*100)
+
+
+def _analyze_chunk(options: Dict, run: List[str]) -> tuple:
+    """
+    Process-pool task: diff every consecutive pair in a run of snapshot paths.
+
+    Args:
+        options: SubnetCompetitionTracker keyword arguments for the worker
+        run: Consecutive snapshot paths
+
+    Returns:
+        ([(old_path, new_path, summary), ...], partial subnet_stats)
+    """
+    tracker = SubnetCompetitionTracker(**options)
+    summaries = tracker._summarize_run([Path(path) for path in run])
+    partial = defaultdict(tracker._new_subnet_stats)
+    for summary in summaries.values():
+        tracker.merge_subnet_stats(partial, summary)
+    return [(str(old), str(new), summary) for (old, new), summary in summaries.items()], dict(partial)
+
 
 def main():
     """Main CLI interface."""
@@ -345,7 +2391,9 @@ def main():
     )
     parser.add_argument(
         "command",
-        choices=["snapshot", "analyze", "compare"],
+        choices=["snapshot", "analyze", "compare", "bench-collect", "convert",
+                 "import-sqlite", "history", "hotkey", "daemon", "ingest", "tenure", "serve", "merge",
+                 "backfill", "detect", "compact"],
         help="Command to run"
     )
     parser.add_argument(
@@ -368,25 +2416,453 @@ def main():
     )
     parser.add_argument(
         "--sort-by",
-        choices=["replacements", "deregistrations", "percentage", "changes"],
+        choices=list(SORT_KEYS),
         default="replacements",
-        help="Sort analysis by: replacements (default), deregistrations, percentage, or total changes"
+        help="Sort analysis by: replacements (default), deregistrations, percentage, total changes, "
+             "tenure (shortest median slot tenure first) or blocks (replacements per 1000 blocks)"
+    )
+    parser.add_argument(
+        "--window",
+        choices=list(WINDOWS),
+        help="Analyze: read this rolling window (ending at the latest snapshot) from the materialized rankings"
+    )
+    parser.add_argument(
+        "--track-rankings",
+        action="store_true",
+        help="Update the rolling rankings after every new snapshot"
+    )
+    parser.add_argument(
+        "--since",
+        help="Analyze: only snapshots at or after this ISO timestamp or block number"
+    )
+    parser.add_argument(
+        "--until",
+        help="Analyze: only snapshots at or before this ISO timestamp or block number"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Concurrent subnet fetches per snapshot, one connection each (default: 1)"
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Snapshot/daemon: collect only shard I of N (netuid %% N == I - 1) and write it to DATA_DIR/shards"
+    )
+    parser.add_argument(
+        "--sweep",
+        help="Label shared by the shards of one sweep; required with --shard for snapshot "
+             "(a block number makes lite shards read at that block)"
+    )
+    parser.add_argument(
+        "--max-block-spread",
+        type=int,
+        default=SHARD_MAX_BLOCK_SPREAD,
+        help=f"Merge: refuse sweeps whose subnets were read more than this many blocks apart "
+             f"(default: {SHARD_MAX_BLOCK_SPREAD})"
+    )
+    parser.add_argument(
+        "--stale-after",
+        default=SHARD_STALE_AFTER,
+        help=f"Merge: remove sweeps older than the latest snapshot that still can't be merged "
+             f"once this old, e.g. 30m, 2h (default: {SHARD_STALE_AFTER})"
+    )
+    parser.add_argument(
+        "--lite",
+        action="store_true",
+        help="Read only UID->hotkey storage at one pinned block instead of full metagraphs"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "binary"],
+        default="json",
+        help="File format for new snapshots (default: json)"
+    )
+    parser.add_argument(
+        "--keyframe-every",
+        type=int,
+        default=0,
+        help="Store every Nth snapshot in full and the rest as deltas (default: 0, always full)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every snapshot pair instead of using the analysis cache"
+    )
+    parser.add_argument(
+        "--diff-engine",
+        choices=["python", "numpy"],
+        default="python",
+        help="Snapshot diff implementation: python (default) or numpy (vectorized)"
+    )
+    parser.add_argument(
+        "--interval-blocks",
+        type=int,
+        default=50,
+        help="Daemon: sweep at every multiple of this many blocks (default: 50, ~10 minutes)"
+    )
+    parser.add_argument(
+        "--align-tempo",
+        type=int,
+        metavar="NETUID",
+        help="Daemon: align sweeps to this subnet's epoch boundaries instead of --interval-blocks"
+    )
+    parser.add_argument(
+        "--max-sweeps",
+        type=int,
+        help="Daemon: exit after this many sweeps (default: run until interrupted)"
+    )
+    parser.add_argument(
+        "--from-block",
+        type=int,
+        help="Ingest: first block to scan when starting a new event log"
+    )
+    parser.add_argument(
+        "--to-block",
+        type=int,
+        help="Ingest: last block to scan (default: chain head)"
+    )
+    parser.add_argument(
+        "--blocks",
+        help="Backfill: block numbers and START-END:STEP ranges, comma-separated (e.g. 4100000-4200000:7200)"
+    )
+    parser.add_argument(
+        "--source",
+        choices=["snapshots", "events"],
+        default="snapshots",
+        help="Analyze snapshot pairs (default) or the ingested event log"
+    )
+    parser.add_argument(
+        "--period-blocks",
+        type=int,
+        default=360,
+        help="Blocks per period when analyzing events (default: 360)"
+    )
+    parser.add_argument(
+        "--detect-anomalies",
+        action="store_true",
+        help="Score every new snapshot pair for replacement/deregistration spikes and log alerts"
+    )
+    parser.add_argument(
+        "--anomaly-threshold",
+        type=float,
+        default=4.0,
+        help="Standard deviations above a subnet's running mean churn per block that raise an alert (default: 4)"
+    )
+    parser.add_argument(
+        "--alert-sink",
+        help="JSON lines file alerts are appended to (default: DATA_DIR/alerts.jsonl)"
+    )
+    parser.add_argument(
+        "--track-tenure",
+        action="store_true",
+        help="Update the tenure index after every new snapshot"
+    )
+    parser.add_argument(
+        "--record-costs",
+        action="store_true",
+        help="Record per-subnet registration costs with every snapshot, for cost vs churn analysis"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write phase timings, failure and byte counters and peak RSS to this file "
+             "(Prometheus textfile format for .prom, JSON otherwise)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run each main-thread phase under cProfile and tracemalloc and print a per-phase report "
+             "(work on --workers threads, --jobs processes and the daemon's sweep thread is timed, not profiled)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Extra attempts per subnet after a failed fetch, with exponential backoff (default: 3)"
+    )
+    parser.add_argument(
+        "--subnet-deadline",
+        type=float,
+        default=60.0,
+        help="Seconds after which a failing subnet is not retried again and is marked missing (default: 60)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Analyze: diff snapshot files subnet by subnet, holding about one subnet per side in memory"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for diffing snapshot pairs during analyze (default: 1)"
+    )
+    parser.add_argument(
+        "--sqlite",
+        help="SQLite store to record snapshots in and query (default for queries: DATA_DIR/snapshots.db)"
+    )
+    parser.add_argument(
+        "--netuid",
+        type=int,
+        help="Subnet netuid for the history command"
+    )
+    parser.add_argument(
+        "--uid",
+        type=int,
+        help="UID for the history command"
+    )
+    parser.add_argument(
+        "--hotkey",
+        dest="hotkey_address",
+        help="Hotkey address for the hotkey command"
+    )
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="With convert, delete each JSON snapshot after converting it"
+    )
+    parser.add_argument(
+        "--keep-full",
+        default="7d",
+        help="Compact: keep every snapshot this recent, e.g. 7d, 12h or 90m (default: 7d)"
+    )
+    parser.add_argument(
+        "--keep-hourly",
+        default="30d",
+        help="Compact: keep the last snapshot of each hour this recent, and of each day before (default: 30d)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With compact, report what would be removed without touching any snapshot"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Serve: interface to bind (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Serve: TCP port (default: 8080)"
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=30.0,
+        help="Serve: seconds between checks for new snapshot files (default: 30)"
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=8,
+        help="Number of subnets to time with bench-collect (default: 8)"
     )
 
     # Parse only known args to avoid conflicts with bittensor's internal args
     args, unknown = parser.parse_known_args()
 
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
     tracker = SubnetCompetitionTracker(
         data_dir=args.data_dir,
-        network=args.network
+        network=args.network,
+        workers=args.workers,
+        lite=args.lite,
+        snapshot_format=args.format,
+        keyframe_interval=args.keyframe_every,
+        use_cache=not args.no_cache,
+        diff_engine=args.diff_engine,
+        sqlite_path=args.sqlite,
+        jobs=args.jobs,
+        track_tenure=args.track_tenure,
+        record_costs=args.record_costs,
+        metrics_file=args.metrics_file,
+        profile=args.profile,
+        retries=args.retries,
+        subnet_deadline=args.subnet_deadline,
+        streaming=args.stream,
+        track_rankings=args.track_rankings,
+        shard=shard,
+        detect_anomalies=args.detect_anomalies,
+        anomaly_threshold=args.anomaly_threshold,
+        alert_sink=args.alert_sink
     )
 
     if args.command == "snapshot":
-        tracker.take_snapshot()
+        if shard is not None and not args.sweep:
+            print("Error: --sweep required with --shard; give every shard of a sweep the same label")
+            sys.exit(1)
+        try:
+            snapshot_file = tracker.take_snapshot(sweep=args.sweep)
+        finally:
+            tracker.close()
+        if snapshot_file is None:
+            sys.exit(1)
 
     elif args.command == "analyze":
-        results = tracker.analyze_competition()
+        results = tracker.analyze_competition(source=args.source, period_blocks=args.period_blocks,
+                                              since=args.since, until=args.until, window=args.window)
+        if args.sort_by == "tenure" and results:
+            tracker.attach_tenure_stats(results)
         tracker.print_competition_ranking(results, sort_by=args.sort_by)
+        tracker.print_cost_correlation(results)
+
+    elif args.command == "bench-collect":
+        try:
+            report = tracker.benchmark_collection(sample=args.sample)
+        finally:
+            tracker.close()
+        if not report:
+            print("No subnets available to benchmark.")
+            sys.exit(1)
+
+        print("\n" + "="*80)
+        print(f"COLLECTION BENCHMARK ({len(report['netuids'])} subnets)")
+        print("="*80)
+        print(f"{'Mode':<8} {'Seconds':<10} {'ms/subnet':<12} {'Subnets':<10} {'UIDs':<10}")
+        print("-"*80)
+        for mode in ("full", "lite"):
+            t = report[mode]
+            print(f"{mode:<8} {t['seconds']:<10.2f} {t['per_subnet_ms']:<12.1f} "
+                  f"{t['subnets_ok']:<10} {t['uids']:<10}")
+        print()
+        print(f"Lite speedup: {report['speedup']:.1f}x")
+        if report["mismatched_netuids"]:
+            print(f"Maps differ on subnets: {report['mismatched_netuids']} "
+                  "(full path reads each subnet at its own block)")
+
+    elif args.command == "convert":
+        print(f"Converting JSON snapshots in {tracker.data_dir} to binary...")
+        converted = tracker.convert_snapshots(delete_source=args.delete_source)
+        print(f"Converted {len(converted)} snapshots")
+
+    elif args.command == "daemon":
+        tracker.run_daemon(
+            interval_blocks=args.interval_blocks,
+            tempo_netuid=args.align_tempo,
+            max_sweeps=args.max_sweeps
+        )
+
+    elif args.command == "ingest":
+        try:
+            appended = tracker.ingest_events(from_block=args.from_block, to_block=args.to_block)
+        finally:
+            tracker.close()
+        if appended is None:
+            sys.exit(1)
+        print(f"Appended {appended} events to {tracker.data_dir / EVENT_LOG_FILENAME}")
+
+    elif args.command == "tenure":
+        index = tracker.update_tenure_index()
+        distributions = sorted(
+            index.distributions().items(),
+            key=lambda x: x[1]["median_tenure_blocks"] if x[1]["median_tenure_blocks"] is not None else float("inf")
+        )
+
+        print("\n" + "="*80)
+        print("SLOT TENURE DISTRIBUTION (blocks survived, completed tenures)")
+        print("="*80)
+        print(f"{'Netuid':<8} {'Closed':<8} {'Open':<8} {'p10':<10} {'Median':<10} {'p90':<10}")
+        print("-"*80)
+
+        def blocks(value):
+            return f"{value:<10.0f}" if value is not None else f"{'-':<10}"
+
+        for netuid, dist in distributions:
+            print(f"{netuid:<8} {dist['closed_tenures']:<8} {dist['open_tenures']:<8} "
+                  f"{blocks(dist['p10_tenure_blocks'])} {blocks(dist['median_tenure_blocks'])} "
+                  f"{blocks(dist['p90_tenure_blocks'])}")
+
+    elif args.command == "detect":
+        alerts = tracker.update_churn_detector()
+        print(f"{len(alerts)} churn alerts appended to {tracker.alert_sink}")
+
+    elif args.command == "backfill":
+        if not args.blocks:
+            print("Error: --blocks required for backfill command")
+            sys.exit(1)
+        try:
+            blocks = parse_blocks(args.blocks)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        written = tracker.backfill(blocks)
+        print(f"Wrote {len(written)} backfilled snapshots")
+
+    elif args.command == "compact":
+        try:
+            keep_full, keep_hourly = parse_age(args.keep_full), parse_age(args.keep_hourly)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Compacting {tracker.data_dir}" + (" (dry run)" if args.dry_run else "") + "...")
+        report = tracker.compact(keep_full, keep_hourly, dry_run=args.dry_run)
+        if args.dry_run:
+            print("Dry run, nothing was changed:")
+        print(f"Snapshots dropped: {report['dropped']} ({report['bytes_freed']:,} bytes), "
+              f"quarantined: {report['quarantined']}, deltas rewritten in full: {report['rewritten']}, "
+              f"archived pairs: {report['archived_pairs']}")
+
+    elif args.command == "merge":
+        try:
+            stale_after = parse_age(args.stale_after)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Merging shards in {tracker.data_dir / SHARD_DIRNAME}...")
+        merged = tracker.merge_shard_sweeps(stale_after_ms=stale_after, max_block_spread=args.max_block_spread)
+        print(f"Merged {len(merged)} sweeps")
+
+    elif args.command == "serve":
+        serve(tracker, host=args.host, port=args.port, refresh_interval=args.refresh_interval)
+
+    elif args.command == "import-sqlite":
+        print(f"Importing snapshots from {tracker.data_dir}...")
+        imported = tracker.import_to_sqlite()
+        print(f"Imported {imported} snapshots into {tracker.sqlite_path}")
+
+    elif args.command == "history":
+        if args.netuid is None or args.uid is None:
+            print("Error: --netuid and --uid required for history command")
+            sys.exit(1)
+
+        tenures = tracker.get_store().slot_history(args.netuid, args.uid)
+        print("\n" + "="*130)
+        print(f"UID HISTORY - Subnet {args.netuid}, UID {args.uid}")
+        print("="*130)
+        print(f"{'Hotkey':<50} {'First seen':<28} {'Last seen':<28} {'First block':<12} {'Snapshots':<10}")
+        print("-"*130)
+        for tenure in tenures:
+            print(f"{tenure['hotkey']:<50} {tenure['first_seen']:<28} {tenure['last_seen']:<28} "
+                  f"{str(tenure['first_block']):<12} {tenure['snapshots']:<10}")
+        if not tenures:
+            print("No observations for this UID.")
+
+    elif args.command == "hotkey":
+        if not args.hotkey_address:
+            print("Error: --hotkey required for hotkey command")
+            sys.exit(1)
+
+        tenures = tracker.get_store().hotkey_history(args.hotkey_address)
+        print("\n" + "="*100)
+        print(f"HOTKEY HISTORY - {args.hotkey_address}")
+        print("="*100)
+        print(f"{'Netuid':<8} {'UID':<6} {'First seen':<28} {'Last seen':<28} {'Snapshots':<10}")
+        print("-"*100)
+        for tenure in tenures:
+            print(f"{tenure['netuid']:<8} {tenure['uid']:<6} {tenure['first_seen']:<28} "
+                  f"{tenure['last_seen']:<28} {tenure['snapshots']:<10}")
+        if not tenures:
+            print("No observations for this hotkey.")
 
     elif args.command == "compare":
         if not args.snapshot1 or not args.snapshot2:
@@ -407,10 +2883,24 @@ def main():
         for netuid, change_data in sorted(changes.items()):
             print(f"Subnet {netuid}:")
             print(f"  Replacements: {change_data['replacement_count']}")
-            print(f"  New registrations: {len(change_data['new_registrations'])}")
-            print(f"  Deregistrations: {len(change_data['deregistrations'])}")
+            print(f"  New registrations: {change_data['new_registration_count']}")
+            print(f"  Deregistrations: {change_data['deregistration_count']}")
             print()
 
+    if args.profile:
+        print("\n" + "="*80)
+        print("PHASE TIMINGS")
+        print("="*80)
+        print(f"{'Phase':<14} {'Calls':<8} {'Seconds':<12} {'Max (s)':<12}")
+        print("-"*80)
+        for name, total in sorted(tracker.metrics.phase_totals().items(), key=lambda x: -x[1]["seconds"]):
+            print(f"{name:<14} {total['calls']:<8} {total['seconds']:<12.4f} {total['max_seconds']:<12.4f}")
+        print(tracker.metrics.profile_report())
+
+    if tracker.metrics_file is not None:
+        tracker.write_metrics()
+        print(f"Metrics written to {tracker.metrics_file}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+"""
+Per-phase instrumentation.
+
+The tracker times its phases (connect, subnet_list, fetch, extract,
+serialize while collecting; load, diff, aggregate while analyzing) and
+counts failures and bytes written through one Metrics object:
+
+    with metrics.phase("fetch", netuid=8):
+        ...
+    metrics.count("fetch_failures", netuid=8)
+
+Phases are safe to time from worker threads. At the end of a run the
+metrics are written either as a Prometheus textfile (for node_exporter's
+textfile collector) or as JSON, depending on the file suffix:
+
+    sct_phase_seconds_total{phase="fetch",netuid="8"} 0.412
+    sct_phase_calls_total{phase="fetch",netuid="8"} 1
+    sct_fetch_failures_total{netuid="8"} 0
+    sct_peak_rss_bytes 183427072
+
+With profiling enabled, phases entered on the main thread also run under
+cProfile (one profile per phase name) and record their tracemalloc peak.
+A phase entered while another profiled phase is active is attributed to
+the outer one, since only one profiler can be active at a time.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+METRIC_PREFIX = "sct"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _labels(labels: Dict) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    escaped = ",".join(
+        f'{key}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels
+    )
+    return "{" + escaped + "}"
+
+
+class Metrics:
+    """Phase timers and counters for one tracker run."""
+
+    def __init__(self, profile: bool = False):
+        """
+        Args:
+            profile: Also run main-thread phases under cProfile and tracemalloc
+        """
+        self.profile = profile
+        self.started = time.time()
+        # (phase, labels) -> [calls, total seconds, max seconds]
+        self.phases: Dict[Tuple[str, LabelKey], list] = {}
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.memory_peaks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._profiling = False
+        if profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str, **labels):
+        """
+        Time a block of work as one call of a phase.
+
+        Args:
+            name: Phase name
+            **labels: Extra labels, e.g. netuid
+        """
+        profiler = None
+        if self.profile and not self._profiling and threading.current_thread() is threading.main_thread():
+            self._profiling = True
+            profiler = self.profiles.setdefault(name, cProfile.Profile())
+            tracemalloc.reset_peak()
+            profiler.enable()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+                _, peak = tracemalloc.get_traced_memory()
+                self.memory_peaks[name] = max(self.memory_peaks.get(name, 0), peak)
+                self._profiling = False
+            with self._lock:
+                entry = self.phases.setdefault((name, _labels(labels)), [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+
+    def count(self, name: str, value: float = 1, **labels):
+        """Add value to a counter."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def phase_totals(self) -> Dict[str, Dict]:
+        """Calls and seconds per phase, summed over labels."""
+        totals = {}
+        for (name, _), (calls, seconds, longest) in self.phases.items():
+            total = totals.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            total["calls"] += calls
+            total["seconds"] += seconds
+            total["max_seconds"] = max(total["max_seconds"], longest)
+        return totals
+
+    def to_dict(self) -> Dict:
+        """Everything recorded so far as plain JSON-serializable data."""
+        return {
+            "started": self.started,
+            "finished": time.time(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "phases": [
+                {"phase": name, **dict(labels), "calls": calls, "seconds": seconds, "max_seconds": longest}
+                for (name, labels), (calls, seconds, longest) in sorted(self.phases.items())
+            ],
+            "phase_totals": self.phase_totals(),
+            "counters": [
+                {"name": name, **dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ],
+            "memory_peaks_bytes": dict(self.memory_peaks)
+        }
+
+    def to_prometheus(self) -> str:
+        """Everything recorded so far in the Prometheus text exposition format."""
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_phase_seconds_total Time spent in each phase.",
+            f"# TYPE {p}_phase_seconds_total counter",
+        ]
+        for (name, labels), (_, seconds, _) in sorted(self.phases.items()):
+            lines.append(f"{p}_phase_seconds_total{_format_labels((('phase', name),) + labels)} {seconds:.6f}")
+        lines += [f"# HELP {p}_phase_calls_total Times each phase ran.", f"# TYPE {p}_phase_calls_total counter"]
+        for (name, labels), (calls, _, _) in sorted(self.phases.items()):
+            lines.append(f"{p}_phase_calls_total{_format_labels((('phase', name),) + labels)} {calls}")
+        lines += [f"# HELP {p}_phase_seconds_max Longest single run of each phase.",
+                  f"# TYPE {p}_phase_seconds_max gauge"]
+        for (name, labels), (_, _, longest) in sorted(self.phases.items()):
+            lines.append(f"{p}_phase_seconds_max{_format_labels((('phase', name),) + labels)} {longest:.6f}")
+
+        declared = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            if name not in declared:
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                declared.add(name)
+            lines.append(f"{p}_{name}_total{_format_labels(labels)} {value:g}")
+
+        if self.memory_peaks:
+            lines.append(f"# TYPE {p}_phase_peak_traced_bytes gauge")
+            for name, peak in sorted(self.memory_peaks.items()):
+                lines.append(f"{p}_phase_peak_traced_bytes{_format_labels((('phase', name),))} {peak}")
+
+        rss = peak_rss_bytes()
+        if rss is not None:
+            lines += [f"# TYPE {p}_peak_rss_bytes gauge", f"{p}_peak_rss_bytes {rss}"]
+        lines += [f"# TYPE {p}_last_run_timestamp_seconds gauge", f"{p}_last_run_timestamp_seconds {time.time():.0f}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path):
+        """
+        Write the metrics atomically: Prometheus text for .prom files, JSON otherwise.
+
+        Args:
+            path: Output file
+        """
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix == ".prom" else json.dumps(self.to_dict(), indent=2)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def profile_report(self, limit: int = 15) -> str:
+        """Per-phase cProfile listing (by cumulative time) and tracemalloc peak."""
+        out = io.StringIO()
+        for name, profiler in self.profiles.items():
+            out.write("\n" + "="*100 + "\n")
+            peak = self.memory_peaks.get(name)
+            out.write(f"PROFILE: {name}" + (f" (peak traced memory {peak / (1024 * 1024):.1f} MiB)" if peak else "") + "\n")
+            out.write("="*100 + "\n")
+            stats = pstats.Stats(profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
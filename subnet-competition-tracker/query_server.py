@@ -0,0 +1,315 @@
+"""
+HTTP/JSON query server.
+
+analyze reloads (or at least re-reads the cache of) the whole history on
+every call, and its output is a fixed-width table. The query service keeps
+the rolling rankings, the latest pair's changes and a hotkey index of the
+latest snapshot in memory, refreshes them when new snapshot files appear,
+and answers from memory:
+
+    GET /health                                latest snapshot, snapshot count, last refresh
+    GET /snapshots                             snapshot stems, oldest first
+    GET /rankings?sort_by=&window=&limit=      ranked results (analyze --sort-by / --window)
+    GET /subnets/<netuid>                      one subnet's results in every window
+    GET /subnets/<netuid>/changes?old=&new=    compare_snapshots detail (default: latest pair)
+    GET /hotkeys/<ss58>                        slots the hotkey holds in the latest snapshot,
+                                               plus its history from the SQLite store if there is one
+
+A refresh diffs only the snapshots written since the previous one (see
+RollingRankings), and builds a new view that replaces the old one in a
+single assignment, so requests answered from the view never wait for a
+refresh and never see a half-updated view. /changes with old and new
+diffs two files on the tracker, which it shares with refreshes, so it
+waits for a refresh in progress. Any other failure while answering (a
+snapshot removed by compact or convert after the view was built, a broken
+delta chain) is answered with 500 and the error.
+
+Requests never write to the data directory, but refreshes do, as analyze
+would: each one saves the rolling rankings (the state file and its pair
+log) and, when there is one, the tenure index (the index file and its
+closed log).
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from delta_store import snapshot_stem
+from rolling import ROLLING_FILENAME, WINDOWS, RollingRankings
+from sqlite_store import SnapshotStore
+from tenure import TENURE_INDEX_FILENAME
+
+
+class QueryError(Exception):
+    """A request the service can't answer; carries the HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _hotkey_slots(snapshot: Dict) -> Dict[str, list]:
+    """hotkey -> [{"netuid", "uid", "block"}] over every fetched subnet of a snapshot."""
+    slots = defaultdict(list)
+    for netuid, data in snapshot.get("subnets", {}).items():
+        if data.get("missing"):
+            continue
+        for uid, hotkey in data["uid_hotkey_map"].items():
+            slots[hotkey].append({"netuid": int(netuid), "uid": int(uid), "block": data.get("block")})
+    return dict(slots)
+
+
+class QueryService:
+    """In-memory analysis results over a tracker's data directory."""
+
+    def __init__(self, tracker):
+        """
+        Args:
+            tracker: SubnetCompetitionTracker whose data_dir is served
+        """
+        self.tracker = tracker
+        self.rolling = RollingRankings(tracker.data_dir / ROLLING_FILENAME)
+        self.view: Dict = {"stems": [], "refreshed_at": None}
+        # Refreshes and on-demand diffs share the tracker, one at a time
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """
+        Bring the view up to date with the snapshot files.
+
+        Returns:
+            True if there were new (or removed) snapshots
+        """
+        with self._lock:
+            tracker = self.tracker
+            snapshots = tracker.get_all_snapshots()
+            stems = [snapshot_stem(path) for path in snapshots]
+            view = self.view
+            if stems == view["stems"]:
+                view["refreshed_at"] = time.time()
+                return False
+            if not snapshots:
+                self.view = {"stems": [], "refreshed_at": time.time()}
+                return True
+
+            tracker.update_rolling_rankings(self.rolling)
+            results = {window: tracker.window_results(self.rolling, window) for window in WINDOWS}
+            if (tracker.data_dir / TENURE_INDEX_FILENAME).exists():
+                index = tracker.update_tenure_index()
+                for window_results in results.values():
+                    tracker.attach_tenure_stats(window_results, index)
+
+            latest_pair = tuple(stems[-2:]) if len(stems) >= 2 else None
+            if latest_pair is not None and latest_pair == view.get("latest_pair"):
+                changes, hotkeys = view["changes"], view["hotkeys"]
+            else:
+                latest = tracker.load_snapshot(snapshots[-1])
+                changes = {}
+                if latest_pair is not None:
+                    changes = tracker.compare_snapshots(tracker.load_snapshot(snapshots[-2]), latest)
+                hotkeys = _hotkey_slots(latest)
+
+            self.view = {
+                "stems": stems,
+                "paths": {stem: path for stem, path in zip(stems, snapshots)},
+                "refreshed_at": time.time(),
+                # Only the scalars: the window totals keep changing with later refreshes
+                "windows": {
+                    window: {key: self.rolling.window(window)[key] for key in ("first_snapshot", "pairs")}
+                    for window in WINDOWS
+                },
+                "results": results,
+                "latest_pair": latest_pair,
+                "changes": changes,
+                "hotkeys": hotkeys
+            }
+            return True
+
+    def health(self) -> Dict:
+        view = self.view
+        return {
+            "snapshots": len(view["stems"]),
+            "latest_snapshot": view["stems"][-1] if view["stems"] else None,
+            "refreshed_at": view["refreshed_at"]
+        }
+
+    def snapshots(self) -> Dict:
+        return {"snapshots": self.view["stems"]}
+
+    def _window(self, window: Optional[str]) -> str:
+        window = window or "all"
+        if window not in WINDOWS:
+            raise QueryError(400, f"Unknown window {window}; choose from {', '.join(WINDOWS)}")
+        if "results" not in self.view:
+            raise QueryError(503, "No snapshots loaded yet")
+        return window
+
+    def rankings(self, sort_by: Optional[str] = None, window: Optional[str] = None,
+                 limit: Optional[str] = None) -> Dict:
+        """Ranked results of one window, like analyze --window WINDOW --sort-by SORT_BY."""
+        view = self.view
+        window = self._window(window)
+        sort_by = sort_by or "replacements"
+        try:
+            ranked = self.tracker.rank_results(view["results"][window], sort_by)
+        except ValueError as e:
+            raise QueryError(400, str(e))
+        if limit is not None:
+            if not limit.isdigit():
+                raise QueryError(400, f"limit must be a non-negative integer, got {limit!r}")
+            ranked = ranked[:int(limit)]
+
+        totals = view["windows"][window]
+        return {
+            "window": window,
+            "sort_by": sort_by,
+            "first_snapshot": totals["first_snapshot"],
+            "last_snapshot": view["stems"][-1],
+            "pairs": totals["pairs"],
+            "subnets": [{"rank": rank, "netuid": netuid, **stats}
+                        for rank, (netuid, stats) in enumerate(ranked, 1)]
+        }
+
+    def subnet(self, netuid: str) -> Dict:
+        """One subnet's results in every window (null where it had no pairs)."""
+        self._window(None)
+        view = self.view
+        return {
+            "netuid": netuid,
+            "windows": {window: view["results"][window].get(netuid) for window in WINDOWS}
+        }
+
+    def subnet_changes(self, netuid: str, old: Optional[str] = None, new: Optional[str] = None) -> Dict:
+        """
+        compare_snapshots detail of one subnet.
+
+        Args:
+            netuid: Subnet netuid
+            old: Stem of the earlier snapshot (default: the second newest)
+            new: Stem of the later snapshot (default: the newest)
+        """
+        view = self.view
+        if old is None and new is None:
+            if view.get("latest_pair") is None:
+                raise QueryError(503, "Need at least 2 snapshots")
+            old, new = view["latest_pair"]
+            changes = view["changes"]
+        elif old is None or new is None:
+            raise QueryError(400, "Pass both old and new, or neither for the latest pair")
+        else:
+            paths = view.get("paths", {})
+            for stem in (old, new):
+                if stem not in paths:
+                    raise QueryError(404, f"Unknown snapshot {stem}")
+            with self._lock:
+                changes = self.tracker.compare_snapshot_files(paths[old], paths[new])
+        return {"netuid": netuid, "old": old, "new": new, "changes": changes.get(netuid)}
+
+    def hotkey(self, ss58: str) -> Dict:
+        """Slots a hotkey holds now, plus its SQLite history when the store exists."""
+        view = self.view
+        body = {
+            "hotkey": ss58,
+            "snapshot": view["stems"][-1] if view["stems"] else None,
+            "slots": view.get("hotkeys", {}).get(ss58, [])
+        }
+        store_path = self.tracker.sqlite_path or self.tracker.data_dir / "snapshots.db"
+        if Path(store_path).exists():
+            # A connection per request: sqlite3 connections can't be shared across threads
+            store = SnapshotStore(store_path)
+            try:
+                body["history"] = store.hotkey_history(ss58)
+            finally:
+                store.close()
+        return body
+
+    def route(self, url: str) -> Tuple[int, Dict]:
+        """
+        Answer a GET request.
+
+        Args:
+            url: Request path and query string
+
+        Returns:
+            (HTTP status, JSON body)
+        """
+        parts = urlsplit(url)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+        try:
+            if segments == ["health"]:
+                return 200, self.health()
+            if segments == ["snapshots"]:
+                return 200, self.snapshots()
+            if segments == ["rankings"]:
+                return 200, self.rankings(query.get("sort_by"), query.get("window"), query.get("limit"))
+            if len(segments) == 2 and segments[0] == "subnets":
+                return 200, self.subnet(segments[1])
+            if len(segments) == 3 and segments[0] == "subnets" and segments[2] == "changes":
+                return 200, self.subnet_changes(segments[1], query.get("old"), query.get("new"))
+            if len(segments) == 2 and segments[0] == "hotkeys":
+                return 200, self.hotkey(segments[1])
+        except QueryError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            print(f"Error answering {url}: {e}", file=sys.stderr)
+            return 500, {"error": str(e)}
+        return 404, {"error": f"No such endpoint: {parts.path}"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SubnetCompetitionTracker"
+
+    def do_GET(self):
+        status, body = self.server.service.route(self.path)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def serve(tracker, host: str = "127.0.0.1", port: int = 8080, refresh_interval: float = 30.0):
+    """
+    Serve the query endpoints until interrupted.
+
+    Args:
+        tracker: SubnetCompetitionTracker whose data_dir is served
+        host: Interface to bind
+        port: TCP port
+        refresh_interval: Seconds between checks for new snapshot files
+    """
+    service = QueryService(tracker)
+    print(f"Loading snapshot history from {tracker.data_dir}...")
+    service.refresh()
+    print(f"Loaded {len(service.view['stems'])} snapshots")
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    stop = threading.Event()
+
+    def refresher():
+        while not stop.wait(refresh_interval):
+            try:
+                if service.refresh():
+                    print(f"Refreshed: latest snapshot {service.view['stems'][-1]}")
+            except Exception as e:
+                print(f"Refresh failed: {e}", file=sys.stderr)
+
+    threading.Thread(target=refresher, name="refresh", daemon=True).start()
+    print(f"Serving on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping server...")
+    finally:
+        stop.set()
+        server.server_close()
@@ -0,0 +1,148 @@
+"""
+Registration cost queries.
+
+Registration economics for every subnet (burn cost, slots, difficulty,
+immunity period, tempo) come from a single batched get_all_subnets_info
+call over one shared connection. Results are cached in memory per block,
+so repeated lookups within the TTL cost no round trips at all.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_tao(balance) -> float:
+    """Convert a Balance (or its "τ0.004396" string form) to a float amount of TAO."""
+    tao = getattr(balance, "tao", None)
+    if tao is not None:
+        return float(tao)
+    return float(str(balance).replace('τ', '').replace(',', ''))
+
+
+def cost_record(info) -> Dict:
+    """
+    Registration cost fields for one subnet.
+
+    Args:
+        info: SubnetInfo from get_subnet_info / get_all_subnets_info
+
+    Returns:
+        Dictionary with cost and subnet information
+    """
+    max_n = int(info.max_n)
+    subnetwork_n = int(info.subnetwork_n)
+    return {
+        "netuid": int(info.netuid),
+        "burn_cost_tao": parse_tao(info.burn),
+        "burn_cost_alpha": info.burn,  # Original Balance object
+        "max_neurons": max_n,
+        "current_neurons": subnetwork_n,
+        "occupancy_percent": (subnetwork_n / max_n * 100) if max_n > 0 else 0,
+        "is_full": subnetwork_n >= max_n,
+        "difficulty": int(info.difficulty),
+        "immunity_period_blocks": int(info.immunity_period),
+        "tempo": int(info.tempo)
+    }
+
+
+class RegistrationCostClient:
+    """Shared-connection, block-keyed cache of registration costs for all subnets."""
+
+    def __init__(self, network: str = "finney", subtensor: Optional[object] = None,
+                 ttl_seconds: float = 12.0, max_blocks: int = 8):
+        """
+        Initialize the client.
+
+        Args:
+            network: Bittensor network (default: finney)
+            subtensor: Existing connection to reuse (default: open one on first use)
+            ttl_seconds: How long the latest result answers head-of-chain queries (default: one block)
+            max_blocks: Number of per-block results kept in memory
+        """
+        self.network = network
+        self.subtensor = subtensor
+        self.ttl_seconds = ttl_seconds
+        self.max_blocks = max_blocks
+        # block -> (fetched_at, {netuid: record}, {netuid: decode error})
+        self._cache: Dict[int, Tuple[float, Dict[int, Dict], Dict[int, str]]] = {}
+        self._latest_block: Optional[int] = None
+
+    def _client(self):
+        """The shared connection, opened on first use."""
+        if self.subtensor is None:
+            import bittensor as bt
+            self.subtensor = bt.Subtensor(network=self.network)
+        return self.subtensor
+
+    def get_all(self, block: Optional[int] = None) -> Dict[int, Dict]:
+        """
+        Registration costs for every subnet in one round trip.
+
+        Args:
+            block: Block to read at (default: chain head, served from cache within the TTL)
+
+        Returns:
+            Dictionary mapping netuid to its cost record. Subnets whose info
+            could not be decoded are left out; errors() lists them.
+        """
+        now = time.monotonic()
+        if block is None and self._latest_block is not None:
+            fetched_at, records, _ = self._cache[self._latest_block]
+            if now - fetched_at < self.ttl_seconds:
+                return records
+        if block is not None and block in self._cache:
+            return self._cache[block][1]
+
+        subtensor = self._client()
+        if block is None:
+            block = int(subtensor.get_current_block())
+            if block in self._cache:
+                return self._cache[block][1]
+
+        infos = subtensor.get_all_subnets_info(block=block)
+        records = {}
+        errors = {}
+        for info in infos:
+            if info is None:
+                continue
+            try:
+                record = cost_record(info)
+            except (TypeError, ValueError) as e:
+                errors[info.netuid] = str(e)
+                continue
+            records[record["netuid"]] = record
+
+        self._cache[block] = (now, records, errors)
+        if self._latest_block is None or block >= self._latest_block:
+            self._latest_block = block
+        for old_block in sorted(self._cache)[:-self.max_blocks]:
+            del self._cache[old_block]
+        return records
+
+    def errors(self, block: Optional[int] = None) -> Dict[int, str]:
+        """
+        Subnets the fetch at a block returned but could not be decoded.
+
+        Args:
+            block: Block of a previous get_all() (default: the latest fetched)
+
+        Returns:
+            Dictionary mapping netuid to the decode error
+        """
+        if block is None:
+            block = self._latest_block
+        return self._cache[block][2] if block in self._cache else {}
+
+    def get(self, netuid: int, block: Optional[int] = None) -> Dict:
+        """
+        Registration cost for one subnet, served from the batched fetch.
+
+        Raises:
+            KeyError: If the subnet does not exist at that block
+        """
+        return self.get_all(block=block)[netuid]
+
+    def get_many(self, netuids: List[int], block: Optional[int] = None) -> List[Dict]:
+        """Registration costs for the given subnets, in the order requested, leaving out unknown ones."""
+        records = self.get_all(block=block)
+        return [records[netuid] for netuid in netuids if netuid in records]
@@ -0,0 +1,193 @@
+"""
+Snapshot retention and compaction.
+
+A collector sweeping every 50 blocks writes ~144 snapshots a day, and every
+directory scan, index refresh and full-history analyze walks all of them.
+compact applies a retention policy relative to the latest snapshot:
+
+    newer than --keep-full        every snapshot
+    newer than --keep-hourly      the last snapshot of each hour
+    older                         the last snapshot of each day
+
+The first snapshot is always kept. Dropping snapshots must not change the
+counts analyze reports, so before the files are removed, the pairs between
+two surviving snapshots are summed into one archived pair in
+pair_archive.json in the data directory:
+
+    {
+      "pairs": {
+        "snapshot_<ts>|snapshot_<ts>": {"pairs": 24, "summary": {"8": {"total_replacements": 7, ...}},
+                                       "block_totals": {"8": {"blocks": 7200, "total_replacements": 7, ...}}}
+      },
+      "pending": []
+    }
+
+summary is the sum of summarize_changes() over the merged pairs, and
+block_totals the sum of what each of them added to the per-1000-block
+rates (blocks and counters of the subnets with a block on both sides).
+analyze, the rolling rankings and the churn detector read an archived pair
+instead of diffing its two files, so totals, averages per period and
+per-1000-block rates stay what they were. Keys are stems, so converting a snapshot to binary keeps its
+archived pairs. pending lists the files a compaction is about to remove;
+it is saved together with the pairs that replace them, and a compaction
+interrupted while deleting finishes the list on the next run.
+
+Snapshots with no fetched subnet (a sweep that failed before fetching
+anything) and files that can't be read are moved to quarantine/ instead of
+being analyzed as real periods.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from delta_store import is_delta_path, snapshot_stem
+from snapshot_index import stem_millis
+from snapshot_stream import iter_snapshot_subnets
+
+ARCHIVE_FILENAME = "pair_archive.json"
+QUARANTINE_DIRNAME = "quarantine"
+
+# --keep-full / --keep-hourly unit -> milliseconds
+AGE_UNITS = {"m": 60 * 1000, "h": 3600 * 1000, "d": 24 * 3600 * 1000}
+
+
+def parse_age(value: str) -> int:
+    """
+    Parse a retention age.
+
+    Args:
+        value: A number of minutes, hours or days, e.g. 90m, 12h or 7d
+
+    Returns:
+        The age in milliseconds
+
+    Raises:
+        ValueError: If value is not a number followed by m, h or d
+    """
+    match = re.fullmatch(r"(\d+)([mhd])", str(value).strip())
+    if match is None:
+        raise ValueError(f"Ages are a number followed by m, h or d (e.g. 7d), got {value!r}")
+    return int(match.group(1)) * AGE_UNITS[match.group(2)]
+
+
+def plan_retention(stems: List[str], keep_full: int, keep_hourly: int) -> List[bool]:
+    """
+    Which snapshots the retention policy keeps.
+
+    Args:
+        stems: Snapshot stems in timestamp order
+        keep_full: Age in milliseconds up to which every snapshot is kept
+        keep_hourly: Age in milliseconds up to which the last snapshot of each hour is kept
+
+    Returns:
+        One flag per stem
+    """
+    if not stems:
+        return []
+    latest = stem_millis(stems[-1])
+    buckets = []
+    for stem in stems:
+        age = latest - stem_millis(stem)
+        if age <= keep_full:
+            buckets.append(None)
+            continue
+        # Stems carry the local time of the sweep: snapshot_<date>T<HH-MM-SS.ffffff>
+        date, _, clock = stem[len("snapshot_"):].partition("T")
+        buckets.append((date, clock[:2]) if age <= keep_hourly else (date,))
+
+    # Snapshots are in time order, so each bucket is a contiguous run; keep its last one
+    keep = [bucket is None or bucket != following for bucket, following in zip(buckets, buckets[1:] + [None])]
+    keep[0] = True
+    return keep
+
+
+def is_empty(path: Path) -> bool:
+    """
+    Whether a snapshot has no fetched subnet.
+
+    Full snapshots are streamed until the first fetched subnet; a delta
+    holds a record for every subnet of its snapshot, so it is read as is.
+
+    Raises:
+        Exception: Whatever reading the file raises when it is corrupt
+    """
+    if is_delta_path(path):
+        with open(path, "r") as f:
+            subnets = json.load(f).get("subnets", {}).values()
+    else:
+        subnets = (record for _, record in iter_snapshot_subnets(path))
+    return all(record.get("missing") for record in subnets)
+
+
+def merge_pairs(entries: List[Dict]) -> Dict:
+    """
+    Sum consecutive pairs into one archived pair.
+
+    Args:
+        entries: {"pairs", "summary", "block_totals"} of each pair in order;
+            a pair that was diffed directly counts as "pairs": 1
+
+    Returns:
+        The archive entry covering all of them
+    """
+    merged = {"pairs": sum(entry["pairs"] for entry in entries), "summary": {}, "block_totals": {}}
+    for entry in entries:
+        for field in ("summary", "block_totals"):
+            for netuid, counters in entry[field].items():
+                totals = merged[field].setdefault(netuid, {})
+                for key, value in counters.items():
+                    totals[key] = totals.get(key, 0) + value
+    return merged
+
+
+def pair_key(old_path: Path, new_path: Path) -> str:
+    """Archive key of a pair of snapshots."""
+    return f"{snapshot_stem(old_path)}|{snapshot_stem(new_path)}"
+
+
+class PairArchive:
+    """Summed summaries and block totals of the pairs compact merged."""
+
+    def __init__(self, path: Path):
+        """
+        Load the archive, starting empty when the file does not exist.
+
+        Args:
+            path: Location of the archive file
+        """
+        self.path = Path(path)
+        self.pairs: Dict[str, Dict] = {}
+        self.pending: List[str] = []
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.pairs = data.get("pairs", {})
+        self.pending = data.get("pending", [])
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def get(self, old_path: Path, new_path: Path) -> Optional[Dict]:
+        """The archived pair between two consecutive snapshots, or None if they were never merged."""
+        return self.pairs.get(pair_key(old_path, new_path))
+
+    def put(self, old_path: Path, new_path: Path, entry: Dict):
+        """Store a merged pair."""
+        self.pairs[pair_key(old_path, new_path)] = entry
+
+    def prune(self, snapshots: List[Path]):
+        """Drop archived pairs that are no longer consecutive in the history."""
+        live = {pair_key(old, new) for old, new in zip(snapshots, snapshots[1:])}
+        self.pairs = {key: entry for key, entry in self.pairs.items() if key in live}
+
+    def save(self):
+        """Write the archive atomically."""
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"pairs": self.pairs, "pending": self.pending}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
@@ -0,0 +1,272 @@
+"""
+Materialized rolling rankings.
+
+analyze_competition rebuilds its aggregate from every snapshot pair. The
+rolling state keeps the same per-subnet counters up to date as snapshots
+are written, for the whole history and for fixed windows ending at the
+latest snapshot, so a ranking can be printed without touching the history.
+
+Totals (rolling_rankings.json in the data directory):
+
+    {
+      "first_snapshot": "snapshot_<ts>", "last_snapshot": "snapshot_<ts>",
+      "snapshots": 1440, "last_time": 1767804686735,
+      "log": {"generation": 3, "first": 5120, "end": 6561, "bytes": 4718592},
+      "windows": {
+        "all": {"start": 0, "subnet_stats": {...}, "block_totals": {...}},
+        "24h": {"start": 6273, "subnet_stats": {...}, "block_totals": {...}}
+      }
+    }
+
+Pair log (rolling_rankings.pairs.<generation>.jsonl), one pair per line:
+
+    {"old": "snapshot_<ts>", "new": "snapshot_<ts>", "time": 1767804086735,
+     "summary": {"8": {"total_replacements": 2, ...}}, "spans": {"8": 50, ...}}
+
+Pairs are numbered from the first pair of the history. The log holds pairs
+first to end (exclusive) in its first bytes bytes; anything after them is
+an append that was never committed by a totals write and is dropped.
+Each window holds the number of its first pair and the running totals over
+the pairs from there on. A new pair is added to every window, and the
+pairs that fell out of a window (older than its span before the latest
+snapshot) are subtracted again. Counters are integers, so the totals are
+exactly what analyze --since computes over the same pairs. spans holds,
+per subnet, the blocks between its two reads, for the per-1000-block
+rates. A pair merged by compact carries the block_totals of the pairs it
+replaced instead (see retention.py).
+
+Only the pairs still inside a bounded window are kept in memory. Saving
+appends the new pairs to the log and rewrites the totals, so its cost
+does not grow with the window. Once the log holds more expired pairs than
+live ones, the live pairs are written to the next generation and the old
+log is removed.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Window name -> span in milliseconds; None is the whole history
+WINDOWS: Dict[str, Optional[int]] = {
+    "1h": 3600 * 1000,
+    "24h": 24 * 3600 * 1000,
+    "7d": 7 * 24 * 3600 * 1000,
+    "all": None,
+}
+
+ROLLING_FILENAME = "rolling_rankings.json"
+
+BLOCK_COUNTERS = ("total_replacements", "total_deregistrations", "total_changes")
+
+
+def block_increments(summary: Dict[str, Dict], spans: Dict[str, int]) -> Dict[str, Dict]:
+    """Per-subnet blocks and counters a pair adds to the per-1000-block rates."""
+    increments = {}
+    for netuid, span in spans.items():
+        counters = summary.get(netuid, {})
+        increments[netuid] = {"blocks": span, **{key: counters.get(key, 0) for key in BLOCK_COUNTERS}}
+    return increments
+
+
+def _add(totals: Dict[str, Dict], increments: Dict[str, Dict], sign: int = 1):
+    """Add (or with sign=-1 subtract) per-subnet counters, dropping subnets that reach zero."""
+    for netuid, counters in increments.items():
+        entry = totals.setdefault(netuid, {})
+        for key, value in counters.items():
+            entry[key] = entry.get(key, 0) + sign * value
+        if not any(entry.values()):
+            del totals[netuid]
+
+
+class RollingRankings:
+    """Running per-subnet totals over the whole history and over rolling windows."""
+
+    def __init__(self, path: Path):
+        """
+        Load the state, starting empty when the files do not exist or disagree.
+
+        Args:
+            path: Location of the totals file; the pair log sits next to it
+        """
+        self.path = Path(path)
+        # Pairs of the longest bounded window, the first of them numbered self.base
+        self.pairs: List[Dict] = []
+        self.base = 0
+        self._saved_generation = None
+        try:
+            with open(self.path, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = None
+        if self.state is None or "log" not in self.state or set(self.state.get("windows", {})) != set(WINDOWS) \
+                or not self._load_log():
+            self.reset()
+        self._saved_generation = self.state["log"]["generation"]
+
+    def _log_path(self, generation: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.pairs.{generation}.jsonl")
+
+    def _load_log(self) -> bool:
+        """Read the logged pairs still in a window; False if the log doesn't match the totals."""
+        log = self.state["log"]
+        self.base = self._trim_point(log["end"])
+        if not log["first"] <= self.base <= log["end"]:
+            return False
+        if self.base == log["end"]:
+            return True
+        try:
+            with open(self._log_path(log["generation"]), "rb") as f:
+                data = f.read(log["bytes"])
+        except OSError:
+            return False
+        lines = data.splitlines()
+        if len(data) != log["bytes"] or len(lines) != log["end"] - log["first"]:
+            return False
+        self.pairs = [json.loads(line) for line in lines[self.base - log["first"]:]]
+        return True
+
+    def reset(self, first_snapshot: Optional[str] = None, first_time: Optional[int] = None):
+        """
+        Start over from a single snapshot, with no pairs.
+
+        Args:
+            first_snapshot: Stem of the first snapshot
+            first_time: Its unix milliseconds
+        """
+        generation = self.state["log"]["generation"] + 1 if self.state and "log" in self.state else 0
+        self.pairs = []
+        self.base = 0
+        self.state = {
+            "first_snapshot": first_snapshot,
+            "last_snapshot": first_snapshot,
+            "snapshots": 1 if first_snapshot else 0,
+            "last_time": first_time,
+            # A new generation, so the next save starts an empty log
+            "log": {"generation": generation, "first": 0, "end": 0, "bytes": 0},
+            "windows": {name: {"start": 0, "subnet_stats": {}, "block_totals": {}} for name in WINDOWS}
+        }
+
+    @property
+    def last_snapshot(self) -> Optional[str]:
+        return self.state["last_snapshot"]
+
+    def covers(self, stems: list) -> bool:
+        """Whether the state was built from a contiguous run of the given snapshot stems."""
+        first, last = self.state["first_snapshot"], self.state["last_snapshot"]
+        if first not in stems or last not in stems:
+            return False
+        return stems.index(last) - stems.index(first) + 1 == self.state["snapshots"]
+
+    def save(self):
+        """Append the new pairs to the log, then write the totals atomically."""
+        log = self.state["log"]
+        end = self.base + len(self.pairs)
+        if log["end"] < self.base or self.base - log["first"] > len(self.pairs):
+            # The log misses pairs still in a window, or is mostly expired pairs: start the next generation
+            log = {"generation": log["generation"] + 1, "first": self.base, "end": self.base, "bytes": 0}
+        with open(self._log_path(log["generation"]), "ab") as f:
+            # Drop appends a previous save never committed
+            f.truncate(log["bytes"])
+            f.seek(log["bytes"])
+            for pair in self.pairs[log["end"] - self.base:]:
+                f.write(json.dumps(pair, separators=(",", ":")).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            log = {**log, "end": end, "bytes": f.tell()}
+        self.state["log"] = log
+
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+        if self._saved_generation is not None and self._saved_generation != log["generation"]:
+            try:
+                self._log_path(self._saved_generation).unlink()
+            except FileNotFoundError:
+                pass
+        self._saved_generation = log["generation"]
+
+    def _trim_point(self, end: int) -> int:
+        """Number of the first pair a bounded window still holds (end if none)."""
+        return min([window["start"] for name, window in self.state["windows"].items()
+                    if WINDOWS[name] is not None] + [end])
+
+    def add_pair(self, old_stem: str, new_stem: str, old_time: int, new_time: int,
+                 summary: Dict[str, Dict], spans: Dict[str, int], block_totals: Optional[Dict[str, Dict]] = None):
+        """
+        Advance every window by one snapshot pair.
+
+        Args:
+            old_stem: Stem of the previous snapshot (the state's last snapshot)
+            new_stem: Stem of the new snapshot
+            old_time: Unix milliseconds of the previous snapshot
+            new_time: Unix milliseconds of the new snapshot
+            summary: summarize_changes() of the pair
+            spans: Blocks between the two reads of each subnet that has a block on both sides
+            block_totals: Block increments of an archived pair (default: from summary and spans)
+        """
+        pairs = self.pairs
+        pair = {"old": old_stem, "new": new_stem, "time": old_time, "summary": summary, "spans": spans}
+        if block_totals is not None:
+            pair["block_totals"] = block_totals
+        pairs.append(pair)
+        increments = self._block_increments(pair)
+        end = self.base + len(pairs)
+
+        for name, span in WINDOWS.items():
+            window = self.state["windows"][name]
+            _add(window["subnet_stats"], summary)
+            _add(window["block_totals"], increments)
+            if span is None:
+                continue
+            # A pair is in the window while it starts no earlier than span before the latest snapshot
+            while window["start"] < end and pairs[window["start"] - self.base]["time"] < new_time - span:
+                expired = pairs[window["start"] - self.base]
+                _add(window["subnet_stats"], expired["summary"], sign=-1)
+                _add(window["block_totals"], self._block_increments(expired), sign=-1)
+                window["start"] += 1
+
+        # Drop pairs that have left every bounded window
+        trim = self._trim_point(end) - self.base
+        if trim:
+            del pairs[:trim]
+            self.base += trim
+
+        self.state["last_snapshot"] = new_stem
+        self.state["last_time"] = new_time
+        self.state["snapshots"] += 1
+
+    @staticmethod
+    def _block_increments(pair: Dict) -> Dict[str, Dict]:
+        """Per-subnet blocks and counters a pair adds to the per-1000-block rates."""
+        if "block_totals" in pair:
+            return pair["block_totals"]
+        return block_increments(pair["summary"], pair["spans"])
+
+    def window(self, name: str) -> Dict:
+        """
+        Totals of one window.
+
+        Args:
+            name: A key of WINDOWS
+
+        Returns:
+            {"subnet_stats", "block_totals", "first_snapshot", "pairs"}, where
+            first_snapshot is the oldest snapshot the window covers
+        """
+        window = self.state["windows"][name]
+        if WINDOWS[name] is None:
+            first = self.state["first_snapshot"]
+            count = self.state["snapshots"] - 1
+        else:
+            in_window = self.pairs[window["start"] - self.base:]
+            first = in_window[0]["old"] if in_window else self.state["last_snapshot"]
+            count = len(in_window)
+        return {
+            "subnet_stats": window["subnet_stats"],
+            "block_totals": window["block_totals"],
+            "first_snapshot": first,
+            "pairs": count
+        }
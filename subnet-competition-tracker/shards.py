@@ -0,0 +1,169 @@
+"""
+Sharded collection.
+
+One collector fetches every subnet over one connection and decodes every
+metagraph on one core. With --shard I/N, a collector only fetches the
+netuids with netuid % N == I - 1 and writes a partial snapshot (a shard)
+to the shards/ directory under the data directory:
+
+    {
+      "sweep": "4123450", "shard": [2, 8],
+      "timestamp": "...", "network": "finney", "lite": true, "block": 4123450,
+      "listed": [0, 1, 2, ...],
+      "subnets": {"1": {...}, "9": {...}, "17": {"missing": true}}
+    }
+
+Shards of the same sweep share its label. A one-off shard must be given
+the label (--sweep): collectors that each derived one from their own view
+of the chain head would disagree whenever their starts straddle a
+boundary, and the sweep would never complete. The daemon uses the block it
+sweeps at, which every daemon on the same schedule agrees on. listed is
+every netuid the shard's subnet listing returned. merge_shards checks that
+all N shards of a sweep are present and consistent, and that the blocks
+their subnets were read at span no more than SHARD_MAX_BLOCK_SPREAD (lite
+shards must all read the same block), then combines them into one
+snapshot. A netuid listed by any shard but not fetched by the
+shard it belongs to is marked missing.
+
+A sweep that still can't be merged once a newer one has been is reported
+on every merge, and its shards are removed once the newest of them is
+SHARD_STALE_AFTER old: a daemon that skipped a boundary never sends its
+shard of that sweep.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SHARD_DIRNAME = "shards"
+
+# Default age (parse_age format) after which an unmergeable sweep older than a merged one is removed
+SHARD_STALE_AFTER = "1h"
+
+# Most blocks between the first and last subnet read of a merged sweep (one daemon interval)
+SHARD_MAX_BLOCK_SPREAD = 50
+
+# (index, count), index counted from 1
+Shard = Tuple[int, int]
+
+
+def parse_shard(value: str) -> Shard:
+    """
+    Parse a --shard value.
+
+    Args:
+        value: "I/N", e.g. "2/8" for the second of eight shards
+
+    Returns:
+        (I, N)
+
+    Raises:
+        ValueError: If value is not I/N with 1 <= I <= N
+    """
+    index, _, count = str(value).partition("/")
+    if not (index.isdigit() and count.isdigit()) or not 1 <= int(index) <= int(count):
+        raise ValueError(f"Shard must be I/N with 1 <= I <= N, got {value!r}")
+    return int(index), int(count)
+
+
+def shard_netuids(netuids: List[int], shard: Shard) -> List[int]:
+    """The netuids a shard collects."""
+    index, count = shard
+    return [netuid for netuid in netuids if netuid % count == index - 1]
+
+
+def shard_filename(sweep: str, shard: Shard) -> str:
+    """File name of one shard of a sweep."""
+    return f"shard_{sweep}_{shard[0]}of{shard[1]}.json"
+
+
+def read_shards(shard_dir: Path) -> Dict[str, List[Tuple[Path, Dict]]]:
+    """
+    Every shard file in a directory, grouped by sweep label.
+
+    Returns:
+        sweep -> [(path, shard)], in file name order
+    """
+    sweeps: Dict[str, List[Tuple[Path, Dict]]] = {}
+    for path in sorted(Path(shard_dir).glob("shard_*.json")):
+        with open(path, "r") as f:
+            shard = json.load(f)
+        sweeps.setdefault(str(shard["sweep"]), []).append((path, shard))
+    return sweeps
+
+
+def merge_shards(shards: List[Dict], max_block_spread: int = SHARD_MAX_BLOCK_SPREAD) -> Tuple[Dict, Dict]:
+    """
+    Combine the shards of one sweep into a snapshot.
+
+    Args:
+        shards: Every shard file's contents for the sweep
+        max_block_spread: Most blocks allowed between the earliest and the
+            latest subnet read across all shards
+
+    Returns:
+        (snapshot, report): the snapshot in take_snapshot's layout, with
+        subnets in ascending netuid order, and a report with the listed
+        subnet count, the netuids marked missing and the lowest and highest
+        subnet block
+
+    Raises:
+        ValueError: If shards are missing, duplicated or inconsistent, or
+            their subnets were read too far apart
+    """
+    first = shards[0]
+    sweep = first["sweep"]
+    count = first["shard"][1]
+    for key in ("network", "lite"):
+        values = {shard.get(key) for shard in shards}
+        if len(values) > 1:
+            raise ValueError(f"Sweep {sweep}: shards disagree on {key} ({sorted(map(str, values))})")
+    if {shard["shard"][1] for shard in shards} != {count}:
+        raise ValueError(f"Sweep {sweep}: shards were split different ways")
+
+    indices = sorted(shard["shard"][0] for shard in shards)
+    if len(set(indices)) != len(indices):
+        raise ValueError(f"Sweep {sweep}: duplicate shards {indices}")
+    absent = sorted(set(range(1, count + 1)) - set(indices))
+    if absent:
+        raise ValueError(f"Sweep {sweep}: waiting for shards {absent} of {count}")
+
+    if first["lite"]:
+        # Lite shards must have read storage at the same block to form one snapshot
+        blocks = {shard.get("block") for shard in shards}
+        if len(blocks) > 1:
+            raise ValueError(f"Sweep {sweep}: lite shards read different blocks {sorted(blocks)}")
+
+    subnets = {}
+    listed = set()
+    for shard in shards:
+        index = shard["shard"][0]
+        if any(int(netuid) % count != index - 1 for netuid in shard["subnets"]):
+            raise ValueError(f"Sweep {sweep}: shard {index} holds netuids of another shard")
+        listed.update(shard["listed"])
+        for netuid, record in shard["subnets"].items():
+            subnets[int(netuid)] = record
+
+    # Listed by some shard, but not fetched by the shard that owns it
+    for netuid in listed - set(subnets):
+        subnets[netuid] = {"missing": True}
+    missing = sorted(netuid for netuid, record in subnets.items() if record.get("missing"))
+
+    subnet_blocks = [record["block"] for record in subnets.values()
+                     if not record.get("missing") and record.get("block") is not None]
+    if subnet_blocks and max(subnet_blocks) - min(subnet_blocks) > max_block_spread:
+        # Full shards each read at their own head; a lagging collector would mix chain states
+        raise ValueError(f"Sweep {sweep}: subnets were read at blocks {min(subnet_blocks)}-{max(subnet_blocks)}, "
+                         f"more than {max_block_spread} blocks apart")
+    snapshot = {
+        "timestamp": min(shard["timestamp"] for shard in shards),
+        "network": first["network"],
+        "subnets": {str(netuid): subnets[netuid] for netuid in sorted(subnets)}
+    }
+    report = {
+        "subnets": len(subnets),
+        "missing": missing,
+        "min_block": min(subnet_blocks) if subnet_blocks else None,
+        "max_block": max(subnet_blocks) if subnet_blocks else None
+    }
+    return snapshot, report
@@ -0,0 +1,428 @@
+"""
+Compact columnar binary snapshot format.
+
+A JSON snapshot stores every subnet as a string-keyed dict of 48-character
+hotkeys, so the same hotkey text is repeated across subnets and snapshots
+and every load has to parse the whole file. The binary layout stores each
+hotkey once and each subnet as two fixed-width arrays that can be read
+straight out of a memory-mapped file.
+
+Layout (all integers little-endian):
+
+    magic           4 bytes  b"SCTB"
+    version         uint16
+    reserved        uint16
+    header_len      uint32
+    header          header_len bytes of UTF-8 JSON
+    (pad to 8)
+    data section:
+      string table  (count + 1) uint32 offsets, then the concatenated hotkeys
+      per subnet    uint16 uids[count]  (pad to 4)  uint32 hotkey_ids[count]
+
+The header holds the snapshot metadata and the index of every subnet with
+offsets relative to the start of the data section and the map_digest() of
+its UID->hotkey map. Subnets that failed to fetch have a
+{"netuid": N, "missing": true} index entry and no arrays.
+
+Loading with to_dict(lazy=True) only parses the header: each subnet's map
+is a LazyUidMap that decodes its arrays on first access, so a diff that
+skips subnets with equal digests never touches their data.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"SCTB"
+VERSION = 1
+BINARY_SUFFIX = ".sctb"
+
+_PREAMBLE = struct.Struct("<4sHHI")
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _align(offset: int, boundary: int) -> int:
+    """Round offset up to the next multiple of boundary."""
+    return (offset + boundary - 1) // boundary * boundary
+
+
+def _pack_array(typecode: str, values: List[int]) -> bytes:
+    """Pack integers as a little-endian fixed-width array."""
+    packed = array(typecode, values)
+    if not _NATIVE_LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _digest_items(items: List[Tuple[int, str]]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("".join(f"{uid}\t{hotkey}\n" for uid, hotkey in items).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def map_digest(mapping: Dict) -> str:
+    """
+    Content digest of a UID->hotkey map.
+
+    Independent of key type (int or str) and insertion order, so JSON,
+    binary and delta snapshots of the same map get the same digest.
+    """
+    return _digest_items(sorted((int(uid), hotkey) for uid, hotkey in mapping.items()))
+
+
+def encode_snapshot(snapshot: Dict) -> bytes:
+    """
+    Encode a snapshot dict into the binary format.
+
+    Args:
+        snapshot: Snapshot in the layout produced by take_snapshot()
+
+    Returns:
+        Encoded file contents
+    """
+    hotkey_ids: Dict[str, int] = {}
+    hotkeys: List[str] = []
+    subnets = []
+    items_of = {}
+
+    for netuid, data in snapshot.get("subnets", {}).items():
+        if data.get("missing"):
+            subnets.append((int(netuid), data, None, None))
+            continue
+        items = sorted((int(uid), hotkey) for uid, hotkey in data.get("uid_hotkey_map", {}).items())
+        items_of[int(netuid)] = items
+        uids = []
+        ids = []
+        for uid, hotkey in items:
+            if not 0 <= uid <= 0xFFFF:
+                raise ValueError(f"UID {uid} on subnet {netuid} does not fit in uint16")
+            idx = hotkey_ids.get(hotkey)
+            if idx is None:
+                idx = hotkey_ids[hotkey] = len(hotkeys)
+                hotkeys.append(hotkey)
+            uids.append(uid)
+            ids.append(idx)
+        subnets.append((int(netuid), data, uids, ids))
+
+    # String table: offsets into the concatenated UTF-8 blob
+    encoded = [hotkey.encode("utf-8") for hotkey in hotkeys]
+    offsets = [0]
+    for raw in encoded:
+        offsets.append(offsets[-1] + len(raw))
+    chunks = [_pack_array("I", offsets), b"".join(encoded)]
+    position = sum(len(c) for c in chunks)
+
+    index = []
+    for netuid, data, uids, ids in subnets:
+        if uids is None:
+            index.append({"netuid": netuid, "missing": True})
+            continue
+        padding = _align(position, 4) - position
+        if padding:
+            chunks.append(b"\0" * padding)
+            position += padding
+        uids_offset = position
+        chunks.append(_pack_array("H", uids))
+        position += 2 * len(uids)
+
+        padding = _align(position, 4) - position
+        if padding:
+            chunks.append(b"\0" * padding)
+            position += padding
+        ids_offset = position
+        chunks.append(_pack_array("I", ids))
+        position += 4 * len(ids)
+
+        index.append({
+            "netuid": netuid,
+            "n_neurons": data.get("n_neurons", len(uids)),
+            "block": data.get("block"),
+            "digest": data.get("digest") or _digest_items(items_of[netuid]),
+            "count": len(uids),
+            "uids_offset": uids_offset,
+            "ids_offset": ids_offset
+        })
+
+    header = {
+        "timestamp": snapshot.get("timestamp"),
+        "network": snapshot.get("network"),
+        "strings": {"count": len(hotkeys), "data_offset": 4 * len(offsets)},
+        "subnets": index
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    preamble = _PREAMBLE.pack(MAGIC, VERSION, 0, len(header_bytes))
+    head = preamble + header_bytes
+    head += b"\0" * (_align(len(head), 8) - len(head))
+    return head + b"".join(chunks)
+
+
+def write_binary_snapshot(snapshot: Dict, path: Path) -> Path:
+    """
+    Write a snapshot dict to path in the binary format.
+
+    The file is written under a hidden temporary name and renamed into
+    place, so readers never see a partially written snapshot.
+
+    Args:
+        snapshot: Snapshot in the layout produced by take_snapshot()
+        path: Destination file
+
+    Returns:
+        The path written
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(encode_snapshot(snapshot))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def convert_json_snapshot(json_path: Path, out_path: Path = None) -> Path:
+    """
+    Convert an existing JSON snapshot into the binary format.
+
+    Args:
+        json_path: Source snapshot_*.json file
+        out_path: Destination (default: same name with the binary suffix)
+
+    Returns:
+        The path written
+    """
+    json_path = Path(json_path)
+    with open(json_path, "r") as f:
+        snapshot = json.load(f)
+    if out_path is None:
+        out_path = json_path.with_suffix(BINARY_SUFFIX)
+    return write_binary_snapshot(snapshot, out_path)
+
+
+class BinarySnapshot:
+    """
+    Memory-mapped reader for binary snapshots.
+
+    Per-subnet arrays are returned as memoryviews over the mapping, so
+    nothing is copied until individual values are read. Release any arrays
+    obtained from subnet_arrays() before calling close().
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open and map a binary snapshot.
+
+        Args:
+            path: Path to a .sctb file
+        """
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Zero-length files cannot be mapped
+            self._file.close()
+            raise ValueError(f"{self.path} is empty")
+        self._view = memoryview(self._mm)
+
+        magic, version, _, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a binary snapshot")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} has unsupported version {version}")
+
+        header_start = _PREAMBLE.size
+        self.header = json.loads(bytes(self._mm[header_start:header_start + header_len]))
+        self._data_start = _align(header_start + header_len, 8)
+        self._index = {entry["netuid"]: entry for entry in self.header["subnets"]}
+
+        strings = self.header["strings"]
+        self._string_count = strings["count"]
+        self._string_data = self._data_start + strings["data_offset"]
+        self._string_offsets = self._array("I", self._data_start, self._string_count + 1)
+        self._hotkey_table = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # Lazily loaded snapshots are never closed explicitly
+        if getattr(self, "_mm", None) is not None:
+            self.close()
+
+    def close(self):
+        """Release the mapping and the underlying file."""
+        if self._mm is None:
+            return
+        self._string_offsets = None
+        self._view.release()
+        self._mm.close()
+        self._file.close()
+        self._mm = None
+
+    def _array(self, typecode: str, offset: int, count: int):
+        """View count fixed-width integers at an absolute offset."""
+        size = array(typecode).itemsize
+        raw = self._view[offset:offset + size * count]
+        if _NATIVE_LITTLE_ENDIAN:
+            return raw.cast(typecode)
+        # Big-endian hosts have to pay for a byteswapped copy
+        values = array(typecode, raw.tobytes())
+        values.byteswap()
+        return memoryview(values)
+
+    @property
+    def timestamp(self) -> str:
+        return self.header.get("timestamp")
+
+    @property
+    def network(self) -> str:
+        return self.header.get("network")
+
+    def netuids(self) -> List[int]:
+        """Subnet netuids in file order."""
+        return [entry["netuid"] for entry in self.header["subnets"]]
+
+    def subnet_info(self, netuid: int) -> Dict:
+        """Header index entry (n_neurons, block, digest, count, offsets) for a subnet."""
+        return self._index[int(netuid)]
+
+    def subnet_arrays(self, netuid: int) -> Tuple[memoryview, memoryview]:
+        """
+        Zero-copy arrays for one subnet.
+
+        Args:
+            netuid: The subnet netuid
+
+        Returns:
+            (uids, hotkey_ids) as uint16 / uint32 memoryviews aligned by index
+        """
+        entry = self._index[int(netuid)]
+        count = entry["count"]
+        uids = self._array("H", self._data_start + entry["uids_offset"], count)
+        ids = self._array("I", self._data_start + entry["ids_offset"], count)
+        return uids, ids
+
+    def hotkey(self, hotkey_id: int) -> str:
+        """Look up an interned hotkey by id."""
+        start = self._string_offsets[hotkey_id]
+        end = self._string_offsets[hotkey_id + 1]
+        return bytes(self._view[self._string_data + start:self._string_data + end]).decode("utf-8")
+
+    def hotkeys(self) -> List[str]:
+        """The full interned hotkey table, decoded once and cached."""
+        if self._hotkey_table is None:
+            offsets = self._string_offsets
+            end = self._string_data + offsets[self._string_count]
+            blob = bytes(self._view[self._string_data:end])
+            self._hotkey_table = [
+                blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self._string_count)
+            ]
+        return self._hotkey_table
+
+    def uid_hotkey_map(self, netuid: int) -> Dict[str, str]:
+        """
+        Decode one subnet into the JSON snapshot's string-keyed mapping.
+
+        Until the whole hotkey table has been decoded, hotkeys are looked up
+        one by one, so decoding a few subnets does not decode the entire file.
+        """
+        lookup = self._hotkey_table.__getitem__ if self._hotkey_table is not None else self.hotkey
+        uids, ids = self.subnet_arrays(netuid)
+        try:
+            return {str(uid): lookup(idx) for uid, idx in zip(uids, ids)}
+        finally:
+            uids.release()
+            ids.release()
+
+    def iter_subnets(self, lazy: bool = False) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (netuid, subnet_record) in the JSON snapshot layout.
+
+        Args:
+            lazy: Give each record a LazyUidMap instead of decoding it now
+        """
+        if not lazy:
+            self.hotkeys()
+        for entry in self.header["subnets"]:
+            netuid = entry["netuid"]
+            if entry.get("missing"):
+                yield str(netuid), {"missing": True}
+                continue
+            record = {
+                "uid_hotkey_map": LazyUidMap(self, netuid) if lazy else self.uid_hotkey_map(netuid),
+                "n_neurons": entry["n_neurons"],
+                "block": entry["block"]
+            }
+            if entry.get("digest"):
+                record["digest"] = entry["digest"]
+            yield str(netuid), record
+
+    def to_dict(self, lazy: bool = False) -> Dict:
+        """
+        The same dict load_snapshot returns for JSON.
+
+        Args:
+            lazy: Decode each subnet's map on first access; the file stays
+                mapped until every LazyUidMap has been decoded or dropped
+        """
+        return {
+            "timestamp": self.timestamp,
+            "network": self.network,
+            "subnets": dict(self.iter_subnets(lazy=lazy))
+        }
+
+
+class LazyUidMap(Mapping):
+    """uid_hotkey_map of one binary snapshot subnet, decoded on first access."""
+
+    __slots__ = ("_snapshot", "_netuid", "_map")
+
+    def __init__(self, snapshot: BinarySnapshot, netuid: int):
+        self._snapshot: Optional[BinarySnapshot] = snapshot
+        self._netuid = netuid
+        self._map: Optional[Dict[str, str]] = None
+
+    @property
+    def decoded(self) -> bool:
+        return self._map is not None
+
+    def _decode(self) -> Dict[str, str]:
+        if self._map is None:
+            self._map = self._snapshot.uid_hotkey_map(self._netuid)
+            # Drop the reference so the file can be unmapped
+            self._snapshot = None
+        return self._map
+
+    def __getitem__(self, uid: str) -> str:
+        return self._decode()[uid]
+
+    def __iter__(self):
+        return iter(self._decode())
+
+    def __len__(self) -> int:
+        if self._map is None:
+            return self._snapshot.subnet_info(self._netuid)["count"]
+        return len(self._map)
+
+    def keys(self):
+        return self._decode().keys()
+
+    def values(self):
+        return self._decode().values()
+
+    def items(self):
+        return self._decode().items()
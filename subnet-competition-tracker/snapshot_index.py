@@ -0,0 +1,256 @@
+"""
+Snapshot metadata index.
+
+Windowed and block-normalized analysis only need each snapshot's time and
+the block every subnet was read at, but getting those from the snapshot
+itself means parsing the whole file. The index keeps them in a sidecar,
+snapshot_index.jsonl in the data directory, one line per snapshot:
+
+    {"name": "snapshot_<ts>.json", "size": 2483113, "mtime_ns": 1767804686735863000,
+     "time": 1767804686735, "block": 7272307, "blocks": {"0": 7272301, "1": 7272307}}
+
+time is unix milliseconds of the file stem, block is the latest block of
+the sweep and blocks holds every subnet that was fetched (missing subnets
+are left out). New snapshots are appended as they are written; files that
+were added, replaced or converted behind the index's back are detected by
+name, size and mtime and read once. Entries are kept in timestamp order, so
+a --since/--until window is two binary searches over the time (or block)
+column and only the files inside it are opened.
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from delta_store import snapshot_stem
+from snapshot_format import BINARY_SUFFIX, BinarySnapshot
+
+SNAPSHOT_INDEX_FILENAME = "snapshot_index.jsonl"
+
+# (kind, value): ("time", unix milliseconds) or ("block", block number)
+Bound = Tuple[str, int]
+
+
+def timestamp_millis(timestamp: str) -> int:
+    """Unix milliseconds of a snapshot's ISO timestamp."""
+    return int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+
+
+def stem_millis(stem: str) -> int:
+    """Unix milliseconds encoded in a snapshot file stem (snapshot_<date>T<HH-MM-SS.ffffff>)."""
+    date, _, clock = stem[len("snapshot_"):].partition("T")
+    return timestamp_millis(f"{date}T{clock.replace('-', ':')}")
+
+
+def parse_bound(value: Optional[str]) -> Optional[Bound]:
+    """
+    Parse a --since/--until value.
+
+    Args:
+        value: Block number or ISO timestamp (e.g. 2026-01-07 or 2026-01-07T16:50)
+
+    Returns:
+        ("block", n) or ("time", unix milliseconds), or None for no bound
+
+    Raises:
+        ValueError: If value is neither a block number nor an ISO timestamp
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return "block", int(value)
+    return "time", timestamp_millis(value)
+
+
+def subnet_blocks(subnets: Dict[str, Dict]) -> Dict[str, int]:
+    """Block each fetched subnet of a snapshot (or delta) was read at."""
+    return {
+        str(netuid): data["block"]
+        for netuid, data in subnets.items()
+        if not data.get("missing") and data.get("block") is not None
+    }
+
+
+def read_blocks(path: Path) -> Dict[str, int]:
+    """
+    Per-subnet blocks of a snapshot file.
+
+    Binary snapshots only have their header read. Delta files carry the
+    block of every subnet, so they are read without replaying the chain.
+    """
+    if Path(path).suffix == BINARY_SUFFIX:
+        with BinarySnapshot(path) as snap:
+            return {
+                str(entry["netuid"]): entry["block"]
+                for entry in snap.header["subnets"]
+                if not entry.get("missing") and entry.get("block") is not None
+            }
+    with open(path, "r") as f:
+        return subnet_blocks(json.load(f).get("subnets", {}))
+
+
+def _entry(path: Path, blocks: Dict[str, int]) -> Dict:
+    stat = Path(path).stat()
+    return {
+        "name": Path(path).name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "time": stem_millis(snapshot_stem(path)),
+        "block": max(blocks.values()) if blocks else None,
+        "blocks": blocks
+    }
+
+
+class SnapshotIndex:
+    """Time and per-subnet block of every snapshot, in timestamp order."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Location of the index file (read on the first refresh)
+        """
+        self.path = Path(path)
+        self.entries: List[Dict] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._compact = True
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        try:
+            f = open(self.path, "r")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # Torn append from an interrupted write
+                    self._compact = False
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self._compact = False
+                    continue
+                if entry["name"] in self._by_name:
+                    self._compact = False
+                self._by_name[entry["name"]] = entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _append(self, entries: List[Dict]):
+        with open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def _rewrite(self):
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+        self._compact = True
+
+    def add(self, path: Path, blocks: Dict[str, int]):
+        """
+        Append a snapshot that was just written, without reading the index.
+
+        Args:
+            path: The snapshot file
+            blocks: subnet_blocks() of the snapshot
+        """
+        entry = _entry(path, blocks)
+        self._append([entry])
+        if self._loaded:
+            self._by_name[entry["name"]] = entry
+            self.entries = sorted(self._by_name.values(), key=lambda e: snapshot_stem(e["name"]))
+
+    def refresh(self, snapshots: List[Path]) -> int:
+        """
+        Make the index match the given snapshot files exactly.
+
+        Only files that are new or changed since they were indexed are read.
+
+        Args:
+            snapshots: get_all_snapshots() result
+
+        Returns:
+            Number of files read
+        """
+        if not self._loaded:
+            self._load()
+        entries = []
+        fresh = []
+        for path in snapshots:
+            entry = self._by_name.get(path.name)
+            if not self._current(entry, path):
+                if entry is not None:
+                    self._compact = False
+                entry = _entry(path, read_blocks(path))
+                fresh.append(entry)
+            entries.append(entry)
+
+        if len(entries) - len(fresh) != len(self._by_name):
+            # Files were removed (or renamed by convert)
+            self._compact = False
+        self.entries = entries
+        self._by_name = {entry["name"]: entry for entry in entries}
+        if not self._compact:
+            self._rewrite()
+        elif fresh:
+            self._append(fresh)
+        return len(fresh)
+
+    @staticmethod
+    def _current(entry: Optional[Dict], path: Path) -> bool:
+        """Whether an entry still describes the file at path."""
+        if entry is None:
+            return False
+        stat = path.stat()
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def unindexed(self, snapshots: List[Path]) -> List[Path]:
+        """The snapshots the next refresh would read: new, or changed since they were indexed."""
+        if not self._loaded:
+            self._load()
+        return [path for path in snapshots if not self._current(self._by_name.get(path.name), path)]
+
+    def blocks(self, path: Path) -> Dict[str, int]:
+        """Per-subnet blocks of an indexed snapshot ({} if it is not indexed or not refreshed)."""
+        entry = self._by_name.get(Path(path).name)
+        return entry["blocks"] if entry is not None else {}
+
+    def _keys(self, kind: str) -> List[int]:
+        if kind == "time":
+            return [entry["time"] for entry in self.entries]
+        # Snapshots without blocks sort with the last block before them
+        keys = []
+        last = -1
+        for entry in self.entries:
+            if entry["block"] is not None:
+                last = max(last, entry["block"])
+            keys.append(last)
+        return keys
+
+    def window(self, since: Optional[Bound] = None, until: Optional[Bound] = None) -> slice:
+        """
+        Positions of the entries inside an inclusive time or block window.
+
+        Args:
+            since: parse_bound() of the window start, or None for the first snapshot
+            until: parse_bound() of the window end, or None for the latest snapshot
+
+        Returns:
+            Slice into entries (and into the snapshot list they were refreshed from)
+        """
+        start, stop = 0, len(self.entries)
+        if since is not None:
+            start = bisect_left(self._keys(since[0]), since[1])
+        if until is not None:
+            stop = bisect_right(self._keys(until[0]), until[1])
+        return slice(start, max(start, stop))
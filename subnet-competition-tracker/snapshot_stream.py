@@ -0,0 +1,173 @@
+"""
+Streaming snapshot reader.
+
+load_snapshot materializes a whole snapshot, so diffing a pair keeps two
+full snapshots in memory. The reader here yields (netuid, subnet_record)
+one subnet at a time instead:
+
+    for netuid, record in iter_snapshot_subnets(path):
+        ...
+
+JSON files are read in fixed-size chunks and decoded one subnet object at
+a time with json.JSONDecoder.raw_decode, so the buffer never holds much
+more than one chunk plus one subnet. Binary files yield records whose map
+is a LazyUidMap, decoded only when it is read.
+
+merge_walk zips two such streams by netuid. take_snapshot and the binary
+writer store subnets in ascending netuid order, so the walk is a plain
+sorted merge holding one record per side; a stream that is out of order
+raises SnapshotOrderError so the caller can fall back to a full load.
+Delta files need the previous state to be rebuilt and are not streamed.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from snapshot_format import BINARY_SUFFIX, BinarySnapshot
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class SnapshotOrderError(ValueError):
+    """A snapshot's subnets are not stored in ascending netuid order."""
+
+
+class _JSONStream:
+    """Incremental reader over a JSON text, one value at a time."""
+
+    def __init__(self, f):
+        self._file = f
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        chunk = self._file.read(_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it."""
+        while True:
+            buffer = self._buffer
+            position = self._position
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            self._position = position
+            if position < len(buffer):
+                return buffer[position]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON snapshot")
+
+    def expect(self, char: str):
+        """Consume char, which must be the next non-whitespace character."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON snapshot, found {found!r}")
+        self._position += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def keys(self) -> Iterator[str]:
+        """Yield the keys of the object starting here; the caller reads each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._position += 1
+                continue
+            self.expect("}")
+            return
+
+
+def iter_json_subnets(path: Path) -> Iterator[Tuple[str, Dict]]:
+    """Yield (netuid, subnet_record) from a JSON snapshot, one subnet at a time."""
+    with open(path, "r") as f:
+        stream = _JSONStream(f)
+        for key in stream.keys():
+            if key != "subnets":
+                stream.value()
+                continue
+            for netuid in stream.keys():
+                yield netuid, stream.value()
+
+
+def iter_snapshot_subnets(path: Path) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (netuid, subnet_record) from a full snapshot file, one subnet at a time.
+
+    Args:
+        path: JSON or binary snapshot (not a delta)
+    """
+    if Path(path).suffix == BINARY_SUFFIX:
+        with BinarySnapshot(path) as snap:
+            yield from snap.iter_subnets(lazy=True)
+    else:
+        yield from iter_json_subnets(path)
+
+
+def _ascending(subnets: Iterator[Tuple[str, Dict]], label: str) -> Iterator[Tuple[str, Dict]]:
+    last = None
+    for netuid, record in subnets:
+        if last is not None and int(netuid) <= last:
+            raise SnapshotOrderError(f"{label} snapshot is not in netuid order at subnet {netuid}")
+        last = int(netuid)
+        yield netuid, record
+
+
+def merge_walk(old_subnets: Iterator[Tuple[str, Dict]],
+               new_subnets: Iterator[Tuple[str, Dict]]) -> Iterator[Tuple[str, Optional[Dict], Optional[Dict]]]:
+    """
+    Walk two subnet streams together in ascending netuid order.
+
+    Args:
+        old_subnets: (netuid, record) stream of the earlier snapshot
+        new_subnets: (netuid, record) stream of the later snapshot
+
+    Yields:
+        (netuid, old_record, new_record), with None on the side a subnet is absent from
+
+    Raises:
+        SnapshotOrderError: If either stream is not in ascending netuid order
+    """
+    old_iter = _ascending(old_subnets, "Old")
+    new_iter = _ascending(new_subnets, "New")
+    old = next(old_iter, None)
+    new = next(new_iter, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and int(old[0]) < int(new[0])):
+            yield old[0], old[1], None
+            old = next(old_iter, None)
+        elif old is None or int(new[0]) < int(old[0]):
+            yield new[0], None, new[1]
+            new = next(new_iter, None)
+        else:
+            yield old[0], old[1], new[1]
+            old = next(old_iter, None)
+            new = next(new_iter, None)
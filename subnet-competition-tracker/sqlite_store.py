@@ -0,0 +1,203 @@
+"""
+SQLite-backed snapshot store.
+
+Snapshot files answer "what did the network look like at time T", but
+questions about one hotkey or one slot ("when did hotkey X hold UID 12 on
+subnet 8") need every file to be loaded. This store keeps the same data as
+indexed rows so those questions become index lookups:
+
+    snapshots     (id, stem, timestamp, network)
+    hotkeys       (id, ss58)
+    observations  (snapshot_id, netuid, uid, hotkey_id, block)
+
+Observations are indexed by (netuid, uid, snapshot_id) and by
+(hotkey_id, snapshot_id).
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    stem TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    network TEXT
+);
+CREATE TABLE IF NOT EXISTS hotkeys (
+    id INTEGER PRIMARY KEY,
+    ss58 TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS observations (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    netuid INTEGER NOT NULL,
+    uid INTEGER NOT NULL,
+    hotkey_id INTEGER NOT NULL REFERENCES hotkeys(id),
+    block INTEGER,
+    PRIMARY KEY (snapshot_id, netuid, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_observations_slot ON observations (netuid, uid, snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_observations_hotkey ON observations (hotkey_id, snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots (timestamp);
+"""
+
+
+class SnapshotStore:
+    """Indexed storage of UID->hotkey observations across snapshots."""
+
+    def __init__(self, path: Path):
+        """
+        Open (and create if needed) the database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._hotkey_ids: Dict[str, int] = {}
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def has_snapshot(self, stem: str) -> bool:
+        """Whether a snapshot with this file stem was already stored."""
+        row = self.conn.execute("SELECT 1 FROM snapshots WHERE stem = ?", (stem,)).fetchone()
+        return row is not None
+
+    def _hotkey_id_map(self, hotkeys: List[str]) -> Dict[str, int]:
+        """Ids for the given hotkeys, inserting the unknown ones in bulk."""
+        missing = [hk for hk in set(hotkeys) if hk not in self._hotkey_ids]
+        if missing:
+            self.conn.executemany("INSERT OR IGNORE INTO hotkeys (ss58) VALUES (?)", ((hk,) for hk in missing))
+            # Resolve ids in chunks to stay under SQLite's parameter limit
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for hotkey_id, ss58 in self.conn.execute(
+                        f"SELECT id, ss58 FROM hotkeys WHERE ss58 IN ({placeholders})", chunk):
+                    self._hotkey_ids[ss58] = hotkey_id
+        return self._hotkey_ids
+
+    def add_snapshot(self, stem: str, snapshot: Dict) -> bool:
+        """
+        Bulk insert one snapshot.
+
+        Args:
+            stem: Snapshot file stem, used to skip snapshots already stored
+            snapshot: Snapshot dict as produced by take_snapshot()/load_snapshot()
+
+        Returns:
+            True if inserted, False if the snapshot was already present
+        """
+        if self.has_snapshot(stem):
+            return False
+
+        subnets = snapshot.get("subnets", {})
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO snapshots (stem, timestamp, network) VALUES (?, ?, ?)",
+                (stem, snapshot.get("timestamp"), snapshot.get("network"))
+            )
+            snapshot_id = cursor.lastrowid
+            ids = self._hotkey_id_map([
+                hotkey for data in subnets.values()
+                for hotkey in data.get("uid_hotkey_map", {}).values() if hotkey
+            ])
+            self.conn.executemany(
+                "INSERT INTO observations (snapshot_id, netuid, uid, hotkey_id, block) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (snapshot_id, int(netuid), int(uid), ids[hotkey], data.get("block"))
+                    for netuid, data in subnets.items()
+                    for uid, hotkey in data.get("uid_hotkey_map", {}).items() if hotkey
+                )
+            )
+        return True
+
+    def slot_history(self, netuid: int, uid: int) -> List[Dict]:
+        """
+        Every hotkey that held a UID, in order of first appearance.
+
+        Consecutive snapshots with the same hotkey are merged into one
+        tenure, so a hotkey that lost and later regained the slot shows up
+        twice.
+
+        Args:
+            netuid: The subnet netuid
+            uid: The UID on that subnet
+
+        Returns:
+            Tenures with hotkey, first/last seen timestamp and block, and snapshot count
+        """
+        rows = self.conn.execute(
+            """
+            SELECT h.ss58, s.timestamp, o.block
+            FROM observations o
+            JOIN snapshots s ON s.id = o.snapshot_id
+            JOIN hotkeys h ON h.id = o.hotkey_id
+            WHERE o.netuid = ? AND o.uid = ?
+            ORDER BY s.timestamp
+            """,
+            (netuid, uid)
+        )
+        return _merge_tenures(rows)
+
+    def hotkey_history(self, ss58: str) -> List[Dict]:
+        """
+        Every (netuid, uid) slot a hotkey held.
+
+        Args:
+            ss58: Hotkey address
+
+        Returns:
+            Tenures with netuid, uid, first/last seen timestamp and block, and snapshot count
+        """
+        rows = self.conn.execute(
+            """
+            SELECT o.netuid, o.uid, s.timestamp, o.block
+            FROM hotkeys h
+            JOIN observations o ON o.hotkey_id = h.id
+            JOIN snapshots s ON s.id = o.snapshot_id
+            WHERE h.ss58 = ?
+            ORDER BY o.netuid, o.uid, s.timestamp
+            """,
+            (ss58,)
+        )
+        tenures = []
+        for netuid, uid, timestamp, block in rows:
+            last = tenures[-1] if tenures else None
+            if last and last["netuid"] == netuid and last["uid"] == uid:
+                last["last_seen"] = timestamp
+                last["last_block"] = block
+                last["snapshots"] += 1
+            else:
+                tenures.append({
+                    "netuid": netuid, "uid": uid,
+                    "first_seen": timestamp, "first_block": block,
+                    "last_seen": timestamp, "last_block": block,
+                    "snapshots": 1
+                })
+        return tenures
+
+
+def _merge_tenures(rows) -> List[Dict]:
+    """Collapse time-ordered (hotkey, timestamp, block) rows into tenures."""
+    tenures = []
+    for hotkey, timestamp, block in rows:
+        last = tenures[-1] if tenures else None
+        if last and last["hotkey"] == hotkey:
+            last["last_seen"] = timestamp
+            last["last_block"] = block
+            last["snapshots"] += 1
+        else:
+            tenures.append({
+                "hotkey": hotkey,
+                "first_seen": timestamp, "first_block": block,
+                "last_seen": timestamp, "last_block": block,
+                "snapshots": 1
+            })
+    return tenures
@@ -0,0 +1,137 @@
+"""
+Sweep checkpoints.
+
+take_snapshot appends every subnet record to a checkpoint file as soon as
+it is fetched, instead of holding the whole sweep until one final write:
+
+    {"timestamp": "...", "network": "finney", "lite": true, "block": 4123456}
+    {"netuid": 1, "record": {"uid_hotkey_map": {...}, "n_neurons": 256, "block": 4123456}}
+    {"netuid": 3, "record": {...}}
+
+The first line is the sweep header. Every line is flushed and fsynced
+before the next subnet is recorded, so after an interruption the next
+sweep resumes from the same header (same timestamp and, in lite mode, the
+same pinned block) and only fetches the subnets that are not in the file
+yet. A torn last line is cut off on resume. The file name starts with a
+dot, so it never matches the snapshot_* glob.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+CHECKPOINT_FILENAME = ".sweep_checkpoint.jsonl"
+
+# Older checkpoints are discarded rather than merged into a new sweep
+CHECKPOINT_MAX_AGE_SECONDS = 3600
+
+
+class SweepCheckpoint:
+    """Append-only record log of one in-progress sweep."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Location of the checkpoint file
+        """
+        self.path = Path(path)
+        self.header: Optional[Dict] = None
+        # netuid -> byte offset of its line
+        self.offsets: Dict[int, int] = {}
+        self._file = None
+        self._reader = None
+
+    def resume(self, network: str, lite: bool, max_age_seconds: float = CHECKPOINT_MAX_AGE_SECONDS) -> Optional[Dict]:
+        """
+        Reopen an interrupted sweep of the same kind, if one is recent enough.
+
+        Args:
+            network: Network of the sweep about to start
+            lite: Collection mode of the sweep about to start
+            max_age_seconds: Oldest sweep start that may be resumed
+
+        Returns:
+            The interrupted sweep's header, or None when there is nothing to resume
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+
+        with f:
+            try:
+                header = json.loads(f.readline())
+                started = datetime.fromisoformat(header["timestamp"])
+            except (ValueError, KeyError, TypeError):
+                return None
+            if header.get("network") != network or bool(header.get("lite")) != lite:
+                return None
+            if (datetime.now() - started).total_seconds() > max_age_seconds:
+                return None
+
+            offsets = {}
+            good_end = f.tell()
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                    offsets[int(entry["netuid"])] = offset
+                except (ValueError, KeyError, TypeError):
+                    break
+                good_end = f.tell()
+
+        self._file = open(self.path, "r+b")
+        self._file.truncate(good_end)
+        self._file.seek(good_end)
+        self.header = header
+        self.offsets = offsets
+        return header
+
+    def start(self, header: Dict):
+        """
+        Begin a new checkpoint, replacing any previous one.
+
+        Args:
+            header: Sweep header (timestamp, network, lite, block)
+        """
+        self.close()
+        self._file = open(self.path, "wb")
+        self._write(header)
+        self.header = header
+        self.offsets = {}
+
+    def _write(self, entry: Dict):
+        self._file.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def add(self, netuid: int, record: Dict):
+        """Durably record one fetched subnet."""
+        offset = self._file.tell()
+        self._write({"netuid": netuid, "record": record})
+        self.offsets[netuid] = offset
+
+    def read(self, netuid: int) -> Dict:
+        """Read one recorded subnet back from the file."""
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(self.offsets[netuid])
+        return json.loads(self._reader.readline())["record"]
+
+    def close(self):
+        """Close the file handles, keeping the checkpoint on disk."""
+        for handle in (self._file, self._reader):
+            if handle is not None:
+                handle.close()
+        self._file = None
+        self._reader = None
+
+    def remove(self):
+        """Delete the checkpoint once the snapshot has been written."""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,258 @@
+"""
+Hotkey tenure index.
+
+Replacement counts say how often slots change hands, not how long miners
+keep them. The tenure index follows every (netuid, uid, hotkey) tenure
+from the snapshot where the hotkey was first seen in the slot to the last
+snapshot it was still there, and is updated from each new snapshot's
+compare_snapshots result, so the work per snapshot is proportional to the
+number of changed UIDs.
+
+State (tenure_index.json in the data directory) holds the open tenures:
+
+    {
+      "last_snapshot": "snapshot_<ts>",
+      "closed_bytes": 48213,
+      "subnets": {
+        "8": {
+          "snapshot": "snapshot_<ts>", "block": 4123456,
+          "open": {"12": ["5F...", "snapshot_<ts>", 4100000, false]}
+        }
+      }
+    }
+
+Open tenures are [hotkey, first_snapshot, first_block, left_censored]; their
+last-seen point is the subnet's current snapshot/block. A tenure that ends
+is appended to the closed log (tenure_index.closed.jsonl), one per line:
+
+    ["8", 12, "5D...", "snapshot_<ts>", 4000000, "snapshot_<ts>", 4099000, false]
+
+that is [netuid, uid, hotkey, first_snapshot, first_block, last_snapshot,
+last_block, left_censored]. closed_bytes is the committed length of the
+log; anything after it was appended by a save that never finished and is
+dropped. An update therefore appends the tenures it closed and rewrites
+only the open ones, never the whole history. Tenures already running when
+tracking started are left-censored (their real start is unknown) and are
+left out of the distributions, as are tenures that are still open.
+"""
+
+import bisect
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+TENURE_INDEX_FILENAME = "tenure_index.json"
+CLOSED_LOG_FILENAME = "tenure_index.closed.jsonl"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+class TenureIndex:
+    """Incrementally maintained first/last-seen index of slot tenures."""
+
+    def __init__(self, path: Path):
+        """
+        Load the index, starting empty when the files do not exist or disagree.
+
+        Args:
+            path: Location of the index file; the closed log sits next to it
+        """
+        self.path = Path(path)
+        self.closed_path = self.path.with_name(CLOSED_LOG_FILENAME)
+        # Closed tenures not yet appended to the log
+        self._pending: List[List] = []
+        # netuid -> sorted durations of completed, uncensored tenures; read from the log on first use
+        self._durations: Optional[Dict[str, List[int]]] = None
+        try:
+            with open(self.path, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = None
+        if self.state is None or "closed_bytes" not in self.state or self._log_size() < self.state["closed_bytes"]:
+            # A log shorter than the index lost closed tenures: start over so the caller rebuilds
+            self.state = {"last_snapshot": None, "closed_bytes": 0, "subnets": {}}
+
+    def _log_size(self) -> int:
+        try:
+            return self.closed_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def last_snapshot(self) -> Optional[str]:
+        return self.state["last_snapshot"]
+
+    def save(self):
+        """Append the newly closed tenures to the log, then write the open ones atomically."""
+        with open(self.closed_path, "ab") as f:
+            # Drop appends a previous save never committed
+            f.truncate(self.state["closed_bytes"])
+            f.seek(self.state["closed_bytes"])
+            for tenure in self._pending:
+                f.write(json.dumps(tenure, separators=(",", ":")).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            self.state["closed_bytes"] = f.tell()
+        self._pending = []
+
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def _close(self, netuid: str, uid: int, tenure: List, last_stem: str, last_block: Optional[int]):
+        """Record an ended tenure."""
+        hotkey, first_stem, first_block, censored = tenure
+        record = [netuid, uid, hotkey, first_stem, first_block, last_stem, last_block, censored]
+        self._pending.append(record)
+        if self._durations is not None:
+            self._add_duration(self._durations, record)
+
+    @staticmethod
+    def _add_duration(durations: Dict[str, List[int]], record: List):
+        netuid, _, _, _, first_block, _, last_block, censored = record
+        if not censored and first_block is not None and last_block is not None:
+            bisect.insort(durations.setdefault(netuid, []), last_block - first_block)
+
+    def _closed_durations(self) -> Dict[str, List[int]]:
+        """Durations of completed tenures per subnet, from the committed log and pending closes."""
+        if self._durations is None:
+            durations: Dict[str, List[int]] = {}
+            try:
+                with open(self.closed_path, "rb") as f:
+                    data = f.read(self.state["closed_bytes"])
+            except FileNotFoundError:
+                data = b""
+            for line in data.splitlines():
+                netuid, _, _, _, first_block, _, last_block, censored = json.loads(line)
+                if not censored and first_block is not None and last_block is not None:
+                    durations.setdefault(netuid, []).append(last_block - first_block)
+            for values in durations.values():
+                values.sort()
+            for record in self._pending:
+                self._add_duration(durations, record)
+            self._durations = durations
+        return self._durations
+
+    def start(self, stem: str, snapshot: Dict):
+        """
+        Open a left-censored tenure for every occupied slot of the first snapshot.
+
+        Args:
+            stem: File stem of the snapshot
+            snapshot: The snapshot
+        """
+        subnets = {}
+        for netuid, data in snapshot.get("subnets", {}).items():
+            if data.get("missing"):
+                continue
+            block = data.get("block")
+            subnets[netuid] = {
+                "snapshot": stem,
+                "block": block,
+                "open": {
+                    str(uid): [hotkey, stem, block, True]
+                    for uid, hotkey in data.get("uid_hotkey_map", {}).items() if hotkey
+                }
+            }
+        # The closed log is emptied on the next save
+        self.state = {"last_snapshot": stem, "closed_bytes": 0, "subnets": subnets}
+        self._pending = []
+        self._durations = {}
+
+    def update(self, stem: str, snapshot: Dict, changes: Dict[str, Dict]):
+        """
+        Advance the index by one snapshot.
+
+        Args:
+            stem: File stem of the new snapshot
+            snapshot: The new snapshot
+            changes: compare_snapshots(previous snapshot, snapshot) with per-UID lists
+        """
+        subnets = self.state["subnets"]
+        new_subnets = snapshot.get("subnets", {})
+
+        # Subnets that disappeared close every open tenure at their last sighting
+        for netuid, entry in subnets.items():
+            if netuid in new_subnets or not entry["open"]:
+                continue
+            for uid, tenure in entry["open"].items():
+                self._close(netuid, int(uid), tenure, entry["snapshot"], entry["block"])
+            entry["open"] = {}
+
+        for netuid, data in new_subnets.items():
+            if data.get("missing"):
+                # Not observed this sweep: open tenures simply continue
+                continue
+            block = data.get("block")
+            entry = subnets.get(netuid)
+            if entry is None:
+                entry = subnets[netuid] = {"snapshot": stem, "block": block, "open": {}}
+
+            change = changes.get(netuid)
+            if change:
+                ended = [item["uid"] for item in change["replacements"]]
+                ended += [item["uid"] for item in change["deregistrations"]]
+                for uid in ended:
+                    tenure = entry["open"].pop(str(uid), None)
+                    if tenure is not None:
+                        self._close(netuid, int(uid), tenure, entry["snapshot"], entry["block"])
+
+                for item in change["replacements"]:
+                    entry["open"][str(item["uid"])] = [item["new_hotkey"], stem, block, False]
+                for item in change["new_registrations"]:
+                    entry["open"][str(item["uid"])] = [item["hotkey"], stem, block, False]
+
+            entry["snapshot"] = stem
+            entry["block"] = block
+
+        self.state["last_snapshot"] = stem
+
+    def observed(self, netuid: str) -> Optional[Dict]:
+        """
+        The last state of a subnet the index saw, as a snapshot subnet record.
+
+        Returns:
+            {"uid_hotkey_map", "n_neurons", "block"} from its open tenures, or
+            None if the subnet was never seen
+        """
+        entry = self.state["subnets"].get(str(netuid))
+        if entry is None:
+            return None
+        mapping = {uid: tenure[0] for uid, tenure in entry["open"].items()}
+        return {"uid_hotkey_map": mapping, "n_neurons": len(mapping), "block": entry["block"]}
+
+    def distribution(self, netuid: str) -> Dict:
+        """
+        Tenure length distribution for a subnet, in blocks survived.
+
+        Args:
+            netuid: The subnet netuid
+
+        Returns:
+            Count, median, p10 and p90 of completed, uncensored tenures,
+            plus the number of tenures still open
+        """
+        entry = self.state["subnets"].get(str(netuid), {"open": {}})
+        durations = self._closed_durations().get(str(netuid), [])
+        return {
+            "closed_tenures": len(durations),
+            "open_tenures": len(entry["open"]),
+            "median_tenure_blocks": percentile(durations, 0.5),
+            "p10_tenure_blocks": percentile(durations, 0.1),
+            "p90_tenure_blocks": percentile(durations, 0.9)
+        }
+
+    def distributions(self) -> Dict[str, Dict]:
+        """Tenure distributions for every tracked subnet."""
+        return {netuid: self.distribution(netuid) for netuid in self.state["subnets"]}
@@ -0,0 +1,77 @@
+"""Event ingestion on a FakeChain."""
+
+from events import CURSOR_FILENAME, EVENT_LOG_FILENAME, EventIngestor, FakeChain
+from main import SubnetCompetitionTracker
+
+SEED_BLOCK = 100
+
+
+class FlakyChain(FakeChain):
+    """A FakeChain whose node drops once while a block is being read."""
+
+    def __init__(self, fail_at: int):
+        super().__init__()
+        self.fail_at = fail_at
+
+    def get_block_events(self, block: int):
+        if block == self.fail_at:
+            self.fail_at = None
+            raise ConnectionError(f"connection lost at block {block}")
+        return super().get_block_events(block)
+
+
+def build_chain(chain: FakeChain) -> FakeChain:
+    for block in range(SEED_BLOCK + 1, SEED_BLOCK + 250):
+        netuid = block % 3
+        chain.register(block, netuid, block % 7, f"hotkey-{block}")
+        if block % 11 == 0:
+            # The slot's own hotkey registering again is not a change
+            chain.register(block, netuid, block % 7, f"hotkey-{block}")
+    chain.remove_subnet(SEED_BLOCK + 180, 2)
+    return chain
+
+
+def seed_snapshot():
+    return {
+        "timestamp": "2026-01-01T00:00:00",
+        "network": "finney",
+        "subnets": {
+            str(netuid): {"uid_hotkey_map": {str(uid): f"seed-{netuid}-{uid}" for uid in range(5)},
+                          "n_neurons": 5, "block": SEED_BLOCK}
+            for netuid in range(3)
+        }
+    }
+
+
+def test_interrupted_ingest_resumes_to_the_same_state(tmp_path):
+    chain = build_chain(FakeChain())
+    whole = EventIngestor(chain, tmp_path / "whole")
+    whole.data_dir.mkdir()
+    whole.seed(seed_snapshot(), SEED_BLOCK)
+    whole.ingest(batch_blocks=20)
+
+    flaky = build_chain(FlakyChain(fail_at=SEED_BLOCK + 137))
+    tracker = SubnetCompetitionTracker(data_dir=tmp_path / "resumed", use_cache=False)
+    tracker.save_snapshot(seed_snapshot())
+    try:
+        tracker.ingest_events(batch_blocks=20, source=flaky)
+    except ConnectionError:
+        pass
+    interrupted = EventIngestor(flaky, tracker.data_dir)
+    assert interrupted.cursor["last_block"] == SEED_BLOCK + 120
+    assert "slots" not in interrupted.cursor
+    assert tracker.ingest_events(batch_blocks=20, source=flaky) > 0
+
+    resumed = EventIngestor(flaky, tracker.data_dir)
+    assert resumed.cursor == whole.cursor
+    assert (tracker.data_dir / EVENT_LOG_FILENAME).read_bytes() == (whole.data_dir / EVENT_LOG_FILENAME).read_bytes()
+    resumed.rebuild(seed_snapshot())
+    assert resumed.slots == whole.slots
+    # Subnet 2 was removed, so its slots hold only hotkeys registered after that
+    assert all(int(hotkey.split("-")[1]) > SEED_BLOCK + 180 for hotkey in resumed.slots["2"].values())
+
+
+def test_ingest_without_cursor_or_start_is_refused(tmp_path):
+    tracker = SubnetCompetitionTracker(data_dir=tmp_path, use_cache=False)
+    assert tracker.ingest_events(source=build_chain(FakeChain())) is None
+    assert not (tmp_path / CURSOR_FILENAME).exists()
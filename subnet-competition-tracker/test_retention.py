@@ -0,0 +1,29 @@
+"""Retention and compaction of a synthetic snapshot history."""
+
+import json
+from datetime import datetime, timedelta
+
+from benchmarks import SyntheticNetwork
+from main import SubnetCompetitionTracker
+from retention import parse_age
+
+
+def test_compact_keeps_analyze_results(tmp_path):
+    chain = SyntheticNetwork(subnets=6, uids=32, churn=0.1, seed=3)
+    tracker = SubnetCompetitionTracker(data_dir=tmp_path, use_cache=False)
+    now = datetime(2026, 1, 1)
+    for _ in range(240):
+        # Irregular sweeps over ten days, with a subnet occasionally absent
+        now += timedelta(minutes=(7, 20, 45, 90)[chain.rng.randrange(4)])
+        snapshot = chain.snapshot(now.isoformat())
+        if chain.rng.random() < 0.05:
+            del snapshot["subnets"][str(chain.rng.randrange(6))]
+        tracker.save_snapshot(snapshot)
+        chain.step((30, 100, 300)[chain.rng.randrange(3)])
+
+    before = tracker.analyze_competition()
+    report = tracker.compact(parse_age("1d"), parse_age("3d"))
+    after = SubnetCompetitionTracker(data_dir=tmp_path, use_cache=False).analyze_competition()
+
+    assert report["dropped"] > 0
+    assert json.dumps(after, sort_keys=True) == json.dumps(before, sort_keys=True)
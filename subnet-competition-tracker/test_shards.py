@@ -0,0 +1,58 @@
+"""Sharded collection and merge on the synthetic chain."""
+
+from datetime import datetime
+
+from benchmarks import SyntheticNetwork
+from main import SubnetCompetitionTracker
+from sweep_checkpoint import CHECKPOINT_FILENAME, SweepCheckpoint
+
+
+def test_merged_shards_match_single_collector(tmp_path, make_tracker):
+    chain = SyntheticNetwork(subnets=11, uids=16, churn=0.2, seed=4)
+    sharded, single = tmp_path / "sharded", tmp_path / "single"
+    for sweep in range(3):
+        for index in (1, 2, 3):
+            assert make_tracker(sharded, chain, lite=True, shard=(index, 3)).take_snapshot(sweep=str(chain.block))
+        expected = make_tracker(single, chain, lite=True).take_snapshot()
+        merged = make_tracker(sharded, chain, lite=True).merge_shard_sweeps()
+
+        assert len(merged) == 1
+        reader = SubnetCompetitionTracker(data_dir=tmp_path, use_cache=False)
+        assert reader.load_snapshot(merged[0])["subnets"] == reader.load_snapshot(expected)["subnets"]
+        chain.step()
+
+    assert not list((sharded / "shards").iterdir())
+    analyzed = [SubnetCompetitionTracker(data_dir=path, use_cache=False).analyze_competition()
+                for path in (sharded, single)]
+    assert analyzed[0] == analyzed[1]
+
+
+def test_shard_without_sweep_label_is_refused(tmp_path, make_tracker):
+    chain = SyntheticNetwork(subnets=4, uids=8, seed=1)
+    assert make_tracker(tmp_path, chain, shard=(1, 2)).take_snapshot() is None
+
+
+def test_checkpoint_of_another_sweep_is_not_resumed(tmp_path, make_tracker):
+    chain = SyntheticNetwork(subnets=4, uids=8, seed=1)
+    tracker = make_tracker(tmp_path, chain, shard=(1, 2))
+    # An interrupted shard of an earlier sweep
+    checkpoint = SweepCheckpoint(tmp_path / CHECKPOINT_FILENAME.replace(".jsonl", ".1of2.jsonl"))
+    checkpoint.start({"timestamp": datetime.now().isoformat(), "network": tracker.network, "lite": False,
+                      "block": None, "sweep": "earlier"})
+    checkpoint.add(0, {"uid_hotkey_map": {}, "n_neurons": 0, "block": 1})
+    checkpoint.close()
+
+    path = tracker.take_snapshot(sweep="current")
+    assert path is not None and path.endswith("shard_current_1of2.json")
+    assert [p.name for p in (tmp_path / "shards").iterdir()] == ["shard_current_1of2.json"]
+
+
+def test_shards_read_too_far_apart_are_refused(tmp_path, make_tracker):
+    chain = SyntheticNetwork(subnets=6, uids=8, seed=2)
+    make_tracker(tmp_path, chain, shard=(1, 2)).take_snapshot(sweep="skewed")
+    # The second full collector reads its subnets two intervals later
+    chain.block += 100
+    make_tracker(tmp_path, chain, shard=(2, 2)).take_snapshot(sweep="skewed")
+
+    assert make_tracker(tmp_path, chain).merge_shard_sweeps() == []
+    assert make_tracker(tmp_path, chain).merge_shard_sweeps(max_block_spread=100)
@@ -0,0 +1,48 @@
+"""Tenure index maintenance over a synthetic snapshot history."""
+
+from datetime import datetime, timedelta
+
+from benchmarks import SyntheticNetwork
+from main import SubnetCompetitionTracker
+from tenure import CLOSED_LOG_FILENAME, TENURE_INDEX_FILENAME, TenureIndex
+
+
+def write_history(tracker, chain, sweeps):
+    now = datetime(2026, 1, 1)
+    for sweep in range(sweeps):
+        now += timedelta(minutes=10)
+        snapshot = chain.snapshot(now.isoformat())
+        for data in snapshot["subnets"].values():
+            data["block"] = chain.block
+        if sweep % 7 == 3:
+            snapshot["subnets"]["2"] = {"missing": True}
+        tracker.save_snapshot(snapshot)
+        yield
+        chain.step(50)
+
+
+def test_incremental_updates_match_a_rebuild(tmp_path):
+    chain = SyntheticNetwork(subnets=4, uids=20, churn=0.2, dereg_rate=0.05, seed=2)
+    tracker = SubnetCompetitionTracker(data_dir=tmp_path, use_cache=False)
+    for _ in write_history(tracker, chain, 30):
+        tracker.update_tenure_index()
+    incremental = tracker.update_tenure_index().distributions()
+    assert incremental["2"]["closed_tenures"] > 0
+
+    (tmp_path / TENURE_INDEX_FILENAME).unlink()
+    assert tracker.update_tenure_index().distributions() == incremental
+
+
+def test_uncommitted_closed_tenures_are_dropped(tmp_path):
+    chain = SyntheticNetwork(subnets=3, uids=10, churn=0.3, seed=5)
+    tracker = SubnetCompetitionTracker(data_dir=tmp_path, use_cache=False)
+    for _ in write_history(tracker, chain, 6):
+        pass
+    expected = tracker.update_tenure_index().distributions()
+
+    with open(tmp_path / CLOSED_LOG_FILENAME, "ab") as f:
+        f.write(b'["0", 1, "5F...", "snapshot_x", 0, "snapshot_y", 900')
+    index = TenureIndex(tmp_path / TENURE_INDEX_FILENAME)
+    assert index.distributions() == expected
+    index.save()
+    assert TenureIndex(tmp_path / TENURE_INDEX_FILENAME).distributions() == expected